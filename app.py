@@ -6,11 +6,30 @@ st.set_page_config(
     layout="wide"
 )
 
-# Agora importe os módulos de página (que podem usar Streamlit) somente depois
-import aprovar_vaga as aprovar_vaga
-import quadro_func
+# Os módulos de página (que trazem pandas, xlsxwriter etc.) são importados
+# só quando a página é aberta pela primeira vez; o Python os mantém em
+# sys.modules para as execuções seguintes
+import html
+import importlib
 import traceback
 
+# Instrumentação é leve (sem pandas): mede a execução quando o painel está aberto
+from config import PERFIL_SEMPRE_ATIVO
+from instrumentacao import iniciar_coleta, finalizar_coleta, medir, resumo_por_span
+
+# Cores do painel de perfil por categoria de span
+CORES_PERFIL = {
+    "pagina": "#6c757d",
+    "carga": "#1f77b4",
+    "processamento": "#ff7f0e",
+    "db": "#2ca02c",
+    "render": "#9467bd",
+    "exportacao": "#8c564b",
+}
+
+# Spans desenhados no gráfico (os demais entram só no resumo)
+MAXIMO_SPANS_PAINEL = 150
+
 # Inicializa session_state para navegação
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Página Inicial"
@@ -46,10 +65,48 @@ def home_page():
             st.session_state.current_page = "Aprovação de Vagas"
             st.rerun()
 
+def renderizar_painel_perfil(coleta):
+    """Painel da barra lateral com os spans e as instruções SQL da execução"""
+    total = coleta.duracao_ms or 1.0
+
+    with st.sidebar.expander(f"🐞 {total:.0f} ms · {coleta.total_sql} SQL", expanded=True):
+        # Gráfico em chama: cada span é uma barra posicionada pelo início e
+        # pela duração relativos à execução, recuada pela profundidade
+        linhas = []
+        for span in coleta.spans[:MAXIMO_SPANS_PAINEL]:
+            duracao = span["duracao_ms"] or 0.0
+            cor = CORES_PERFIL.get(span["categoria"], "#7f7f7f")
+            rotulo = html.escape(f"{span['nome']} · {duracao:.1f} ms · {span['sql']} SQL")
+            linhas.append(
+                f'<div title="{rotulo}" style="margin-left:{span["inicio_ms"] / total * 100:.2f}%;'
+                f'width:{max(duracao / total * 100, 0.5):.2f}%;background:{cor};color:white;'
+                f'font-size:10px;white-space:nowrap;overflow:hidden;height:14px;'
+                f'margin-top:1px;border-radius:2px;padding-left:2px">{rotulo}</div>'
+            )
+        if len(coleta.spans) > MAXIMO_SPANS_PAINEL:
+            linhas.append(f"<small>+{len(coleta.spans) - MAXIMO_SPANS_PAINEL} spans no resumo</small>")
+        st.markdown("".join(linhas), unsafe_allow_html=True)
+
+        st.markdown("**Por função**")
+        tabela = ["| Span | Chamadas | Total (ms) | Próprio (ms) | SQL |", "|---|---:|---:|---:|---:|"]
+        for item in resumo_por_span(coleta):
+            tabela.append(
+                f"| {item['nome']} | {item['chamadas']} | {item['total_ms']:.1f} "
+                f"| {item['proprio_ms']:.1f} | {item['sql']} |"
+            )
+        st.markdown("\n".join(tabela))
+
+        if coleta.sql_por_instrucao:
+            st.markdown("**Instruções SQL**")
+            tabela = ["| Qtde | Instrução |", "|---:|---|"]
+            for instrucao, quantidade in coleta.sql_por_instrucao.most_common(15):
+                tabela.append(f"| {quantidade} | `{instrucao.replace('|', '¦')}` |")
+            st.markdown("\n".join(tabela))
+
 PAGES = {
     "Página Inicial": {"module": None, "function": home_page},
-    "Quadro de Funcionários": {"module": quadro_func, "function": None},
-    "Aprovação de Vagas": {"module": aprovar_vaga, "function": None},
+    "Quadro de Funcionários": {"module": "quadro_func", "function": None},
+    "Aprovação de Vagas": {"module": "aprovar_vaga", "function": None},
 }
 
 st.sidebar.title('🧭 Navegação')
@@ -75,6 +132,16 @@ if st.sidebar.button("✅ Aprovação de Vagas",
 
 page_info = PAGES[st.session_state.current_page]
 
+st.sidebar.markdown("---")
+perfil_ativo = st.sidebar.checkbox(
+    "🐞 Perfil da execução",
+    key="perfil_ativo",
+    help="Mostra o tempo de cada etapa e as consultas SQL desta execução"
+)
+if perfil_ativo or PERFIL_SEMPRE_ATIVO:
+    iniciar_coleta(st.session_state.current_page)
+coleta = None
+
 # Adiciona um CSS para o tema escuro se a página for o quadro de funcionários
 if st.session_state.current_page == "Quadro de Funcionários":
     st.markdown(
@@ -89,12 +156,13 @@ if st.session_state.current_page == "Quadro de Funcionários":
     )
 
 try:
-    # Se for página inicial, chama a função diretamente
-    if page_info["function"] is not None:
-        page_info["function"]()
-    # Caso contrário, chama o módulo.run()
-    elif page_info["module"] is not None:
-        page_info["module"].run()
+    with medir(st.session_state.current_page, "pagina"):
+        # Se for página inicial, chama a função diretamente
+        if page_info["function"] is not None:
+            page_info["function"]()
+        # Caso contrário, importa o módulo (na primeira visita) e chama o módulo.run()
+        elif page_info["module"] is not None:
+            importlib.import_module(page_info["module"]).run()
 except NameError as e:
     st.error(f"Erro de execução: {e}")
     st.markdown(
@@ -116,3 +184,9 @@ except Exception as e:
     st.error("Ocorreu um erro ao executar a página.")
     st.subheader("Stack trace")
     st.text(traceback.format_exc())
+finally:
+    # Também em st.rerun()/st.stop(): a execução interrompida vai para o log
+    coleta = finalizar_coleta()
+
+if coleta is not None and perfil_ativo:
+    renderizar_painel_perfil(coleta)
@@ -1,19 +1,21 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 from datetime import datetime
 import os
 import logging
+import zlib
 
 # Importa configuração centralizada
 try:
-    from config import DB_PATH_STR as DB_PATH, DATA_MINIMA_VAGAS, CACHE_TTL, validar_estrutura
+    from config import DB_PATH_STR as DB_PATH, DATA_MINIMA_VAGAS, VAGAS_POR_PAGINA
 except ImportError:
     # Fallback para compatibilidade
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DB_PATH = os.path.join(BASE_DIR, "data", "oris.db")
     DATA_MINIMA_VAGAS = datetime(2025, 1, 1)
-    CACHE_TTL = 600
+    VAGAS_POR_PAGINA = 50
     print(f"⚠️ config.py não encontrado, usando fallback: {DB_PATH}")
 
 # Importa módulo de gestão de vagas
@@ -23,12 +25,33 @@ from gestao_vagas import (
     rejeitar_vaga,
     cancelar_vaga_aprovada,
     desfazer_decisao,
+    aprovar_vagas,
+    rejeitar_vagas,
+    cancelar_vagas_aprovadas,
     listar_vagas,
-    salvar_vaga_para_aprovacao,
-    sincronizar_vagas_pendentes,
+    contar_vagas,
+    cursor_pagina,
+    listar_centros_custo_vagas,
+    buscar_vagas_por_ids,
+    chaves_vagas,
     estatisticas_vagas,
-    exportar_vagas_excel
+    arredondar_carga_horaria
 )
+from sincronizacao import iniciar_sincronizacao, tarefa_sincronizacao
+
+# Motor vetorizado de detecção de vagas
+from motor_vagas import (
+    detectar_vagas,
+    vagas_para_registros,
+    IndiceAtivos,
+    IndiceTLP,
+    verificar_vaga,
+    verificar_vagas_na_tlp
+)
+from conexao import obter_conexao
+from dados import obter_tabela, versao_tabela
+from exportacao import exportar_vagas, formatos_disponiveis, FORMATOS_EXPORTACAO
+from instrumentacao import cronometrado
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -36,9 +59,13 @@ logger = logging.getLogger(__name__)
 
 # ==================== CACHE E CARREGAMENTO ====================
 
-@st.cache_data(ttl=600)
+@cronometrado(categoria="carga")
 def carregar_dados():
-    """Carrega dados do banco com validação robusta"""
+    """
+    Carrega relatório e TLP do armazenamento compartilhado do processo
+
+    As tabelas só são relidas do banco quando mudam (ver dados.obter_tabela).
+    """
 
     # Valida existência do banco
     if not os.path.exists(DB_PATH):
@@ -49,11 +76,10 @@ def carregar_dados():
         return None, None
 
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = obter_conexao(DB_PATH)
 
         # Testa conexão
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
         tabelas = [row[0] for row in cursor.fetchall()]
 
         # Valida tabelas necessárias
@@ -63,17 +89,13 @@ def carregar_dados():
         if tabelas_faltando:
             st.error(f"❌ Tabelas faltando no banco: {', '.join(tabelas_faltando)}")
             st.info(f"📊 Tabelas disponíveis: {', '.join(tabelas)}")
-            conn.close()
             st.stop()
             return None, None
 
-        # Carrega dados
-        relatorio = pd.read_sql_query("SELECT * FROM relatorio_oris", conn)
-        tlp = pd.read_sql_query("SELECT * FROM tlp", conn)
-
-        conn.close()
+        # Cópia única por processo, compartilhada com as outras páginas
+        relatorio = obter_tabela("relatorio_oris", DB_PATH)
+        tlp = obter_tabela("tlp", DB_PATH)
 
-        logger.info(f"✅ Dados carregados: {len(relatorio)} funcionários, {len(tlp)} registros TLP")
         return relatorio, tlp
 
     except sqlite3.Error as e:
@@ -87,205 +109,143 @@ def carregar_dados():
         st.stop()
         return None, None
 
-@st.cache_data
-def criar_lookup_tlp(tlp):
-    """Cria dicionário para lookup rápido"""
-    lookup = {}
-    for _, row in tlp.iterrows():
-        key = (row['contrato'], row['unidade'], row['cargo'], row['carga_hora'])
-        lookup[key] = int(row['quantidade_ideal'])
-    return lookup
+@cronometrado(categoria="processamento")
+@st.cache_resource(max_entries=2)
+def obter_indice_ativos(_relatorio, versao):
+    """
+    Índice de headcount construído uma vez por versão dos dados
+
+    O relatório não é hasheado (parâmetro com '_'); a chave do cache é a
+    versão da tabela relatorio_oris.
+    """
+    return IndiceAtivos(_relatorio)
+
+@cronometrado(categoria="processamento")
+@st.cache_resource(max_entries=2)
+def obter_vagas_relatorio(_relatorio, versao):
+    """Vagas detectadas no relatório, calculadas uma vez por versão da tabela"""
+    return detectar_vagas(_relatorio)
+
+@cronometrado(categoria="processamento")
+@st.cache_resource(max_entries=2)
+def obter_indice_tlp(_tlp, versao):
+    """Índice da TLP construído uma vez por versão da tabela (sem hashear a TLP)"""
+    return IndiceTLP(_tlp)
 
 # ==================== PROCESSAMENTO ====================
 
-def processar_data(data_str):
-    """Converte string de data para datetime - VERSÃO OTIMIZADA"""
-    if pd.isna(data_str) or data_str == '' or data_str is None:
-        return None
-    
-    try:
-        if isinstance(data_str, datetime):
-            return data_str
-        
-        # Converte para string
-        data_str = str(data_str).strip()
-        
-        # Tenta formato brasileiro primeiro (DD/MM/YYYY)
-        if '/' in data_str:
-            try:
-                return pd.to_datetime(data_str, format='%d/%m/%Y', errors='coerce')
-            except:
-                pass
-        
-        # Tenta formato ISO (YYYY-MM-DD)
-        if '-' in data_str:
-            try:
-                return pd.to_datetime(data_str, format='%Y-%m-%d', errors='coerce')
-            except:
-                pass
-        
-        # Fallback: deixa pandas inferir com dayfirst=True
-        data_convertida = pd.to_datetime(data_str, dayfirst=True, errors='coerce')
-        
-        if pd.isna(data_convertida):
-            return None
-            
-        return data_convertida
-        
-    except Exception as e:
-        return None
-
-    except Exception as e:
-        logger.warning(f"Erro ao processar data '{data_str}': {e}")
-        return None
-
-def contar_ativos(relatorio, filtros):
-    """Conta funcionários ativos com filtros específicos"""
-    df_filtrado = relatorio[
-        (relatorio["Nome Fantasia"] == filtros["contrato"]) &
-        (relatorio["Centro custo"] == filtros["unidade"]) &
-        (relatorio["Cargo"] == filtros["cargo"]) &
-        (relatorio["Situação"].isin(["01-ATIVO", "18-ATESTADO MÉDICO"]))
-    ]
-    
-    if filtros.get("carga_horaria") is not None:
-        df_filtrado = df_filtrado[
-            df_filtrado["Carga Horária Semanal"] == filtros["carga_horaria"]
-        ]
-    
-    return len(df_filtrado)
-
-def verificar_vaga_na_tlp(pessoa, tlp, relatorio_completo):
+@cronometrado(categoria="processamento")
+def verificar_vaga_na_tlp(pessoa, tlp, relatorio_completo, indice_ativos=None, indice_tlp=None):
     """Verifica se a vaga está prevista na TLP"""
+    if indice_tlp is None:
+        indice_tlp = obter_indice_tlp(tlp, versao_tabela("tlp", DB_PATH))
+    if indice_ativos is None:
+        indice_ativos = obter_indice_ativos(relatorio_completo, versao_tabela("relatorio_oris", DB_PATH))
     
-    contrato = pessoa.get("Nome Fantasia")
-    unidade = pessoa.get("Centro custo")
-    cargo = pessoa.get("Cargo")
-    carga_horaria = pessoa.get("Carga Horária Semanal")
-    
-    lookup_tlp = criar_lookup_tlp(tlp)
-    chave_especifica = (contrato, unidade, cargo, carga_horaria)
-    
-    quantidade_ativos_total = contar_ativos(relatorio_completo, {
-        "contrato": contrato,
-        "unidade": unidade,
-        "cargo": cargo
-    })
-    
-    if chave_especifica not in lookup_tlp:
-        quantidade_ideal_total = sum(
-            v for k, v in lookup_tlp.items()
-            if k[0] == contrato and k[1] == unidade and k[2] == cargo
-        )
-        
-        return {
-            "vaga_prevista": False,
-            "quantidade_ideal": 0,
-            "quantidade_ideal_total": quantidade_ideal_total,
-            "quantidade_atual": quantidade_ativos_total,
-            "quantidade_atual_mesma_carga": 0,
-            "deficit": 0,
-            "pode_aprovar": True,
-            "motivo": "⚠️ Vaga não prevista na TLP (carga horária específica)",
-            "observacao": f"Existem {quantidade_ativos_total} ativos no cargo (previsão total: {quantidade_ideal_total})"
-        }
-    
-    quantidade_ideal = lookup_tlp[chave_especifica]
-    
-    quantidade_ideal_total = sum(
-        v for k, v in lookup_tlp.items()
-        if k[0] == contrato and k[1] == unidade and k[2] == cargo
-    )
-    
-    quantidade_atual_mesma_carga = contar_ativos(relatorio_completo, {
-        "contrato": contrato,
-        "unidade": unidade,
-        "cargo": cargo,
-        "carga_horaria": carga_horaria
-    })
-    
-    deficit = quantidade_ideal - quantidade_atual_mesma_carga
-    
-    if deficit > 0:
-        motivo = f"✅ Vaga aprovável - Déficit de {deficit} funcionário(s)"
-    elif deficit == 0:
-        motivo = f"⚠️ Quadro completo ({quantidade_atual_mesma_carga}/{quantidade_ideal})"
-    else:
-        motivo = f"⚠️ Excedente de {abs(deficit)} funcionário(s) ({quantidade_atual_mesma_carga}/{quantidade_ideal})"
-    
-    return {
-        "vaga_prevista": True,
-        "quantidade_ideal": quantidade_ideal,
-        "quantidade_ideal_total": quantidade_ideal_total,
-        "quantidade_atual": quantidade_ativos_total,
-        "quantidade_atual_mesma_carga": quantidade_atual_mesma_carga,
-        "deficit": deficit,
-        "pode_aprovar": True,
-        "motivo": motivo,
-        "observacao": f"Total no cargo: {quantidade_ativos_total} ativos (previsão: {quantidade_ideal_total})"
-    }
+    return verificar_vaga(pessoa, indice_tlp, indice_ativos)
 
+@cronometrado(categoria="processamento")
 def processar_demissoes_e_afastamentos(relatorio):
-    """Identifica demissões e afastamentos"""
-    vagas_pendentes = []
-    
-    for idx, row in relatorio.iterrows():
-        motivo = None
-        tipo = None
-        data_evento = None
-        dias_afastamento = None
-        
-        data_rescisao = processar_data(row.get("Dt Rescisão"))
-        if data_rescisao and data_rescisao >= DATA_MINIMA_VAGAS:
-            motivo = "Demissão"
-            tipo = "demissao"
-            data_evento = data_rescisao.strftime("%d/%m/%Y")
-            dias_afastamento = None
-        else:
-            situacao = row.get("Situação")
-            
-            if situacao not in ["01-ATIVO", "99-Demitido", "18-ATESTADO MÉDICO"]:
-                data_situacao = None
-                colunas_data = ["Dt Início Situação", "Dt Inicio Situação", "Dt Situação"]
-                
-                for col in colunas_data:
-                    if col in row:
-                        data_situacao = processar_data(row.get(col))
-                        if data_situacao:
-                            break
-                
-                if data_situacao and data_situacao >= DATA_MINIMA_VAGAS:
-                    motivo = f"Afastamento - {situacao or 'Não informado'}"
-                    tipo = "afastamento"
-                    data_evento = data_situacao.strftime("%d/%m/%Y")
-                    
-                    try:
-                        dias_afastamento = (datetime.now().date() - data_situacao.date()).days
-                    except:
-                        dias_afastamento = None
-        
-        if motivo:
-            vagas_pendentes.append({
-                "nome": row.get("Nome", ""),
-                "cargo": row.get("Cargo", ""),
-                "centro_custo": row.get("Centro custo", ""),
-                "nome_fantasia": row.get("Nome Fantasia", ""),
-                "carga_horaria": row.get("Carga Horária Semanal", ""),
-                "situacao": row.get("Situação", ""),
-                "motivo": motivo,
-                "tipo": tipo,
-                "data_evento": data_evento,
-                "dias_afastamento": dias_afastamento,
-                "row_data": row
-            })
-    
-    logger.info(f"Identificadas {len(vagas_pendentes)} vagas pendentes")
-    return vagas_pendentes
+    """Identifica demissões e afastamentos (motor vetorizado)"""
+    vagas = detectar_vagas(relatorio)
+    return vagas_para_registros(vagas, relatorio)
 
 # ==================== INTERFACE ====================
 
-def renderizar_card_vaga(vaga, vaga_id, info_tlp):
-    """Renderiza card individual de vaga"""
+# Chave do fragmento com os contadores do topo da página
+FRAGMENTO_ESTATISTICAS = "vagas_estatisticas"
+
+# Decisões dos botões do card: ação -> (função de gestao_vagas, mensagem)
+DECISOES_CARD = {
+    'aprovar': (lambda vaga_id: aprovar_vaga(vaga_id, usuario="Admin"), "Vaga aprovada!"),
+    'rejeitar': (lambda vaga_id: rejeitar_vaga(vaga_id, usuario="Admin"), "Vaga rejeitada!"),
+    'cancelar': (
+        lambda vaga_id: cancelar_vaga_aprovada(vaga_id, usuario="Admin", observacao="Cancelada pelo usuário"),
+        "Vaga cancelada!"
+    ),
+    'desfazer': (desfazer_decisao, "Decisão desfeita!"),
+}
+
+@st.fragment(key=FRAGMENTO_ESTATISTICAS)
+@cronometrado(categoria="render")
+def renderizar_estatisticas():
+    """Contadores de vagas (fragmento: recalculado sozinho após cada decisão nos cards)"""
+    stats = estatisticas_vagas()
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    total_pendentes = stats.get('por_status', {}).get('pendente', 0)
+    total_aprovadas = stats.get('total_aprovadas', 0)
+    total_rejeitadas = stats.get('total_rejeitadas', 0)
+    total_canceladas = stats.get('total_canceladas', 0)
+    taxa_aprov = stats.get('taxa_aprovacao', 0)
+
+    with col1:
+        st.metric("⏳ Pendentes", total_pendentes)
+    with col2:
+        st.metric("✅ Aprovadas", total_aprovadas)
+    with col3:
+        st.metric("⛔ Canceladas", total_canceladas)
+    with col4:
+        st.metric("❌ Rejeitadas", total_rejeitadas)
+    with col5:
+        st.metric("📊 Taxa Aprovação", f"{taxa_aprov:.1f}%")
+
+def _decidir_vaga(chave, vaga_id, acao):
+    """
+    Callback dos botões do card: grava a decisão e reexecuta só o card e os contadores
+
+    O resultado fica em session_state para o card mostrar no próprio rerun.
+    """
+    executar, mensagem = DECISOES_CARD[acao]
+    st.session_state[f"{chave}_decisao"] = (True, mensagem) if executar(vaga_id) else (
+        False, "Não foi possível registrar a decisão (a vaga pode ter sido decidida por outro usuário)"
+    )
+    st.rerun([chave, FRAGMENTO_ESTATISTICAS])
+
+def _aprovar_vaga_relatorio(chave, vaga, info_tlp):
+    """Callback do Aprovar de uma vaga do relatório: salva no banco e o card passa a ser da vaga salva"""
+    resultado = aprovar_e_salvar_vaga(vaga, info_tlp, usuario="Admin")
+    if resultado == "DUPLICADA":
+        st.session_state[f"{chave}_decisao"] = (False, "⚠️ Esta vaga já foi aprovada anteriormente!")
+    elif resultado:
+        st.session_state[f"{chave}_id"] = resultado
+        st.session_state[f"{chave}_decisao"] = (True, f"Vaga aprovada e salva com ID {resultado}!")
+    else:
+        st.session_state[f"{chave}_decisao"] = (False, "Erro ao aprovar vaga")
+    st.rerun([chave, FRAGMENTO_ESTATISTICAS])
+
+def renderizar_card_vaga(vaga, vaga_id, info_tlp, status=None):
+    """
+    Renderiza card individual de vaga
+
+    Cada card é um fragmento próprio: aprovar, rejeitar, cancelar ou desfazer
+    reexecuta só esse card e os contadores, não a página inteira.
+
+    Args:
+        vaga: Dict com dados da vaga
+        vaga_id: ID da vaga no banco ou None para vagas vindas do relatório
+        info_tlp: Dict com o resultado da análise TLP
+        status: Status já carregado da vaga (evita nova consulta ao banco)
+    """
+    if vaga_id:
+        chave = f"card_vaga_{vaga_id}"
+    else:
+        chave = f"card_vaga_relatorio_{vaga['nome']}_{vaga['cargo']}"
+
+    st.fragment(_card_vaga, key=chave)(chave, vaga, vaga_id, info_tlp, status)
+
+@cronometrado(nome="renderizar_card_vaga", categoria="render")
+def _card_vaga(chave, vaga, vaga_id, info_tlp, status):
+    """Corpo do fragmento de renderizar_card_vaga()"""
+
+    # Decisão tomada neste card: o status é relido do banco, pois os
+    # argumentos do fragmento são os da última execução da página inteira
+    decisao = st.session_state.pop(f"{chave}_decisao", None)
+    if decisao is not None:
+        status = None
+    if not vaga_id:
+        vaga_id = st.session_state.get(f"{chave}_id")
     
     col_info, col_tlp, col_acoes = st.columns([2, 2, 1])
     
@@ -301,7 +261,7 @@ def renderizar_card_vaga(vaga, vaga_id, info_tlp):
         **Motivo:** {vaga['motivo']}  
         **Data:** {vaga['data_evento']}  
         {dias_text}
-        **Carga horária:** {vaga['carga_horaria']}h/semana  
+        **Carga horária:** {arredondar_carga_horaria(vaga['carga_horaria'])}h/semana  
         **Contrato:** {vaga['nome_fantasia']}
         """)
     
@@ -326,81 +286,65 @@ def renderizar_card_vaga(vaga, vaga_id, info_tlp):
     
     with col_acoes:
         st.markdown("### 🎯 Ação")
+
+        if decisao is not None:
+            sucesso, mensagem = decisao
+            (st.success if sucesso else st.warning)(mensagem)
         
-        # Verifica se vaga já existe no banco
-        vaga_banco = listar_vagas().query(f"id == {vaga_id}") if vaga_id else pd.DataFrame()
+        # Status da vaga no banco (só consulta se não veio da listagem)
+        if vaga_id and status is None:
+            status = buscar_vagas_por_ids([vaga_id]).get(int(vaga_id), {}).get('status')
         
-        if not vaga_banco.empty:
-            status = vaga_banco.iloc[0]['status']
-
+        if vaga_id and status is not None:
             if status == 'aprovado':
                 st.success("✅ Aprovada")
                 col_btn1, col_btn2 = st.columns(2)
 
                 with col_btn1:
-                    if st.button("⛔ Cancelar", key=f"vaga_{vaga_id}_cancelar", use_container_width=True):
-                        if cancelar_vaga_aprovada(vaga_id, usuario="Admin", observacao="Cancelada pelo usuário"):
-                            st.success("Vaga cancelada!")
-                            st.rerun()
+                    st.button("⛔ Cancelar", key=f"vaga_{vaga_id}_cancelar", use_container_width=True,
+                              on_click=_decidir_vaga, args=(chave, vaga_id, 'cancelar'))
 
                 with col_btn2:
-                    if st.button("Desfazer", key=f"vaga_{vaga_id}_desfazer", use_container_width=True):
-                        if desfazer_decisao(vaga_id):
-                            st.success("Decisão desfeita!")
-                            st.rerun()
+                    st.button("Desfazer", key=f"vaga_{vaga_id}_desfazer", use_container_width=True,
+                              on_click=_decidir_vaga, args=(chave, vaga_id, 'desfazer'))
 
             elif status == 'cancelado':
                 st.warning("⛔ Cancelada")
-                if st.button("Desfazer", key=f"vaga_{vaga_id}_desfazer"):
-                    if desfazer_decisao(vaga_id):
-                        st.success("Decisão desfeita!")
-                        st.rerun()
+                st.button("Desfazer", key=f"vaga_{vaga_id}_desfazer",
+                          on_click=_decidir_vaga, args=(chave, vaga_id, 'desfazer'))
 
             elif status == 'rejeitado':
                 st.error("❌ Rejeitada")
-                if st.button("Desfazer", key=f"vaga_{vaga_id}_desfazer"):
-                    if desfazer_decisao(vaga_id):
-                        st.success("Decisão desfeita!")
-                        st.rerun()
+                st.button("Desfazer", key=f"vaga_{vaga_id}_desfazer",
+                          on_click=_decidir_vaga, args=(chave, vaga_id, 'desfazer'))
 
             else:
                 # Pendente
                 col_btn1, col_btn2 = st.columns(2)
 
                 with col_btn1:
-                    if st.button("✅ Aprovar",
-                               key=f"vaga_{vaga_id}_aprovar",
-                               disabled=not info_tlp["pode_aprovar"],
-                               use_container_width=True):
-                        if aprovar_vaga(vaga_id, usuario="Admin"):
-                            st.success("Vaga aprovada!")
-                            st.rerun()
+                    st.button("✅ Aprovar",
+                              key=f"vaga_{vaga_id}_aprovar",
+                              disabled=not info_tlp["pode_aprovar"],
+                              use_container_width=True,
+                              on_click=_decidir_vaga, args=(chave, vaga_id, 'aprovar'))
 
                 with col_btn2:
-                    if st.button("❌ Rejeitar",
-                               key=f"vaga_{vaga_id}_rejeitar",
-                               use_container_width=True):
-                        if rejeitar_vaga(vaga_id, usuario="Admin"):
-                            st.success("Vaga rejeitada!")
-                            st.rerun()
+                    st.button("❌ Rejeitar",
+                              key=f"vaga_{vaga_id}_rejeitar",
+                              use_container_width=True,
+                              on_click=_decidir_vaga, args=(chave, vaga_id, 'rejeitar'))
         else:
             # Vaga vinda do relatório (não está no banco ainda)
             col_btn1, col_btn2 = st.columns(2)
 
             with col_btn1:
-                if st.button("✅ Aprovar",
-                           key=f"vaga_relatorio_{vaga['nome']}_{vaga['cargo']}_aprovar",
-                           disabled=not info_tlp["pode_aprovar"],
-                           use_container_width=True):
-                    # Aprova e salva diretamente no banco
-                    resultado = aprovar_e_salvar_vaga(vaga, info_tlp, usuario="Admin")
-                    if resultado == "DUPLICADA":
-                        st.warning("⚠️ Esta vaga já foi aprovada anteriormente!")
-                    elif resultado:
-                        st.success(f"Vaga aprovada e salva com ID {resultado}!")
-                        st.rerun()
-                    else:
-                        st.error("Erro ao aprovar vaga")
+                # Aprova e salva diretamente no banco
+                st.button("✅ Aprovar",
+                          key=f"vaga_relatorio_{vaga['nome']}_{vaga['cargo']}_aprovar",
+                          disabled=not info_tlp["pode_aprovar"],
+                          use_container_width=True,
+                          on_click=_aprovar_vaga_relatorio, args=(chave, vaga, info_tlp))
 
             with col_btn2:
                 if st.button("❌ Rejeitar",
@@ -408,7 +352,237 @@ def renderizar_card_vaga(vaga, vaga_id, info_tlp):
                            use_container_width=True):
                     # Não faz nada - apenas ignora a vaga
                     st.info("Vaga ignorada (não será salva no banco)")
-                    # Não precisa rerun, apenas mostra a mensagem
+                    # O clique já reexecuta só este card
+
+# ==================== PAGINAÇÃO ====================
+
+def carregar_pagina_vagas(prefixo, filtros):
+    """
+    Página atual de listar_vagas() com paginação por cursor (keyset)
+
+    A pilha de cursores fica em session_state[f"{prefixo}_cursores"] e
+    reinicia quando os filtros mudam.
+
+    Returns:
+        Tupla (vagas_df, cursores, tem_proxima)
+    """
+    assinatura_filtros = repr(sorted(filtros.items()))
+    if st.session_state.get(f"{prefixo}_filtros") != assinatura_filtros:
+        st.session_state[f"{prefixo}_filtros"] = assinatura_filtros
+        st.session_state[f"{prefixo}_cursores"] = [None]
+
+    cursores = st.session_state[f"{prefixo}_cursores"]
+
+    # Busca uma linha a mais para saber se existe próxima página
+    vagas_df = listar_vagas(**filtros, limite=VAGAS_POR_PAGINA + 1, cursor=cursores[-1])
+
+    # Página esvaziada por decisões (ex.: todas as pendentes da última
+    # página aprovadas): volta para a anterior
+    while vagas_df.empty and len(cursores) > 1:
+        cursores.pop()
+        vagas_df = listar_vagas(**filtros, limite=VAGAS_POR_PAGINA + 1, cursor=cursores[-1])
+
+    tem_proxima = len(vagas_df) > VAGAS_POR_PAGINA
+    return vagas_df.head(VAGAS_POR_PAGINA), cursores, tem_proxima
+
+def renderizar_paginacao(prefixo, vagas_df, cursores, tem_proxima, total_vagas):
+    """Botões Anterior/Próxima e indicador de página de carregar_pagina_vagas()"""
+    pagina = len(cursores)
+    total_paginas = max(1, -(-total_vagas // VAGAS_POR_PAGINA))
+
+    col_ant, col_pag, col_prox = st.columns([1, 3, 1])
+    with col_ant:
+        st.button(
+            "◀ Anterior",
+            key=f"{prefixo}_anterior",
+            disabled=pagina == 1,
+            on_click=cursores.pop,
+            use_container_width=True
+        )
+    with col_pag:
+        st.caption(f"Página {pagina} de {total_paginas}")
+    with col_prox:
+        st.button(
+            "Próxima ▶",
+            key=f"{prefixo}_proxima",
+            disabled=not tem_proxima,
+            on_click=cursores.append,
+            args=(cursor_pagina(vagas_df),),
+            use_container_width=True
+        )
+
+# ==================== REVISÃO EM LOTE ====================
+
+# Colunas exibidas na tabela de revisão em lote
+COLUNAS_REVISAO_LOTE = {
+    'id': 'ID',
+    'nome': 'Nome',
+    'cargo': 'Cargo',
+    'centro_custo': 'Unidade',
+    'tipo_vaga': 'Tipo',
+    'data_evento': 'Data',
+    'deficit': 'Déficit'
+}
+
+@cronometrado(categoria="render")
+def renderizar_revisao_em_lote():
+    """Tabela com seleção múltipla para aprovar, rejeitar ou cancelar várias vagas de uma vez"""
+    
+    # Resultado da última ação (sobrevive ao rerun que atualiza a tabela)
+    resumo = st.session_state.pop('revisao_lote_resumo', None)
+    if resumo:
+        st.success(resumo)
+    
+    alvo = st.sidebar.radio("Revisar", ["Pendentes", "Aprovadas"])
+    status = 'pendente' if alvo == "Pendentes" else 'aprovado'
+    
+    tipo_filtro = st.sidebar.radio("Tipo", ["Todos", "Demissões", "Afastamentos"])
+    tipo_map = {"Todos": None, "Demissões": "demissao", "Afastamentos": "afastamento"}
+    
+    centro_filtro = st.sidebar.selectbox("Unidade", ["Todas"] + listar_centros_custo_vagas())
+    
+    filtros = {
+        'status': status,
+        'tipo_vaga': tipo_map[tipo_filtro],
+        'centro_custo': None if centro_filtro == "Todas" else centro_filtro
+    }
+    vagas_df, cursores, tem_proxima = carregar_pagina_vagas("revisao_lote", filtros)
+    
+    if vagas_df.empty:
+        st.info("Nenhuma vaga para revisar com os filtros selecionados")
+        return
+    
+    total_vagas = contar_vagas(**filtros)
+    st.subheader(f"🗂️ Revisão em Lote - {total_vagas} vaga(s) {alvo.lower()}")
+    renderizar_paginacao("revisao_lote", vagas_df, cursores, tem_proxima, total_vagas)
+    
+    # Versão da tabela: muda a cada ação, para a seleção nunca passar para
+    # as vagas que ocupam as linhas das que acabaram de ser decididas
+    versao = st.session_state.get('revisao_lote_versao', 0)
+    
+    selecionar_todas = st.checkbox("Selecionar todas da página", key=f"revisao_lote_todas_{versao}")
+    
+    tabela = vagas_df[list(COLUNAS_REVISAO_LOTE)].rename(columns=COLUNAS_REVISAO_LOTE)
+    tabela.insert(0, "Selecionar", selecionar_todas)
+    
+    # A chave inclui os IDs da página: outra página (ou a mesma página com
+    # outras vagas) começa sem seleção
+    ids_pagina = zlib.crc32(vagas_df['id'].to_numpy(dtype=np.int64).tobytes())
+    editada = st.data_editor(
+        tabela,
+        hide_index=True,
+        use_container_width=True,
+        disabled=list(COLUNAS_REVISAO_LOTE.values()),
+        key=f"revisao_lote_{versao}_{ids_pagina}_{selecionar_todas}"
+    )
+    
+    ids = editada.loc[editada["Selecionar"], "ID"].astype(int).tolist()
+    observacao = st.text_input("Observação (opcional)")
+    
+    resultado = None
+    acao = None
+    
+    if status == 'pendente':
+        col_aprovar, col_rejeitar = st.columns(2)
+        with col_aprovar:
+            if st.button(f"✅ Aprovar selecionadas ({len(ids)})", disabled=not ids, use_container_width=True):
+                resultado, acao = aprovar_vagas(ids, usuario="Admin"), "aprovada(s)"
+        with col_rejeitar:
+            if st.button(f"❌ Rejeitar selecionadas ({len(ids)})", disabled=not ids, use_container_width=True):
+                resultado, acao = rejeitar_vagas(ids, usuario="Admin", observacao=observacao or None), "rejeitada(s)"
+    else:
+        if st.button(f"⛔ Cancelar selecionadas ({len(ids)})", disabled=not ids, use_container_width=True):
+            resultado, acao = cancelar_vagas_aprovadas(
+                ids, usuario="Admin", observacao=observacao or "Cancelada pelo usuário"
+            ), "cancelada(s)"
+    
+    # Todas as vagas do filtro (todas as páginas), resolvidas na própria transação
+    with st.expander(f"⚡ Aplicar a todas as {total_vagas} vaga(s) do filtro"):
+        confirmado = st.checkbox(
+            f"Confirmo a decisão para todas as {total_vagas} vaga(s) {alvo.lower()} do filtro atual",
+            key=f"revisao_lote_confirmar_{versao}"
+        )
+        if status == 'pendente':
+            col_aprovar, col_rejeitar = st.columns(2)
+            with col_aprovar:
+                if st.button("✅ Aprovar todas", disabled=not confirmado, use_container_width=True):
+                    resultado, acao = aprovar_vagas(None, usuario="Admin", filtros=filtros), "aprovada(s)"
+            with col_rejeitar:
+                if st.button("❌ Rejeitar todas", disabled=not confirmado, use_container_width=True):
+                    resultado, acao = rejeitar_vagas(
+                        None, usuario="Admin", observacao=observacao or None, filtros=filtros
+                    ), "rejeitada(s)"
+        else:
+            if st.button("⛔ Cancelar todas", disabled=not confirmado, use_container_width=True):
+                resultado, acao = cancelar_vagas_aprovadas(
+                    None, usuario="Admin", observacao=observacao or "Cancelada pelo usuário", filtros=filtros
+                ), "cancelada(s)"
+    
+    if resultado is not None:
+        sucesso = sum(resultado.values())
+        falhas = [str(vaga_id) for vaga_id, ok in resultado.items() if not ok]
+        texto = f"{sucesso} vaga(s) {acao}."
+        if falhas:
+            texto += f" Não processadas (já decididas ou inexistentes): {', '.join(falhas)}"
+        st.session_state.revisao_lote_resumo = texto
+        st.session_state.revisao_lote_versao = versao + 1
+        st.rerun()
+
+# ==================== SINCRONIZAÇÃO ====================
+
+# Intervalo (s) entre as atualizações do progresso da sincronização
+INTERVALO_PROGRESSO_SINCRONIZACAO = 1.0
+
+def _fracao_sincronizacao(etapa, estatisticas):
+    """Fração concluída para a barra de progresso (detecção até 50%, gravação de 60% a 100%)"""
+    if etapa == 'deteccao':
+        return 0.5 * estatisticas['linhas_lidas'] / max(estatisticas['linhas_relatorio'], 1)
+    if etapa == 'comparacao':
+        return 0.6
+    if etapa == 'insercao':
+        return 0.6 + 0.4 * estatisticas['inseridas'] / max(estatisticas['novas'], 1)
+    return 0.0
+
+@st.fragment(run_every=INTERVALO_PROGRESSO_SINCRONIZACAO)
+def acompanhar_sincronizacao():
+    """
+    Progresso da sincronização em segundo plano
+
+    Só este trecho é reexecutado a cada intervalo; a página inteira é
+    recarregada uma vez ao final, para mostrar as vagas novas.
+    """
+    tarefa = tarefa_sincronizacao(DB_PATH)
+    if tarefa is None:
+        return
+
+    estado = tarefa.como_dict()
+    if not tarefa.em_andamento:
+        st.rerun(scope="app")
+
+    estatisticas = estado['estatisticas']
+    st.progress(
+        min(_fracao_sincronizacao(estado['etapa'], estatisticas), 1.0),
+        text=f"🔄 Sincronizando... {estado['duracao_s']:.0f}s"
+    )
+    st.caption(
+        f"{estatisticas.get('linhas_lidas', 0)}/{estatisticas.get('linhas_relatorio', '?')} linhas lidas · "
+        f"{estatisticas.get('vagas_detectadas', 0)} vagas detectadas · "
+        f"{estatisticas.get('inseridas', 0)}/{estatisticas.get('novas', '?')} gravadas"
+    )
+
+def mostrar_resultado_sincronizacao(resultado):
+    """Mensagem com o resultado de uma sincronização concluída"""
+    if 'erro' in resultado:
+        st.error(f"Erro na sincronização: {resultado['erro']}")
+    else:
+        st.success(f"""
+        ✅ Sincronização concluída!
+        - {resultado['novas']} novas vagas
+        - {resultado['atualizadas']} atualizadas
+        - {resultado['total_processadas']} processadas
+        """)
+        if resultado.get('ignoradas'):
+            st.warning(f"⚠️ {resultado['ignoradas']} vaga(s) ignorada(s) por dados obrigatórios ausentes")
 
 def run():
     """Função principal"""
@@ -425,41 +599,28 @@ def run():
         st.stop()
     
     # ==================== SINCRONIZAÇÃO ====================
-    if st.sidebar.button("🔄 Sincronizar Vagas do Relatório"):
-        with st.spinner("Sincronizando..."):
-            resultado = sincronizar_vagas_pendentes(relatorio, tlp)
-            
-            if 'erro' in resultado:
-                st.error(f"Erro na sincronização: {resultado['erro']}")
-            else:
-                st.success(f"""
-                ✅ Sincronização concluída!
-                - {resultado['novas']} novas vagas
-                - {resultado['atualizadas']} atualizadas
-                - {resultado['total_processadas']} processadas
-                """)
+    # Roda em segundo plano: as aprovações continuam enquanto sincroniza
+    tarefa = tarefa_sincronizacao(DB_PATH)
+    if st.sidebar.button(
+        "🔄 Sincronizar Vagas do Relatório",
+        disabled=tarefa is not None and tarefa.em_andamento
+    ):
+        tarefa, iniciada = iniciar_sincronizacao(relatorio, tlp, DB_PATH)
+        if not iniciada:
+            st.sidebar.info("⏳ Já existe uma sincronização em andamento")
+
+    if tarefa is not None:
+        if tarefa.em_andamento:
+            # Quem acompanhou o progresso vê o resultado ao final
+            st.session_state.sincronizacao_acompanhada = tarefa.iniciada_em
+            with st.sidebar:
+                acompanhar_sincronizacao()
+        elif st.session_state.get('sincronizacao_acompanhada') == tarefa.iniciada_em:
+            del st.session_state['sincronizacao_acompanhada']
+            mostrar_resultado_sincronizacao(tarefa.resultado)
     
     # ==================== ESTATÍSTICAS ====================
-    stats = estatisticas_vagas()
-
-    col1, col2, col3, col4, col5 = st.columns(5)
-
-    total_pendentes = stats.get('por_status', {}).get('pendente', 0)
-    total_aprovadas = stats.get('total_aprovadas', 0)
-    total_rejeitadas = stats.get('total_rejeitadas', 0)
-    total_canceladas = stats.get('total_canceladas', 0)
-    taxa_aprov = stats.get('taxa_aprovacao', 0)
-
-    with col1:
-        st.metric("⏳ Pendentes", total_pendentes)
-    with col2:
-        st.metric("✅ Aprovadas", total_aprovadas)
-    with col3:
-        st.metric("⛔ Canceladas", total_canceladas)
-    with col4:
-        st.metric("❌ Rejeitadas", total_rejeitadas)
-    with col5:
-        st.metric("📊 Taxa Aprovação", f"{taxa_aprov:.1f}%")
+    renderizar_estatisticas()
     
     st.markdown("---")
     
@@ -468,7 +629,7 @@ def run():
     
     modo_visualizacao = st.sidebar.radio(
         "Modo",
-        ["Vagas Cadastradas", "Buscar no Relatório"]
+        ["Vagas Cadastradas", "Revisão em Lote", "Buscar no Relatório"]
     )
     
     if modo_visualizacao == "Vagas Cadastradas":
@@ -486,12 +647,32 @@ def run():
             "Rejeitadas": "rejeitado"
         }
         
-        vagas_df = listar_vagas(status=status_map[status_filtro])
+        tipo_filtro = st.sidebar.radio("Tipo", ["Todos", "Demissões", "Afastamentos"])
+        tipo_map = {"Todos": None, "Demissões": "demissao", "Afastamentos": "afastamento"}
+
+        centro_filtro = st.sidebar.selectbox("Unidade", ["Todas"] + listar_centros_custo_vagas())
+
+        periodo = st.sidebar.date_input("Período do evento", value=[], format="DD/MM/YYYY")
+        texto_filtro = st.sidebar.text_input("Buscar (nome, cargo ou unidade)")
+
+        filtros = {
+            'status': status_map[status_filtro],
+            'tipo_vaga': tipo_map[tipo_filtro],
+            'centro_custo': None if centro_filtro == "Todas" else centro_filtro,
+            'data_inicio': periodo[0] if len(periodo) > 0 else None,
+            'data_fim': periodo[1] if len(periodo) > 1 else None,
+            'texto': texto_filtro or None
+        }
+
+        vagas_df, cursores, tem_proxima = carregar_pagina_vagas("vagas", filtros)
         
         if vagas_df.empty:
             st.info("Nenhuma vaga cadastrada com os filtros selecionados")
         else:
-            st.subheader(f"📋 {len(vagas_df)} Vaga(s) Encontrada(s)")
+            total_vagas = contar_vagas(**filtros)
+
+            st.subheader(f"📋 {total_vagas} Vaga(s) Encontrada(s)")
+            renderizar_paginacao("vagas", vagas_df, cursores, tem_proxima, total_vagas)
             
             # Agrupa por centro de custo
             for centro in vagas_df['centro_custo'].unique():
@@ -525,56 +706,64 @@ def run():
                             'observacao': f"Total no cargo: {row['quantidade_atual']} ativos (previsão: {row['quantidade_ideal']})"
                         }
                         
-                        renderizar_card_vaga(vaga, row['id'], info_tlp)
+                        renderizar_card_vaga(vaga, row['id'], info_tlp, status=row['status'])
                         st.markdown("---")
     
+    elif modo_visualizacao == "Revisão em Lote":
+        renderizar_revisao_em_lote()
+    
     else:
         # Busca no relatório ORIS (modo antigo)
         st.info("💡 Este modo busca vagas diretamente no relatório ORIS (vagas aprovadas/rejeitadas não aparecem aqui)")
 
-        vagas_relatorio = processar_demissoes_e_afastamentos(relatorio)
+        # DataFrame compacto das vagas, compartilhado por versão do relatório
+        vagas_relatorio = obter_vagas_relatorio(relatorio, versao_tabela("relatorio_oris", DB_PATH))
+
+        # Filtros como máscaras sobre o DataFrame (sem copiar as vagas a cada passo)
+        mascara = np.ones(len(vagas_relatorio), dtype=bool)
 
         # FILTRA VAGAS JÁ CADASTRADAS (aprovadas, pendentes ou rejeitadas)
-        vagas_cadastradas_df = listar_vagas()  # Busca todas as vagas do banco
-
-        if not vagas_cadastradas_df.empty:
-            # Cria conjunto de chaves (nome, cargo, centro_custo) das vagas já cadastradas
-            vagas_cadastradas_keys = set(
-                vagas_cadastradas_df.apply(
-                    lambda row: (row['nome'], row['cargo'], row['centro_custo']),
-                    axis=1
-                )
-            )
+        # Só as chaves (nome, cargo, centro_custo), relidas quando a tabela vagas muda
+        vagas_cadastradas_keys = chaves_vagas(DB_PATH)
 
-            # Filtra vagas do relatório que NÃO estão cadastradas
-            vagas_relatorio = [
-                v for v in vagas_relatorio
-                if (v['nome'], v['cargo'], v['centro_custo']) not in vagas_cadastradas_keys
-            ]
+        if vagas_cadastradas_keys and not vagas_relatorio.empty:
+            chaves = pd.Series(list(zip(
+                vagas_relatorio['nome'],
+                vagas_relatorio['cargo'],
+                vagas_relatorio['centro_custo']
+            )), dtype=object)
+            mascara &= ~chaves.isin(vagas_cadastradas_keys).to_numpy()
 
         tipos = ["Todos", "Demissões", "Afastamentos"]
         tipo_filtro = st.sidebar.radio("Tipo", tipos)
 
-        unidades = ["Todas"] + sorted(list(set([v["centro_custo"] for v in vagas_relatorio]))) if vagas_relatorio else ["Todas"]
+        centros = vagas_relatorio["centro_custo"].to_numpy()[mascara]
+        unidades = ["Todas"] + sorted(set(centros)) if len(centros) else ["Todas"]
         unidade_filtro = st.sidebar.selectbox("Unidade", unidades)
 
-        vagas_filtradas = vagas_relatorio.copy()
-
         if tipo_filtro == "Demissões":
-            vagas_filtradas = [v for v in vagas_filtradas if v["tipo"] == "demissao"]
+            mascara &= (vagas_relatorio["tipo"] == "demissao").to_numpy()
         elif tipo_filtro == "Afastamentos":
-            vagas_filtradas = [v for v in vagas_filtradas if v["tipo"] == "afastamento"]
+            mascara &= (vagas_relatorio["tipo"] == "afastamento").to_numpy()
 
         if unidade_filtro != "Todas":
-            vagas_filtradas = [v for v in vagas_filtradas if v["centro_custo"] == unidade_filtro]
-        
-        if not vagas_filtradas:
+            mascara &= (vagas_relatorio["centro_custo"] == unidade_filtro).to_numpy()
+
+        if not mascara.any():
             st.info("Nenhuma vaga encontrada")
         else:
+            # Só as vagas filtradas são convertidas em registros para os cards
+            vagas_selecionadas = vagas_relatorio[mascara]
+            vagas_filtradas = vagas_para_registros(vagas_selecionadas, relatorio)
+
             st.subheader(f"📋 {len(vagas_filtradas)} Vaga(s) no Relatório")
             
-            for vaga in vagas_filtradas:
-                info_tlp = verificar_vaga_na_tlp(vaga["row_data"], tlp, relatorio)
+            # Analisa todas as vagas contra a TLP em uma única junção
+            indice_tlp = obter_indice_tlp(tlp, versao_tabela("tlp", DB_PATH))
+            indice_ativos = obter_indice_ativos(relatorio, versao_tabela("relatorio_oris", DB_PATH))
+            infos_tlp = verificar_vagas_na_tlp(vagas_selecionadas, indice_tlp, indice_ativos).to_dict('records')
+            
+            for vaga, info_tlp in zip(vagas_filtradas, infos_tlp):
                 renderizar_card_vaga(vaga, None, info_tlp)
                 st.markdown("---")
     
@@ -582,16 +771,25 @@ def run():
     st.sidebar.markdown("---")
     st.sidebar.subheader("📥 Exportar")
     
-    if st.sidebar.button("💾 Exportar Excel"):
-        buffer = exportar_vagas_excel()
+    formato_exportacao = st.sidebar.selectbox(
+        "Formato", formatos_disponiveis(),
+        format_func=lambda f: FORMATOS_EXPORTACAO[f][0]
+    )
+    
+    # Gerado só quando pedido, em streaming e em cache até a tabela vagas mudar
+    if st.sidebar.button("💾 Exportar"):
+        conteudo = exportar_vagas(formato_exportacao, DB_PATH)
         
-        if buffer:
+        if conteudo:
+            descricao, extensao, mime = FORMATOS_EXPORTACAO[formato_exportacao]
             st.sidebar.download_button(
-                "📥 Download Excel",
-                data=buffer,
-                file_name=f"vagas_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                f"📥 Download {descricao}",
+                data=conteudo,
+                file_name=f"vagas_{datetime.now().strftime('%Y%m%d')}.{extensao}",
+                mime=mime
             )
+        else:
+            st.sidebar.info("Nenhuma vaga para exportar")
 
 if __name__ == '__main__':
     run()
@@ -0,0 +1,12 @@
+"""
+Benchmarks do Sistema ORIS sobre bancos sintéticos
+
+- gerar_dados: cria um oris.db sintético (relatorio_oris, tlp e vagas)
+- casos: mede tempo e pico de memória das rotinas críticas em um banco
+- executar: gera os bancos por escala, roda os casos e grava/compara JSON
+
+Uso:
+    python -m benchmarks.executar                      # 1k e 10k funcionários
+    python -m benchmarks.executar --escalas 1k 100k 1m
+    python -m benchmarks.executar --comparar antes.json depois.json
+"""
@@ -0,0 +1,213 @@
+"""
+Casos de benchmark executados sobre um banco sintético
+
+Deve rodar em um processo próprio: o banco é escolhido pela variável
+ORIS_DB_PATH antes de importar os módulos do sistema, e cada processo
+começa sem caches (armazenamento de dados, lru_cache das exportações).
+
+Cada caso roda uma vez com tracemalloc (aquecimento e pico de memória) e
+depois 'repeticoes' vezes sem rastreamento para medir o tempo. Os casos
+apagam e recriam a tabela vagas: só bancos gerados por
+benchmarks.gerar_dados (com a tabela benchmark_info) são aceitos.
+
+Uso:
+    python -m benchmarks.casos caminho.db --repeticoes 5 --json saida.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.gerar_dados import banco_sintetico
+
+# Vagas analisadas no caso verificar_vaga_na_tlp (chamada unitária por card)
+VAGAS_VERIFICADAS = 1000
+
+def medir(executar, preparar=None, repeticoes=5):
+    """
+    Mede tempo e pico de memória de uma função
+
+    Args:
+        executar: Função medida; recebe os argumentos devolvidos por 'preparar'
+        preparar: Função sem argumentos executada (fora da medição) antes de
+            cada execução; devolve a tupla de argumentos
+        repeticoes: Execuções cronometradas
+
+    Returns:
+        Dict com os tempos (s) e o pico de memória (MiB)
+    """
+    def argumentos():
+        return preparar() if preparar else ()
+
+    # Aquecimento e pico de memória (tracemalloc deixa a execução mais lenta)
+    args = argumentos()
+    gc.collect()
+    tracemalloc.start()
+    executar(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tempos = []
+    for _ in range(repeticoes):
+        args = argumentos()
+        gc.collect()
+        inicio = time.perf_counter()
+        executar(*args)
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        "repeticoes": repeticoes,
+        "tempo_min_s": min(tempos),
+        "tempo_mediana_s": statistics.median(tempos),
+        "tempo_medio_s": statistics.mean(tempos),
+        "tempo_max_s": max(tempos),
+        "pico_memoria_mb": pico / (1024 * 1024),
+    }
+
+def _simular_decisoes(conn):
+    """Distribui as vagas sincronizadas entre os status, como em um banco em uso"""
+    conn.execute("""
+        UPDATE vagas SET
+            status = CASE id % 10
+                WHEN 0 THEN 'aprovado' WHEN 1 THEN 'aprovado' WHEN 2 THEN 'aprovado'
+                WHEN 3 THEN 'rejeitado' WHEN 4 THEN 'cancelado'
+                ELSE 'pendente' END,
+            data_decisao = CASE WHEN id % 10 < 5 THEN CURRENT_TIMESTAMP END,
+            usuario_aprovador = CASE WHEN id % 10 < 5 THEN 'benchmark' END
+    """)
+
+def executar_casos(db_path, repeticoes=5):
+    """
+    Roda todos os casos sobre o banco apontado por ORIS_DB_PATH
+
+    Returns:
+        Dict com o ambiente, a quantidade de linhas e a lista de casos medidos
+    """
+    import numpy as np
+    import pandas as pd
+
+    import aprovar_vaga
+    import exportacao
+    from config import VAGAS_POR_PAGINA
+    from conexao import obter_conexao
+    from dados import carregar_tabela
+    from deficit import (
+        CONTRATO_PADRAO, atualizar_deficit_snapshot, calcular_deficit,
+        calcular_deficit_sql, carregar_fontes
+    )
+    from gestao_vagas import estatisticas_vagas, listar_vagas, sincronizar_vagas_pendentes
+    from motor_vagas import IndiceAtivos, IndiceTLP
+
+    # aprovar_vaga configura o logging em INFO; os logs distorceriam os tempos
+    logging.getLogger().setLevel(logging.WARNING)
+
+    conn = obter_conexao(db_path)
+    casos = []
+
+    def limpar_vagas():
+        conn.execute("DELETE FROM vagas")
+        return ()
+
+    def caso(nome, executar, preparar=None, operacoes=1):
+        print(f"  {nome}...", file=sys.stderr, flush=True)
+        resultado = medir(executar, preparar, repeticoes)
+        resultado["nome"] = nome
+        resultado["operacoes"] = operacoes
+        casos.append(resultado)
+
+    # Carregamento e detecção de vagas
+    caso("carregar_tabelas", lambda: (
+        carregar_tabela("relatorio_oris", "aprovar_vaga", db_path=db_path),
+        carregar_tabela("tlp", "aprovar_vaga", db_path=db_path)
+    ))
+    relatorio = carregar_tabela("relatorio_oris", "aprovar_vaga", db_path=db_path)
+    tlp = carregar_tabela("tlp", "aprovar_vaga", db_path=db_path)
+
+    caso("processar_demissoes_e_afastamentos",
+         lambda: aprovar_vaga.processar_demissoes_e_afastamentos(relatorio))
+
+    caso("indices_tlp_e_ativos", lambda: (IndiceTLP(tlp), IndiceAtivos(relatorio)))
+    indice_tlp, indice_ativos = IndiceTLP(tlp), IndiceAtivos(relatorio)
+    pessoas = [
+        registro["row_data"]
+        for registro in aprovar_vaga.processar_demissoes_e_afastamentos(relatorio)[:VAGAS_VERIFICADAS]
+    ]
+    caso("verificar_vaga_na_tlp", lambda: [
+        aprovar_vaga.verificar_vaga_na_tlp(pessoa, tlp, relatorio, indice_ativos, indice_tlp)
+        for pessoa in pessoas
+    ], operacoes=len(pessoas))
+
+    # Déficit
+    caso("calcular_deficit", calcular_deficit,
+         preparar=lambda: carregar_fontes(CONTRATO_PADRAO, db_path) + (None,))
+    caso("calcular_deficit_sql", lambda: calcular_deficit_sql(CONTRATO_PADRAO, db_path))
+
+    # Sincronização: cada execução parte da tabela vagas vazia
+    caso("sincronizar_vagas_pendentes", lambda: sincronizar_vagas_pendentes(relatorio, tlp),
+         preparar=limpar_vagas)
+    _simular_decisoes(conn)
+    total_vagas = conn.execute("SELECT COUNT(*) FROM vagas").fetchone()[0]
+
+    # Consultas da página de aprovação
+    caso("listar_vagas_pagina", lambda: listar_vagas(status="pendente", limite=VAGAS_POR_PAGINA + 1))
+    caso("listar_vagas_todas", listar_vagas)
+    caso("estatisticas_vagas", estatisticas_vagas)
+
+    # Exportações (sem o cache por versão: cada execução gera o arquivo)
+    atualizar_deficit_snapshot(CONTRATO_PADRAO, db_path, forcar=True)
+    for formato in ("xlsx", "csv"):
+        caso(f"exportar_vagas_{formato}", lambda formato=formato: exportacao.exportar_vagas(formato, db_path),
+             preparar=lambda: exportacao._exportar_vagas_cache.cache_clear() or ())
+        caso(f"exportar_deficit_{formato}",
+             lambda formato=formato: exportacao.exportar_deficit(CONTRATO_PADRAO, formato, db_path=db_path),
+             preparar=lambda: exportacao._exportar_deficit_cache.cache_clear() or ())
+
+    return {
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "linhas": {
+            "relatorio_oris": len(relatorio),
+            "tlp": len(tlp),
+            "vagas": total_vagas,
+        },
+        "casos": casos,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os casos de benchmark em um banco")
+    parser.add_argument("banco", help="Arquivo .db gerado por benchmarks.gerar_dados")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--json", dest="saida", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    # config lê o caminho na importação, feita só em executar_casos()
+    db_path = os.path.abspath(args.banco)
+    os.environ["ORIS_DB_PATH"] = db_path
+
+    if not banco_sintetico(db_path):
+        print(f"[ERRO] {db_path} não foi gerado por benchmarks.gerar_dados", file=sys.stderr)
+        raise SystemExit(2)
+
+    resultado = executar_casos(db_path, args.repeticoes)
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Executa os benchmarks por escala e grava o resultado em JSON
+
+Para cada escala, gera (uma vez) o banco sintético em benchmarks/dados/ e
+roda benchmarks.casos em um processo novo. O JSON final traz o commit, o
+ambiente e os tempos de cada caso, e fica em benchmarks/resultados/ para
+comparação entre commits.
+
+Uso:
+    python -m benchmarks.executar --escalas 1k 10k 100k
+    python -m benchmarks.executar --comparar resultados/a.json resultados/b.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.gerar_dados import ESCALAS, gerar_banco
+
+# Configura encoding para UTF-8
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+
+PASTA_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(PASTA_BENCHMARKS)
+PASTA_DADOS = os.path.join(PASTA_BENCHMARKS, "dados")
+PASTA_RESULTADOS = os.path.join(PASTA_BENCHMARKS, "resultados")
+
+# Aumento da mediana considerado regressão na comparação (20%)
+LIMITE_REGRESSAO = 1.2
+
+def commit_atual():
+    """Hash curto do commit atual (com '+' se há alterações não commitadas) ou None"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        alterado = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return commit + ("+" if alterado else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def caminho_banco(escala, semente):
+    """Arquivo do banco sintético de uma escala"""
+    return os.path.join(PASTA_DADOS, f"oris_{escala}_s{semente}.db")
+
+def executar_escala(escala, repeticoes, semente, regenerar=False):
+    """
+    Gera o banco da escala (se necessário) e roda os casos em um processo novo
+
+    Returns:
+        Dict de benchmarks.casos com a escala e o número de funcionários
+    """
+    funcionarios = ESCALAS[escala]
+    banco = caminho_banco(escala, semente)
+    if regenerar or not os.path.exists(banco):
+        print(f"Gerando banco sintético {escala} ({funcionarios} funcionários)...", flush=True)
+        gerar_banco(banco, funcionarios, semente)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = os.path.join(pasta, "resultado.json")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.casos", banco,
+             "--repeticoes", str(repeticoes), "--json", saida],
+            cwd=BASE_DIR, check=True
+        )
+        with open(saida, encoding="utf-8") as f:
+            resultado = json.load(f)
+
+    resultado["escala"] = escala
+    resultado["funcionarios"] = funcionarios
+    return resultado
+
+def comparar(arquivo_base, arquivo_novo, limite=LIMITE_REGRESSAO):
+    """
+    Compara as medianas de dois resultados, caso a caso e escala a escala
+
+    Returns:
+        Lista de tuplas (escala, caso, mediana base, mediana nova, razão)
+        das regressões acima do limite
+    """
+    def medianas(arquivo):
+        with open(arquivo, encoding="utf-8") as f:
+            dados = json.load(f)
+        return {
+            (escala["escala"], caso["nome"]): caso["tempo_mediana_s"]
+            for escala in dados["escalas"]
+            for caso in escala["casos"]
+        }
+
+    base, novo = medianas(arquivo_base), medianas(arquivo_novo)
+
+    regressoes = []
+    print(f"{'escala':<6} {'caso':<36} {'base (ms)':>10} {'novo (ms)':>10} {'razão':>7}")
+    for chave in sorted(set(base) & set(novo)):
+        razao = novo[chave] / base[chave] if base[chave] else float("inf")
+        marca = " <<" if razao > limite else ""
+        print(f"{chave[0]:<6} {chave[1]:<36} {base[chave] * 1000:10.1f} {novo[chave] * 1000:10.1f} {razao:7.2f}{marca}")
+        if razao > limite:
+            regressoes.append((*chave, base[chave], novo[chave], razao))
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Sistema ORIS")
+    parser.add_argument("--escalas", nargs="+", default=["1k", "10k"], choices=list(ESCALAS),
+                        help="Escalas do banco sintético (padrão: 1k 10k)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--regenerar", action="store_true", help="Gera os bancos novamente")
+    parser.add_argument("--saida", help="Arquivo JSON (padrão: benchmarks/resultados/<data>_<commit>.json)")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NOVO"),
+                        help="Compara dois resultados e sai com código 1 se houver regressão")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO,
+                        help="Razão da mediana considerada regressão (padrão: 1.2)")
+    args = parser.parse_args()
+
+    if args.comparar:
+        regressoes = comparar(*args.comparar, limite=args.limite)
+        if regressoes:
+            print(f"\n[ERRO] {len(regressoes)} regressão(ões) acima de {args.limite:.2f}x")
+            raise SystemExit(1)
+        print("\n[OK] Nenhuma regressão")
+        return
+
+    commit = commit_atual()
+    resultado = {
+        "commit": commit,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "repeticoes": args.repeticoes,
+        "semente": args.semente,
+        "escalas": [],
+    }
+    for escala in args.escalas:
+        print(f"\n=== {escala} ===", flush=True)
+        resultado["escalas"].append(
+            executar_escala(escala, args.repeticoes, args.semente, args.regenerar)
+        )
+
+    saida = args.saida
+    if saida is None:
+        os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+        nome = f"{datetime.now():%Y%m%d_%H%M%S}_{(commit or 'sem-git').replace('+', '-alterado')}.json"
+        saida = os.path.join(PASTA_RESULTADOS, nome)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+    print("\n" + "=" * 60)
+    for escala in resultado["escalas"]:
+        print(f"\n{escala['escala']} ({escala['linhas']})")
+        for caso in escala["casos"]:
+            por_operacao = ""
+            if caso["operacoes"] > 1:
+                por_operacao = f"  ({caso['tempo_mediana_s'] / caso['operacoes'] * 1e6:.0f} µs/op)"
+            print(f"  {caso['nome']:<36} {caso['tempo_mediana_s'] * 1000:10.1f} ms "
+                  f"{caso['pico_memoria_mb']:8.1f} MiB{por_operacao}")
+    print("=" * 60)
+    print(f"Resultado: {saida}")
+
+if __name__ == "__main__":
+    main()
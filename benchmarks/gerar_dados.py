@@ -0,0 +1,250 @@
+"""
+Gerador de banco oris.db sintético para benchmarks
+
+Cria 'relatorio_oris', 'tlp' e 'vagas' (vazia) com distribuições próximas
+das do relatório real: poucos contratos concentrando a maior parte do
+quadro, centros de custo e cargos com cauda longa (Zipf), ~78% de ativos,
+~12% de demitidos e o restante em afastamentos e atestados, datas no
+formato DD/MM/YYYY. A geração é determinística para a mesma semente.
+
+Um arquivo existente só é substituído se também for um banco sintético
+(com a tabela benchmark_info); para sobrescrever outro arquivo, use --forcar.
+
+Uso:
+    python -m benchmarks.gerar_dados saida.db --funcionarios 100000 [--forcar]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Configura encoding para UTF-8
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+
+# Escalas nomeadas (quantidade de funcionários no relatório)
+ESCALAS = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# Contratos (Nome Fantasia) e peso relativo no quadro
+CONTRATOS = [
+    ("SBCD - REDE ASSIST. NORTE-SP", 0.34),
+    ("SBCD - REDE ASSIST. SUL-SP", 0.18),
+    ("SBCD - HOSPITAL MUNICIPAL CENTRO", 0.12),
+    ("SBCD - AMA/UBS INTEGRADA LESTE", 0.09),
+    ("SBCD - CAPS OESTE", 0.07),
+    ("SBCD - SAÚDE DA FAMÍLIA SUDESTE", 0.06),
+    ("SBCD - PRONTO SOCORRO VILA NOVA", 0.05),
+    ("SBCD - REDE HORA CERTA", 0.04),
+    ("SBCD - SAMU REGIONAL", 0.03),
+    ("SBCD - ADMINISTRAÇÃO CENTRAL", 0.02),
+]
+
+TIPOS_UNIDADE = ["UBS", "AMA", "CAPS", "HOSPITAL", "PRONTO SOCORRO", "CER", "URSI", "AE"]
+
+CARGOS_BASE = [
+    "TECNICO DE ENFERMAGEM", "AUXILIAR DE ENFERMAGEM", "ENFERMEIRO", "AGENTE COMUNITARIO DE SAUDE",
+    "MEDICO CLINICO", "RECEPCIONISTA", "AUXILIAR ADMINISTRATIVO", "AUXILIAR DE LIMPEZA",
+    "FARMACEUTICO", "AUXILIAR DE FARMACIA", "MEDICO PEDIATRA", "CIRURGIAO DENTISTA",
+    "AUXILIAR DE SAUDE BUCAL", "PSICOLOGO", "ASSISTENTE SOCIAL", "FISIOTERAPEUTA",
+    "NUTRICIONISTA", "MOTORISTA", "GERENTE DE UNIDADE", "TECNICO DE RADIOLOGIA",
+]
+
+ESPECIALIDADES = [
+    "CARDIOLOGISTA", "GINECOLOGISTA", "PSIQUIATRA", "ORTOPEDISTA", "DERMATOLOGISTA",
+    "NEUROLOGISTA", "OFTALMOLOGISTA", "OTORRINOLARINGOLOGISTA", "UROLOGISTA", "ENDOCRINOLOGISTA",
+    "GERIATRA", "INFECTOLOGISTA", "PNEUMOLOGISTA", "REUMATOLOGISTA", "NEFROLOGISTA",
+]
+
+# (situação, probabilidade)
+SITUACOES = [
+    ("01-ATIVO", 0.78),
+    ("99-Demitido", 0.12),
+    ("18-ATESTADO MÉDICO", 0.02),
+    ("02-FÉRIAS", 0.03),
+    ("03-AUXÍLIO DOENÇA", 0.02),
+    ("05-LICENÇA MATERNIDADE", 0.015),
+    ("06-ACIDENTE DE TRABALHO", 0.005),
+    ("14-LICENÇA SEM VENCIMENTOS", 0.007),
+    ("07-SERVIÇO MILITAR", 0.003),
+]
+
+CARGAS_HORARIAS = [(20.0, 0.08), (30.0, 0.22), (36.0, 0.20), (40.0, 0.35), (44.0, 0.15)]
+
+def _pesos_zipf(quantidade, expoente=1.1):
+    """Pesos normalizados de uma distribuição de Zipf com 'quantidade' itens"""
+    pesos = 1.0 / np.arange(1, quantidade + 1) ** expoente
+    return pesos / pesos.sum()
+
+def _escolher(rng, opcoes, tamanho):
+    """Sorteia 'tamanho' valores de uma lista de (valor, probabilidade)"""
+    valores, pesos = zip(*opcoes)
+    pesos = np.asarray(pesos) / np.sum(pesos)
+    return np.asarray(valores, dtype=object)[rng.choice(len(valores), size=tamanho, p=pesos)]
+
+def _datas(rng, inicio, fim, mascara):
+    """Datas DD/MM/YYYY uniformes entre 'inicio' e 'fim' nas linhas da máscara (None nas demais)"""
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    dias = rng.integers(0, (fim - inicio).days + 1, size=int(mascara.sum()))
+    resultado = np.full(len(mascara), None, dtype=object)
+    resultado[mascara] = (inicio + pd.to_timedelta(dias, unit="D")).strftime("%d/%m/%Y").to_numpy()
+    return resultado
+
+def gerar_relatorio(funcionarios, rng):
+    """DataFrame sintético com as colunas de 'relatorio_oris'"""
+    # Centros de custo: cerca de 1 para cada 250 funcionários, cada um em um contrato
+    quantidade_centros = int(np.clip(funcionarios // 250, 10, 4000))
+    contratos_centro = _escolher(rng, CONTRATOS, quantidade_centros)
+    centros = np.array([
+        f"{TIPOS_UNIDADE[i % len(TIPOS_UNIDADE)]} {i:04d}" for i in range(quantidade_centros)
+    ], dtype=object)
+
+    cargos = np.array(
+        CARGOS_BASE + [f"MEDICO {especialidade}" for especialidade in ESPECIALIDADES]
+        + [f"ANALISTA {i:03d}" for i in range(120)],
+        dtype=object
+    )
+
+    indice_centro = rng.choice(quantidade_centros, size=funcionarios, p=_pesos_zipf(quantidade_centros, 0.8))
+    situacao = _escolher(rng, SITUACOES, funcionarios)
+    demitido = situacao == "99-Demitido"
+    afastado = ~demitido & (situacao != "01-ATIVO")
+
+    return pd.DataFrame({
+        "Matrícula": np.arange(100000, 100000 + funcionarios),
+        "Nome": [f"FUNCIONARIO {i:07d}" for i in range(funcionarios)],
+        "Cargo": cargos[rng.choice(len(cargos), size=funcionarios, p=_pesos_zipf(len(cargos)))],
+        "Centro custo": centros[indice_centro],
+        "Nome Fantasia": contratos_centro[indice_centro],
+        "Situação": situacao,
+        "Carga Horária Semanal": _escolher(rng, CARGAS_HORARIAS, funcionarios).astype(float),
+        "Dt Admissão": _datas(rng, "2005-01-01", "2026-06-30", np.ones(funcionarios, dtype=bool)),
+        "Dt Rescisão": _datas(rng, "2022-01-01", "2026-09-30", demitido),
+        "Dt Início Situação": _datas(rng, "2023-01-01", "2026-09-30", afastado),
+    })
+
+def gerar_tlp(relatorio, rng):
+    """
+    TLP sintética: uma linha por (contrato, unidade, cargo, carga) com ativos,
+    com a quantidade ideal em torno do quadro atual; ~5% das combinações
+    ficam fora da TLP (vagas não previstas)
+    """
+    ativos = relatorio[relatorio["Situação"].isin(["01-ATIVO", "18-ATESTADO MÉDICO"])]
+    tlp = (
+        ativos.groupby(["Nome Fantasia", "Centro custo", "Cargo", "Carga Horária Semanal"])
+        .size()
+        .reset_index(name="atual")
+    )
+    tlp = tlp[rng.random(len(tlp)) >= 0.05]
+
+    return pd.DataFrame({
+        "contrato": tlp["Nome Fantasia"].to_numpy(),
+        "unidade": tlp["Centro custo"].to_numpy(),
+        "cargo": tlp["Cargo"].to_numpy(),
+        "carga_hora": tlp["Carga Horária Semanal"].to_numpy(),
+        "quantidade_ideal": np.maximum(0, tlp["atual"].to_numpy() + rng.integers(-2, 5, size=len(tlp))),
+    })
+
+def banco_sintetico(caminho):
+    """True se o arquivo é um banco gerado por gerar_banco() (tem a tabela benchmark_info)"""
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(caminho)}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False
+    try:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'benchmark_info'"
+        ).fetchone() is not None
+    except sqlite3.Error:
+        # Arquivo que não é um banco SQLite
+        return False
+    finally:
+        conn.close()
+
+def gerar_banco(caminho, funcionarios, semente=42, forcar=False):
+    """
+    Cria (ou substitui) um banco sintético e aplica as migrations
+
+    Args:
+        caminho: Arquivo .db de saída
+        funcionarios: Quantidade de linhas de 'relatorio_oris'
+        semente: Semente do gerador aleatório
+        forcar: Substitui o arquivo mesmo que não seja um banco sintético
+
+    Returns:
+        Dict com a quantidade de linhas por tabela
+
+    Raises:
+        FileExistsError: O arquivo existe e não é um banco sintético (ex.: o
+            oris.db de produção) e forcar=False
+    """
+    from check_and_migrate import SQL_CRIAR_TABELA_VAGAS, SQL_INDICES_VAGAS, SQL_TRIGGER_TIMESTAMP_VAGAS
+    from migracoes import executar_migracoes
+
+    rng = np.random.default_rng(semente)
+    relatorio = gerar_relatorio(funcionarios, rng)
+    tlp = gerar_tlp(relatorio, rng)
+
+    if os.path.exists(caminho) and not forcar and not banco_sintetico(caminho):
+        raise FileExistsError(
+            f"{caminho} já existe e não foi gerado por benchmarks.gerar_dados (use --forcar para substituir)"
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+    conn = sqlite3.connect(caminho)
+    try:
+        relatorio.to_sql("relatorio_oris", conn, index=False, chunksize=50_000)
+        tlp.to_sql("tlp", conn, index=False)
+        conn.execute(SQL_CRIAR_TABELA_VAGAS.format(tabela="vagas"))
+        for sql in SQL_INDICES_VAGAS:
+            conn.execute(sql)
+        conn.execute(SQL_TRIGGER_TIMESTAMP_VAGAS)
+
+        # Marca o banco como sintético (benchmarks.casos só aceita esses)
+        conn.execute("CREATE TABLE benchmark_info (chave TEXT PRIMARY KEY, valor TEXT)")
+        conn.executemany(
+            "INSERT INTO benchmark_info (chave, valor) VALUES (?, ?)",
+            [("funcionarios", str(funcionarios)), ("semente", str(semente))]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    executar_migracoes(caminho)
+    return {"relatorio_oris": len(relatorio), "tlp": len(tlp), "vagas": 0}
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um oris.db sintético")
+    parser.add_argument("saida", help="Arquivo .db de saída")
+    parser.add_argument("--funcionarios", default="10k",
+                        help=f"Linhas do relatório ou escala ({', '.join(ESCALAS)})")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--forcar", action="store_true",
+                        help="Substitui o arquivo de saída mesmo que não seja um banco sintético")
+    args = parser.parse_args()
+
+    funcionarios = ESCALAS.get(args.funcionarios.lower()) or int(args.funcionarios)
+    inicio = time.perf_counter()
+    try:
+        linhas = gerar_banco(args.saida, funcionarios, args.semente, forcar=args.forcar)
+    except FileExistsError as e:
+        print(f"[ERRO] {e}", file=sys.stderr)
+        raise SystemExit(2)
+    print(f"[OK] {args.saida}: {linhas} em {time.perf_counter() - inicio:.1f}s")
+
+if __name__ == "__main__":
+    main()
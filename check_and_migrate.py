@@ -14,6 +14,57 @@ if sys.platform == 'win32':
 
 DB_PATH = os.path.join(os.getcwd(), "data", "oris.db")
 
+# Estrutura da tabela vagas (com status 'cancelado'); {tabela} permite
+# criar a tabela temporária da migration
+SQL_CRIAR_TABELA_VAGAS = """
+    CREATE TABLE {tabela} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        centro_custo TEXT NOT NULL,
+        cargo TEXT NOT NULL,
+        situacao TEXT NOT NULL,
+        nome_fantasia TEXT NOT NULL,
+        carga_horaria_semanal REAL,
+        dt_inicio_situacao DATE,
+        dt_rescisao DATE,
+        data_evento DATE,
+        tipo_vaga TEXT NOT NULL,
+        motivo_vaga TEXT,
+        dias_afastamento INTEGER,
+        status TEXT NOT NULL DEFAULT 'pendente',
+        data_decisao DATETIME,
+        usuario_aprovador TEXT,
+        observacao TEXT,
+        quantidade_ideal INTEGER,
+        quantidade_atual INTEGER,
+        deficit INTEGER,
+        vaga_prevista_tlp INTEGER,
+        data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+        data_atualizacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+        CHECK (tipo_vaga IN ('demissao', 'afastamento')),
+        CHECK (status IN ('pendente', 'aprovado', 'rejeitado', 'cancelado'))
+    )
+"""
+
+SQL_INDICES_VAGAS = [
+    "CREATE INDEX idx_vagas_status ON vagas(status)",
+    "CREATE INDEX idx_vagas_tipo ON vagas(tipo_vaga)",
+    "CREATE INDEX idx_vagas_centro_custo ON vagas(centro_custo)",
+    "CREATE INDEX idx_vagas_cargo ON vagas(cargo)",
+    "CREATE INDEX idx_vagas_data_evento ON vagas(data_evento)",
+    "CREATE INDEX idx_vagas_data_decisao ON vagas(data_decisao)",
+]
+
+SQL_TRIGGER_TIMESTAMP_VAGAS = """
+    CREATE TRIGGER update_vagas_timestamp
+    AFTER UPDATE ON vagas
+    BEGIN
+        UPDATE vagas
+        SET data_atualizacao = CURRENT_TIMESTAMP
+        WHERE id = NEW.id;
+    END
+"""
+
 def check_table_exists(cursor, table_name):
     """Verifica se uma tabela existe"""
     cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
@@ -60,35 +111,7 @@ def main():
                 cursor.execute("DROP TABLE IF EXISTS vagas_new")
 
                 # Cria nova tabela
-                cursor.execute("""
-                    CREATE TABLE vagas_new (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        nome TEXT NOT NULL,
-                        centro_custo TEXT NOT NULL,
-                        cargo TEXT NOT NULL,
-                        situacao TEXT NOT NULL,
-                        nome_fantasia TEXT NOT NULL,
-                        carga_horaria_semanal REAL,
-                        dt_inicio_situacao DATE,
-                        dt_rescisao DATE,
-                        data_evento DATE,
-                        tipo_vaga TEXT NOT NULL,
-                        motivo_vaga TEXT,
-                        dias_afastamento INTEGER,
-                        status TEXT NOT NULL DEFAULT 'pendente',
-                        data_decisao DATETIME,
-                        usuario_aprovador TEXT,
-                        observacao TEXT,
-                        quantidade_ideal INTEGER,
-                        quantidade_atual INTEGER,
-                        deficit INTEGER,
-                        vaga_prevista_tlp INTEGER,
-                        data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        data_atualizacao DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        CHECK (tipo_vaga IN ('demissao', 'afastamento')),
-                        CHECK (status IN ('pendente', 'aprovado', 'rejeitado', 'cancelado'))
-                    )
-                """)
+                cursor.execute(SQL_CRIAR_TABELA_VAGAS.format(tabela="vagas_new"))
 
                 # Copia dados
                 cursor.execute("INSERT INTO vagas_new SELECT * FROM vagas")
@@ -97,24 +120,10 @@ def main():
                 cursor.execute("DROP TABLE vagas")
                 cursor.execute("ALTER TABLE vagas_new RENAME TO vagas")
 
-                # Recria indices
-                cursor.execute("CREATE INDEX idx_vagas_status ON vagas(status)")
-                cursor.execute("CREATE INDEX idx_vagas_tipo ON vagas(tipo_vaga)")
-                cursor.execute("CREATE INDEX idx_vagas_centro_custo ON vagas(centro_custo)")
-                cursor.execute("CREATE INDEX idx_vagas_cargo ON vagas(cargo)")
-                cursor.execute("CREATE INDEX idx_vagas_data_evento ON vagas(data_evento)")
-                cursor.execute("CREATE INDEX idx_vagas_data_decisao ON vagas(data_decisao)")
-
-                # Recria trigger
-                cursor.execute("""
-                    CREATE TRIGGER update_vagas_timestamp
-                    AFTER UPDATE ON vagas
-                    BEGIN
-                        UPDATE vagas
-                        SET data_atualizacao = CURRENT_TIMESTAMP
-                        WHERE id = NEW.id;
-                    END
-                """)
+                # Recria indices e trigger
+                for sql in SQL_INDICES_VAGAS:
+                    cursor.execute(sql)
+                cursor.execute(SQL_TRIGGER_TIMESTAMP_VAGAS)
 
                 # Recria views
                 cursor.execute("""
@@ -156,6 +165,12 @@ def main():
                 conn.commit()
                 print("[OK] Tabela criada com sucesso!")
 
+        # Migrations versionadas (índices de desempenho); reaplicadas porque
+        # a reconstrução da tabela acima descarta os índices compostos
+        from migracoes import executar_migracoes
+        executadas = executar_migracoes(DB_PATH, reaplicar=True)
+        print(f"\n[OK] Migrations versionadas aplicadas: {executadas}")
+
         # Mostra estatísticas
         cursor.execute("SELECT status, COUNT(*) FROM vagas GROUP BY status")
         stats = cursor.fetchall()
@@ -0,0 +1,426 @@
+"""
+Gerenciador de conexões SQLite do Sistema ORIS
+Mantém um pool de conexões do processo, aplica os PRAGMAs de desempenho
+e oferece transações explícitas
+
+Cada thread recebe uma conexão emprestada do pool na primeira chamada de
+obter_conexao() e a usa até terminar; ao fim da thread a conexão volta ao
+pool, já configurada e com o cache de statements preenchido. Assim as
+threads de curta duração (o Streamlit abre uma thread por execução do
+script) não pagam a abertura e os PRAGMAs a cada clique.
+
+Cada conexão guarda a identidade do arquivo (dispositivo e inode) em que
+foi aberta. Uma conexão ociosa cujo arquivo foi substituído (os.replace de
+um oris.db novo) é fechada em vez de reaproveitada, e
+fechar_conexoes_ociosas() esvazia o pool quando os dados são recarregados.
+"""
+
+import sqlite3
+import threading
+import weakref
+import os
+import logging
+from contextlib import contextmanager
+
+from instrumentacao import registrar_sql
+
+# Importa configuração centralizada
+try:
+    from config import (
+        DB_PATH_STR as DB_PATH,
+        DB_JOURNAL_MODE,
+        DB_BUSY_TIMEOUT_MS,
+        DB_CACHE_SIZE_KB,
+        DB_MMAP_SIZE,
+        DB_CACHED_STATEMENTS,
+        DB_CONEXOES_OCIOSAS
+    )
+except ImportError:
+    # Fallback para compatibilidade
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DB_PATH = os.path.join(BASE_DIR, "data", "oris.db")
+    DB_JOURNAL_MODE = "WAL"
+    DB_BUSY_TIMEOUT_MS = 5000
+    DB_CACHE_SIZE_KB = 64 * 1024
+    DB_MMAP_SIZE = 256 * 1024 * 1024
+    DB_CACHED_STATEMENTS = 256
+    DB_CONEXOES_OCIOSAS = 8
+
+logger = logging.getLogger(__name__)
+
+# Empréstimo da thread atual (ver _Emprestimo)
+_local = threading.local()
+
+# Conexões livres do processo: {caminho do banco: [(conexão, identidade do arquivo)]}
+_livres = {}
+_livres_lock = threading.Lock()
+
+# ==================== CONEXÕES ====================
+
+def _configurar_conexao(conn):
+    """Aplica os PRAGMAs de desempenho em uma conexão recém-aberta"""
+    try:
+        modo = conn.execute(f"PRAGMA journal_mode={DB_JOURNAL_MODE}").fetchone()[0]
+        if modo.upper() != DB_JOURNAL_MODE.upper():
+            logger.warning(f"⚠️ journal_mode={DB_JOURNAL_MODE} não suportado, usando {modo}")
+    except sqlite3.Error as e:
+        # Banco somente leitura ou em uso exclusivo: segue no modo atual
+        logger.warning(f"⚠️ Não foi possível alterar journal_mode: {e}")
+
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{int(DB_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+def _identidade_arquivo(caminho):
+    """(dispositivo, inode) do arquivo do banco, ou None se não existe em disco"""
+    try:
+        info = os.stat(caminho)
+    except (OSError, ValueError):
+        return None
+    return (info.st_dev, info.st_ino)
+
+def _abrir_conexao(caminho):
+    """Abre e configura uma conexão nova para o pool"""
+    conn = sqlite3.connect(
+        caminho,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        cached_statements=DB_CACHED_STATEMENTS,
+        # Usada por uma thread de cada vez, mas passa de uma thread a outra pelo pool
+        check_same_thread=False
+    )
+    _configurar_conexao(conn)
+    # Conta as instruções no painel de perfil (sem coleta ativa, só retorna)
+    conn.set_trace_callback(registrar_sql)
+    logger.debug(f"Nova conexão SQLite: {caminho} (thread {threading.get_ident()})")
+    return conn
+
+def _devolver_conexao(caminho, conn, identidade):
+    """Devolve uma conexão ao pool (ou fecha, se o pool do banco já está cheio)"""
+    try:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+    except sqlite3.Error:
+        conn.close()
+        return
+
+    with _livres_lock:
+        livres = _livres.setdefault(caminho, [])
+        if len(livres) < DB_CONEXOES_OCIOSAS:
+            livres.append((conn, identidade))
+            return
+    conn.close()
+
+def _devolver_conexoes(conexoes):
+    """Devolve ao pool as conexões de uma thread que terminou"""
+    for caminho, (conn, identidade) in conexoes.items():
+        _devolver_conexao(caminho, conn, identidade)
+    conexoes.clear()
+
+class _Emprestimo:
+    """
+    Conexões emprestadas do pool à thread atual, por caminho do banco
+
+    Fica no threading.local: quando a thread termina, o objeto é descartado
+    e o finalizador devolve as conexões ao pool.
+    """
+
+    def __init__(self):
+        self.conexoes = {}
+        weakref.finalize(self, _devolver_conexoes, self.conexoes).atexit = False
+
+def _descartar_pool_herdado():
+    """Processo filho (fork): não reaproveita as conexões herdadas do processo pai"""
+    global _local, _livres, _livres_lock
+    _local = threading.local()
+    _livres = {}
+    _livres_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_descartar_pool_herdado)
+
+def _conexoes_da_thread():
+    """Dicionário {caminho: (conexão, identidade do arquivo)} emprestado à thread atual"""
+    emprestimo = getattr(_local, "emprestimo", None)
+    if emprestimo is None:
+        emprestimo = _Emprestimo()
+        _local.emprestimo = emprestimo
+    return emprestimo.conexoes
+
+def obter_conexao(db_path=None):
+    """
+    Retorna a conexão da thread atual para o banco
+
+    Na primeira chamada da thread, pega uma conexão livre do pool (ou abre
+    uma nova); a thread fica com ela até terminar. A conexão fica em modo
+    autocommit (isolation_level=None); use transacao() para agrupar várias
+    instruções. Não feche a conexão retornada; use fechar_conexao() se
+    precisar liberá-la.
+
+    Uma conexão livre aberta em outro arquivo (o banco foi substituído
+    desde então) é descartada junto com as demais conexões livres do banco.
+
+    Args:
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        sqlite3.Connection
+    """
+    caminho = str(db_path or DB_PATH)
+    conexoes = _conexoes_da_thread()
+
+    entrada = conexoes.get(caminho)
+    if entrada is None:
+        identidade = _identidade_arquivo(caminho)
+        with _livres_lock:
+            livres = _livres.get(caminho)
+            entrada = livres.pop() if livres else None
+            if entrada is not None and entrada[1] != identidade:
+                # Arquivo substituído: nenhuma conexão livre aponta para ele
+                obsoletas = [entrada] + livres
+                livres.clear()
+                entrada = None
+            else:
+                obsoletas = []
+        for conn, _ in obsoletas:
+            conn.close()
+        if obsoletas:
+            logger.info(f"🧹 {len(obsoletas)} conexão(ões) de um arquivo substituído fechada(s): {caminho}")
+
+        if entrada is None:
+            conn = _abrir_conexao(caminho)
+            entrada = (conn, _identidade_arquivo(caminho))
+        conexoes[caminho] = entrada
+
+    return entrada[0]
+
+def fechar_conexao(db_path=None):
+    """Fecha a conexão da thread atual para o banco (se existir), sem devolvê-la ao pool"""
+    caminho = str(db_path or DB_PATH)
+    entrada = _conexoes_da_thread().pop(caminho, None)
+    if entrada is not None:
+        entrada[0].close()
+
+def fechar_conexoes_ociosas(db_path=None):
+    """
+    Fecha as conexões livres do pool e a da thread atual
+
+    Usada ao recarregar os dados: as próximas consultas abrem o arquivo
+    atual do banco, e nenhum handle ocioso impede a substituição do
+    arquivo (no Windows, os.replace falha com o arquivo aberto). Conexões
+    emprestadas a outras threads são devolvidas quando elas terminam.
+
+    Args:
+        db_path: Caminho do banco ou None para todos os bancos
+    """
+    caminho = str(db_path) if db_path else None
+    with _livres_lock:
+        caminhos = [caminho] if caminho else list(_livres)
+        fechar = [entrada for c in caminhos for entrada in _livres.pop(c, [])]
+
+    conexoes = _conexoes_da_thread()
+    for c in [caminho] if caminho else list(conexoes):
+        entrada = conexoes.pop(c, None)
+        if entrada is not None:
+            if entrada[0].in_transaction:
+                # Dentro de uma transação: a conexão continua com a thread
+                conexoes[c] = entrada
+                continue
+            fechar.append(entrada)
+
+    for conn, _ in fechar:
+        conn.close()
+    logger.info(f"🧹 {len(fechar)} conexão(ões) ociosa(s) fechada(s): {caminho or 'todos os bancos'}")
+
+# ==================== TRANSAÇÕES ====================
+
+@contextmanager
+def transacao(db_path=None, imediata=False):
+    """
+    Executa um bloco dentro de uma transação explícita
+
+    Faz COMMIT ao sair normalmente e ROLLBACK em caso de exceção (que é
+    propagada). Blocos aninhados reaproveitam a transação externa.
+
+    Args:
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        imediata: Usa BEGIN IMMEDIATE (reserva a escrita desde o início,
+            evitando que duas escritas leiam o mesmo estado)
+
+    Yields:
+        sqlite3.Connection
+    """
+    conn = obter_conexao(db_path)
+
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if imediata else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+# ==================== VERSÃO DAS TABELAS ====================
+
+# Operações que incrementam a versão de uma tabela monitorada
+_OPERACOES_VERSIONADAS = ("INSERT", "UPDATE", "DELETE")
+
+# Colunas derivadas, preenchidas pela própria aplicação: atualizá-las não
+# muda a versão da tabela (ex.: deficit.garantir_contrato_normalizado)
+COLUNAS_DERIVADAS = {"contrato_normalizado"}
+
+def _nome_trigger_versao(tabela, operacao):
+    """Nome do trigger que incrementa a versão de 'tabela' em 'operacao'"""
+    return f"versao_{tabela}_{operacao.lower()}"
+
+def garantir_controle_versao(tabela, db_path=None):
+    """
+    Instala o contador de versão de uma tabela (tabela versao_tabelas + triggers)
+
+    Se os triggers não existem (primeira execução ou tabela recriada por
+    uma importação com DROP/CREATE), eles são criados e a versão é
+    incrementada, invalidando qualquer cache derivado da tabela. O trigger
+    de UPDATE ignora as COLUNAS_DERIVADAS.
+
+    Args:
+        tabela: Nome da tabela monitorada
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+    """
+    with transacao(db_path, imediata=True) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS versao_tabelas (
+                tabela TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL DEFAULT 0,
+                instancia TEXT
+            )
+        """)
+
+        existentes = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+                (tabela,)
+            )
+        }
+        faltando = [
+            op for op in _OPERACOES_VERSIONADAS
+            if _nome_trigger_versao(tabela, op) not in existentes
+        ]
+        if not faltando:
+            return
+
+        # UPDATE só conta quando altera colunas de dados
+        colunas = ", ".join(
+            f'"{row[1]}"' for row in conn.execute(f'PRAGMA table_info("{tabela}")')
+            if row[1] not in COLUNAS_DERIVADAS
+        )
+        eventos = {"INSERT": "INSERT", "DELETE": "DELETE", "UPDATE": f"UPDATE OF {colunas}"}
+
+        for operacao in faltando:
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS "{_nome_trigger_versao(tabela, operacao)}"
+                AFTER {eventos[operacao]} ON "{tabela}"
+                BEGIN
+                    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = '{tabela}';
+                END
+            """)
+
+        conn.execute(
+            "INSERT INTO versao_tabelas (tabela, versao, instancia) VALUES (?, 1, lower(hex(randomblob(8)))) "
+            "ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1",
+            (tabela,)
+        )
+        logger.info(f"Controle de versão instalado para '{tabela}'")
+
+def token_tabela(tabela, db_path=None):
+    """
+    Token barato de versão de uma tabela
+
+    Lê o contador mantido pelos triggers de garantir_controle_versao(), sem
+    varrer a tabela. Muda a cada INSERT/UPDATE/DELETE e quando a tabela é
+    recriada.
+
+    Args:
+        tabela: Nome da tabela
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        Versão atual (int) ou None se a tabela não existe
+    """
+    conn = obter_conexao(db_path)
+
+    triggers = conn.execute(
+        """
+        SELECT
+            EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?),
+            (SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ? AND name LIKE 'versao_%')
+        """,
+        (tabela, tabela)
+    ).fetchone()
+    if not triggers[0]:
+        return None
+
+    try:
+        if triggers[1] < len(_OPERACOES_VERSIONADAS):
+            garantir_controle_versao(tabela, db_path)
+
+        row = conn.execute(
+            "SELECT versao FROM versao_tabelas WHERE tabela = ?", (tabela,)
+        ).fetchone()
+        return row[0] if row else None
+
+    except sqlite3.OperationalError as e:
+        # Banco somente leitura: sem contador, usa o total de linhas e o maior rowid
+        logger.warning(f"⚠️ Controle de versão indisponível para '{tabela}': {e}")
+        total, maior_rowid = conn.execute(f'SELECT COUNT(*), MAX(rowid) FROM "{tabela}"').fetchone()
+        return f"{total}:{maior_rowid}"
+
+def token_persistente(tabela, db_path=None):
+    """
+    Token de versão que identifica também o banco de origem
+
+    Combina a versão da tabela com um identificador aleatório gravado quando
+    o contador foi criado. Serve para caches em disco: um banco substituído
+    por outro arquivo nunca reaproveita o cache do anterior.
+
+    Returns:
+        String 'instancia:versao' ou None se a tabela não existe
+    """
+    versao = token_tabela(tabela, db_path)
+    if versao is None:
+        return None
+
+    conn = obter_conexao(db_path)
+    try:
+        row = conn.execute(
+            "SELECT instancia FROM versao_tabelas WHERE tabela = ?", (tabela,)
+        ).fetchone()
+        instancia = row[0] if row else None
+    except sqlite3.OperationalError:
+        # Contador criado por versão anterior (sem a coluna instancia)
+        instancia = None
+
+    if instancia is None:
+        try:
+            with transacao(db_path, imediata=True) as conn:
+                colunas = [c[1] for c in conn.execute("PRAGMA table_info(versao_tabelas)")]
+                if "instancia" not in colunas:
+                    conn.execute("ALTER TABLE versao_tabelas ADD COLUMN instancia TEXT")
+                conn.execute(
+                    "UPDATE versao_tabelas SET instancia = lower(hex(randomblob(8))) "
+                    "WHERE instancia IS NULL"
+                )
+                instancia = conn.execute(
+                    "SELECT instancia FROM versao_tabelas WHERE tabela = ?", (tabela,)
+                ).fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Token persistente indisponível para '{tabela}': {e}")
+            return None
+
+    return f"{instancia}:{versao}"
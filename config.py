@@ -12,9 +12,13 @@ from datetime import datetime
 # Diretório base do projeto (sobe um nível para C:\Scripts\Oris)
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Caminhos principais
-DATA_DIR = BASE_DIR / "data"
-DB_PATH = DATA_DIR / "oris.db"
+# Caminhos principais (ORIS_DB_PATH aponta para outro banco, ex.: benchmarks)
+if os.environ.get("ORIS_DB_PATH"):
+    DB_PATH = Path(os.environ["ORIS_DB_PATH"]).resolve()
+    DATA_DIR = DB_PATH.parent
+else:
+    DATA_DIR = BASE_DIR / "data"
+    DB_PATH = DATA_DIR / "oris.db"
 
 # Converte para string para compatibilidade com código legado
 DB_PATH_STR = str(DB_PATH)
@@ -22,8 +26,26 @@ DATA_DIR_STR = str(DATA_DIR)
 
 # ==================== VALIDAÇÃO ====================
 
-def validar_estrutura():
-    """Valida se a estrutura de pastas e arquivos está correta"""
+# Resultado da última validação (None = ainda não validado neste processo)
+_estrutura_validada = None
+
+def validar_estrutura(forcar=False):
+    """
+    Valida se a estrutura de pastas e arquivos está correta
+
+    O sistema de arquivos é verificado uma única vez por processo; chamadas
+    seguintes devolvem o resultado guardado.
+
+    Args:
+        forcar: Verifica novamente (ex.: depois de criar o banco)
+
+    Returns:
+        True se a estrutura está correta
+    """
+    global _estrutura_validada
+    if _estrutura_validada is not None and not forcar:
+        return _estrutura_validada
+
     problemas = []
 
     # Verifica pasta data
@@ -40,11 +62,12 @@ def validar_estrutura():
             else:
                 problemas.append("[i] Pasta data/ está vazia")
 
+    _estrutura_validada = not problemas
     if problemas:
-        print("\n".join(problemas))
+        print("\n".join(problemas), file=sys.stderr)
         return False
 
-    print(f"[OK] Config validado: {DB_PATH}")
+    print(f"[OK] Config validado: {DB_PATH}", file=sys.stderr)
     return True
 
 # ==================== CONFIGURAÇÕES DA APLICAÇÃO ====================
@@ -57,13 +80,103 @@ APP_ICON = "📊"
 # Data mínima para processar vagas
 DATA_MINIMA_VAGAS = datetime(2025, 1, 1)
 
-# Configurações de cache (Streamlit)
-CACHE_TTL = 600  # 10 minutos
+# Vagas exibidas por página em "Vagas Cadastradas"
+VAGAS_POR_PAGINA = 50
+
+# Motor do cálculo de déficit: 'sql' (agregação no SQLite) ou 'pandas'
+MOTOR_DEFICIT = "sql"
+
+# Processos do cálculo de déficit por contrato (None: um por CPU; 1 calcula em série)
+DEFICIT_PROCESSOS = None
+
+# Relatórios com menos linhas são calculados em série (abrir processos custa mais)
+DEFICIT_LINHAS_MINIMAS_PROCESSOS = 200_000
 
 # Logging
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
+# Perfil de desempenho (painel "Perfil da execução" e log de spans em JSON lines)
+PERFIL_SEMPRE_ATIVO = False  # Coleta em toda execução, mesmo sem o painel aberto
+PERFIL_LOG_ARQUIVO = BASE_DIR / "logs" / "perfil.jsonl"
+PERFIL_LOG_MAX_BYTES = 5 * 1024 * 1024  # 5 MB por arquivo
+PERFIL_LOG_ARQUIVOS = 3  # Arquivos antigos mantidos na rotação
+
+# ==================== BANCO DE DADOS (SQLite) ====================
+
+# Modo de journal (WAL permite leituras concorrentes com escritas)
+DB_JOURNAL_MODE = "WAL"
+
+# Tempo de espera por locks antes de falhar (ms)
+DB_BUSY_TIMEOUT_MS = 5000
+
+# Cache de páginas por conexão em KiB (PRAGMA cache_size negativo)
+DB_CACHE_SIZE_KB = 64 * 1024
+
+# Tamanho máximo do mmap em bytes (0 desativa)
+DB_MMAP_SIZE = 256 * 1024 * 1024
+
+# Quantidade de prepared statements mantidos em cache por conexão
+DB_CACHED_STATEMENTS = 256
+
+# Conexões ociosas mantidas no pool do processo, por banco (as excedentes são fechadas)
+DB_CONEXOES_OCIOSAS = 8
+
+# ==================== ESQUEMA DAS TABELAS ====================
+
+# Tipos aplicados no carregamento (dados.py):
+#   'texto' (object), 'categoria', 'float32', 'numero' (to_numeric), 'data' (datetime64)
+# As datas de situação ficam como texto: motor_vagas escolhe a primeira
+# coluna preenchida pelo texto original, e uma data inválida (NaT depois de
+# convertida) ainda conta como preenchida
+ESQUEMA_TABELAS = {
+    'relatorio_oris': {
+        'Nome': 'texto',
+        'Cargo': 'categoria',
+        'Centro custo': 'categoria',
+        'Nome Fantasia': 'categoria',
+        'Situação': 'categoria',
+        'Carga Horária Semanal': 'float32',
+        'Dt Rescisão': 'data',
+        'Dt Início Situação': 'texto',
+        'Dt Inicio Situação': 'texto',
+        'Dt Situação': 'texto',
+    },
+    'tlp': {
+        'contrato': 'texto',
+        'unidade': 'texto',
+        'cargo': 'texto',
+        'carga_hora': 'float32',
+        'quantidade_ideal': 'numero',
+    },
+}
+
+# Colunas lidas por cada consumidor (subconjunto de ESQUEMA_TABELAS)
+COLUNAS_POR_PAGINA = {
+    'aprovar_vaga': {
+        'relatorio_oris': [
+            'Nome', 'Cargo', 'Centro custo', 'Nome Fantasia', 'Situação',
+            'Carga Horária Semanal', 'Dt Rescisão', 'Dt Início Situação',
+            'Dt Inicio Situação', 'Dt Situação'
+        ],
+        'tlp': ['contrato', 'unidade', 'cargo', 'carga_hora', 'quantidade_ideal'],
+    },
+    'quadro_func': {
+        'relatorio_oris': ['Nome', 'Cargo', 'Centro custo', 'Situação'],
+    },
+    'deficit': {
+        'relatorio_oris': [
+            'Nome', 'Cargo', 'Centro custo', 'Nome Fantasia', 'Situação',
+            'Carga Horária Semanal'
+        ],
+        'tlp': ['contrato', 'unidade', 'cargo', 'carga_hora', 'quantidade_ideal'],
+    },
+}
+
+# Tabelas com snapshot colunar em disco para partida rápida
+# (Arrow IPC em <pasta do banco>/cache/; requer pyarrow, lista vazia desativa)
+SNAPSHOT_COLUNAR_TABELAS = ['relatorio_oris']
+
 # ==================== TABELAS DO BANCO ====================
 
 TABELAS_NECESSARIAS = {
@@ -88,13 +201,14 @@ TIPO_VAGA = {
 
 # ==================== INICIALIZAÇÃO ====================
 
-# Valida estrutura ao importar
+# Valida estrutura ao importar (única validação do processo; os demais
+# módulos apenas importam o config)
 if __name__ != "__main__":
     if not validar_estrutura():
-        print("\n⚠️ AVISO: Problemas encontrados na estrutura do projeto")
-        print(f"📂 Diretório atual: {Path.cwd()}")
-        print(f"📂 BASE_DIR esperado: {BASE_DIR}")
-        print(f"📂 DATA_DIR esperado: {DATA_DIR}")
+        print("\n⚠️ AVISO: Problemas encontrados na estrutura do projeto", file=sys.stderr)
+        print(f"📂 Diretório atual: {Path.cwd()}", file=sys.stderr)
+        print(f"📂 BASE_DIR esperado: {BASE_DIR}", file=sys.stderr)
+        print(f"📂 DATA_DIR esperado: {DATA_DIR}", file=sys.stderr)
 
 # ==================== EXPORTAÇÕES ====================
 
@@ -107,7 +221,23 @@ __all__ = [
     'APP_TITLE',
     'APP_VERSION',
     'DATA_MINIMA_VAGAS',
-    'CACHE_TTL',
+    'VAGAS_POR_PAGINA',
+    'MOTOR_DEFICIT',
+    'DEFICIT_PROCESSOS',
+    'DEFICIT_LINHAS_MINIMAS_PROCESSOS',
+    'PERFIL_SEMPRE_ATIVO',
+    'PERFIL_LOG_ARQUIVO',
+    'PERFIL_LOG_MAX_BYTES',
+    'PERFIL_LOG_ARQUIVOS',
+    'DB_JOURNAL_MODE',
+    'DB_BUSY_TIMEOUT_MS',
+    'DB_CACHE_SIZE_KB',
+    'DB_MMAP_SIZE',
+    'DB_CACHED_STATEMENTS',
+    'DB_CONEXOES_OCIOSAS',
+    'ESQUEMA_TABELAS',
+    'COLUNAS_POR_PAGINA',
+    'SNAPSHOT_COLUNAR_TABELAS',
     'TABELAS_NECESSARIAS',
     'STATUS_VAGA',
     'TIPO_VAGA',
@@ -129,5 +259,5 @@ if __name__ == "__main__":
     print(f"\nBASE_DIR: {BASE_DIR}")
     print(f"DATA_DIR: {DATA_DIR}")
     print(f"DB_PATH: {DB_PATH}")
-    print(f"\n{'OK - TUDO CERTO!' if validar_estrutura() else 'ERRO - PROBLEMAS ENCONTRADOS'}")
+    print(f"\n{'OK - TUDO CERTO!' if validar_estrutura(forcar=True) else 'ERRO - PROBLEMAS ENCONTRADOS'}")
     print("=" * 60)
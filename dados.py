@@ -0,0 +1,329 @@
+"""
+Carregamento das tabelas do banco com projeção de colunas e tipos explícitos
+Lê apenas as colunas declaradas em COLUNAS_POR_PAGINA e aplica os tipos
+de ESQUEMA_TABELAS (config.py)
+
+obter_tabela() mantém uma única cópia de cada tabela por processo,
+compartilhada entre páginas e sessões e recarregada só quando a tabela muda.
+Tabelas grandes também ganham um snapshot colunar em disco (Arrow IPC),
+lido por memory-map na partida enquanto a tabela não mudar.
+"""
+
+import pandas as pd
+import threading
+import os
+import logging
+
+from conexao import obter_conexao, token_persistente, fechar_conexoes_ociosas
+from motor_vagas import converter_datas
+from instrumentacao import cronometrado
+
+# Snapshot colunar em disco é opcional (pyarrow)
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Importa configuração centralizada
+try:
+    from config import (
+        DB_PATH_STR as DB_PATH,
+        ESQUEMA_TABELAS,
+        COLUNAS_POR_PAGINA,
+        SNAPSHOT_COLUNAR_TABELAS
+    )
+except ImportError:
+    # Fallback para compatibilidade: sem esquema, carrega todas as colunas
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DB_PATH = os.path.join(BASE_DIR, "data", "oris.db")
+    ESQUEMA_TABELAS = {}
+    COLUNAS_POR_PAGINA = {}
+    SNAPSHOT_COLUNAR_TABELAS = []
+
+logger = logging.getLogger(__name__)
+
+# Copy-on-Write (sempre ativo no pandas >= 3): projeções, recortes e
+# renomeações das tabelas compartilhadas não duplicam dados, e escritas em
+# objetos derivados nunca alcançam a cópia compartilhada
+if pd.__version__.startswith("2."):
+    pd.set_option("mode.copy_on_write", True)
+
+# ==================== ESQUEMA ====================
+
+def colunas_tabela(conn, tabela):
+    """Nomes das colunas existentes em uma tabela do banco"""
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{tabela}")')]
+
+def colunas_declaradas(tabela, pagina=None):
+    """
+    Colunas declaradas de uma tabela para um consumidor
+
+    Args:
+        tabela: Nome da tabela
+        pagina: Chave de COLUNAS_POR_PAGINA (None = união das colunas de
+            todas as páginas, usada pelo armazenamento compartilhado)
+
+    Returns:
+        Lista de colunas ou None se não há declaração (carrega tudo)
+    """
+    if pagina is not None:
+        colunas = COLUNAS_POR_PAGINA.get(pagina, {}).get(tabela)
+        if colunas is not None:
+            return list(colunas)
+    else:
+        uniao = []
+        for colunas_pagina in COLUNAS_POR_PAGINA.values():
+            uniao.extend(c for c in colunas_pagina.get(tabela, []) if c not in uniao)
+        if uniao:
+            return uniao
+    esquema = ESQUEMA_TABELAS.get(tabela)
+    return list(esquema) if esquema else None
+
+def aplicar_tipos(df, tabela):
+    """
+    Converte as colunas do DataFrame para os tipos declarados em ESQUEMA_TABELAS
+
+    Args:
+        df: DataFrame lido do banco
+        tabela: Nome da tabela de origem
+
+    Returns:
+        O próprio DataFrame, com as colunas convertidas
+    """
+    for coluna, tipo in ESQUEMA_TABELAS.get(tabela, {}).items():
+        if coluna not in df.columns:
+            continue
+        if tipo == 'categoria':
+            df[coluna] = df[coluna].astype('category')
+        elif tipo == 'float32':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float32')
+        elif tipo == 'numero':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+        elif tipo == 'data':
+            df[coluna] = converter_datas(df[coluna])
+    return df
+
+# ==================== CARREGAMENTO ====================
+
+@cronometrado(categoria="carga")
+def carregar_tabela(tabela, pagina=None, conn=None, db_path=None, filtro=None, parametros=()):
+    """
+    Carrega uma tabela lendo só as colunas necessárias, já tipadas
+
+    Colunas declaradas que não existem no banco são ignoradas. A ordem
+    das linhas é a de inserção (rowid).
+
+    Args:
+        tabela: Nome da tabela
+        pagina: Chave de COLUNAS_POR_PAGINA com as colunas do consumidor
+        conn: Conexão a usar (padrão: conexão da thread para db_path)
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        filtro: Condição SQL opcional (cláusula WHERE, com marcadores '?')
+        parametros: Valores dos marcadores de 'filtro'
+
+    Returns:
+        DataFrame
+    """
+    if conn is None:
+        conn = obter_conexao(db_path)
+
+    declaradas = colunas_declaradas(tabela, pagina)
+    if declaradas is None:
+        selecao = "*"
+    else:
+        existentes = set(colunas_tabela(conn, tabela))
+        faltando = [c for c in declaradas if c not in existentes]
+        if faltando:
+            logger.debug(f"Colunas ausentes em '{tabela}': {faltando}")
+        selecao = ", ".join(f'"{c}"' for c in declaradas if c in existentes) or "*"
+
+    where = f" WHERE {filtro}" if filtro else ""
+    df = pd.read_sql_query(
+        f'SELECT {selecao} FROM "{tabela}"{where} ORDER BY rowid', conn, params=tuple(parametros)
+    )
+    return aplicar_tipos(df, tabela)
+
+# ==================== ARMAZENAMENTO COMPARTILHADO ====================
+
+# {(caminho do banco, tabela): (token, DataFrame)}
+_armazem = {}
+_armazem_lock = threading.Lock()
+
+# Um lock por tabela: sessões concorrentes esperam uma única carga
+_locks_carga = {}
+
+def _lock_carga(chave):
+    """Lock de carga de uma entrada do armazenamento"""
+    with _armazem_lock:
+        return _locks_carga.setdefault(chave, threading.Lock())
+
+@cronometrado(categoria="carga")
+def obter_tabela(tabela, db_path=None):
+    """
+    Retorna a tabela do armazenamento compartilhado do processo
+
+    A versão da tabela (contador mantido por triggers mais a instância do
+    banco, ver conexao.token_persistente) é conferida a cada chamada; a
+    tabela só é relida quando mudou ou quando o arquivo do banco foi
+    substituído por outro. O DataFrame retornado é compartilhado: não o altere.
+
+    Args:
+        tabela: Nome da tabela
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        DataFrame com as colunas de todas as páginas, ou None se a tabela não existe
+    """
+    chave = (str(db_path or DB_PATH), tabela)
+    token = token_persistente(tabela, db_path)
+    if token is None:
+        return None
+
+    entrada = _armazem.get(chave)
+    if entrada is not None and entrada[0] == token:
+        return entrada[1]
+
+    with _lock_carga(chave):
+        # Outra sessão pode ter carregado enquanto esperávamos o lock
+        entrada = _armazem.get(chave)
+        if entrada is not None and entrada[0] == token:
+            return entrada[1]
+
+        # Partida rápida: snapshot colunar em disco da mesma versão da tabela
+        df = None
+        token_disco = None
+        if tabela in SNAPSHOT_COLUNAR_TABELAS and pa is not None:
+            token_disco = token
+            df = ler_snapshot(tabela, token_disco, db_path)
+
+        origem = "snapshot colunar"
+        if df is None:
+            origem = "banco"
+            df = carregar_tabela(tabela, db_path=db_path)
+            if token_disco is not None:
+                _gravar_snapshot_em_segundo_plano(tabela, df, token_disco, db_path)
+
+        with _armazem_lock:
+            _armazem[chave] = (token, df)
+        logger.info(f"✅ '{tabela}' carregada do {origem}: {len(df)} linhas (versão {token})")
+        return df
+
+def versao_tabela(tabela, db_path=None):
+    """
+    Versão atual de uma tabela (chave para caches derivados, como índices)
+
+    Inclui a instância do banco: o contador sozinho pode se repetir quando o
+    arquivo é substituído por outro banco.
+    """
+    return token_persistente(tabela, db_path)
+
+def invalidar_armazenamento(tabela=None):
+    """
+    Descarta tabelas do armazenamento compartilhado
+
+    Fecha também as conexões ociosas do pool, para que a próxima leitura
+    abra o arquivo atual do banco (que pode ter sido substituído).
+
+    Args:
+        tabela: Nome da tabela ou None para descartar todas
+    """
+    with _armazem_lock:
+        for chave in list(_armazem):
+            if tabela is None or chave[1] == tabela:
+                del _armazem[chave]
+    fechar_conexoes_ociosas()
+    logger.info(f"Armazenamento compartilhado invalidado: {tabela or 'todas as tabelas'}")
+
+# ==================== SNAPSHOT COLUNAR EM DISCO ====================
+
+# Snapshots sendo gravados em segundo plano (evita gravações duplicadas)
+_snapshots_em_gravacao = set()
+
+def caminho_snapshot(tabela, db_path=None):
+    """Arquivo Arrow IPC da tabela, na pasta 'cache' ao lado do banco"""
+    pasta = os.path.join(os.path.dirname(os.path.abspath(str(db_path or DB_PATH))), "cache")
+    return os.path.join(pasta, f"{tabela}.arrow")
+
+def _assinatura_esquema(tabela):
+    """Colunas e tipos declarados: um snapshot de outro esquema é descartado"""
+    tipos = ESQUEMA_TABELAS.get(tabela, {})
+    return repr([(c, tipos.get(c)) for c in colunas_declaradas(tabela) or []])
+
+@cronometrado(categoria="carga")
+def ler_snapshot(tabela, token, db_path=None):
+    """
+    Lê o snapshot colunar da tabela por memory-map, se for da versão 'token'
+
+    Args:
+        tabela: Nome da tabela
+        token: Token persistente atual (conexao.token_persistente)
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        DataFrame (com os tipos já aplicados) ou None se ausente ou desatualizado
+    """
+    caminho = caminho_snapshot(tabela, db_path)
+    if pa is None or token is None or not os.path.exists(caminho):
+        return None
+
+    try:
+        leitor = pa.ipc.open_file(pa.memory_map(caminho, "r"))
+        metadados = leitor.schema.metadata or {}
+        if (metadados.get(b"oris_token") != token.encode()
+                or metadados.get(b"oris_esquema") != _assinatura_esquema(tabela).encode()):
+            logger.info(f"Snapshot colunar de '{tabela}' desatualizado")
+            return None
+        return leitor.read_all().to_pandas()
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível ler o snapshot colunar de '{tabela}': {e}")
+        return None
+
+def gravar_snapshot(tabela, df, token, db_path=None):
+    """
+    Grava o snapshot colunar da tabela (arquivo temporário + troca atômica)
+
+    Args:
+        tabela: Nome da tabela
+        df: DataFrame já tipado (saída de carregar_tabela)
+        token: Token persistente da versão contida em 'df'
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+    """
+    caminho = caminho_snapshot(tabela, db_path)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+    tabela_arrow = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela_arrow.schema.metadata or {})
+    metadados[b"oris_token"] = token.encode()
+    metadados[b"oris_esquema"] = _assinatura_esquema(tabela).encode()
+    tabela_arrow = tabela_arrow.replace_schema_metadata(metadados)
+
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with pa.OSFile(temporario, "wb") as destino:
+            with pa.ipc.new_file(destino, tabela_arrow.schema) as writer:
+                writer.write_table(tabela_arrow)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+def _gravar_snapshot_em_segundo_plano(tabela, df, token, db_path=None):
+    """Grava o snapshot em uma thread, sem atrasar a página que carregou a tabela"""
+    caminho = caminho_snapshot(tabela, db_path)
+    with _armazem_lock:
+        if caminho in _snapshots_em_gravacao:
+            return
+        _snapshots_em_gravacao.add(caminho)
+
+    def tarefa():
+        try:
+            gravar_snapshot(tabela, df, token, db_path)
+            logger.info(f"💾 Snapshot colunar de '{tabela}' gravado: {caminho}")
+        except Exception as e:
+            # Ex.: Windows não troca o arquivo enquanto outro processo o mapeia
+            logger.warning(f"⚠️ Não foi possível gravar o snapshot colunar de '{tabela}': {e}")
+        finally:
+            with _armazem_lock:
+                _snapshots_em_gravacao.discard(caminho)
+
+    threading.Thread(target=tarefa, name=f"snapshot-{tabela}", daemon=True).start()
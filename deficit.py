@@ -0,0 +1,781 @@
+"""
+Cálculo e materialização do déficit de funcionários (TLP x quadro atual)
+
+O resultado é gravado na tabela 'deficit_snapshot', recalculada apenas
+quando 'relatorio_oris' ou 'tlp' mudam. O dashboard só lê o snapshot.
+
+Há dois motores com o mesmo resultado: calcular_deficit() (pandas, sobre
+DataFrames) e calcular_deficit_sql() (agregação dentro do SQLite, que só
+devolve as linhas já agrupadas).
+
+Cada contrato tem o seu snapshot; atualizar_deficit_contratos() recalcula
+os contratos desatualizados em paralelo (um processo por contrato).
+
+Uso por linha de comando (após importar os dados, atualiza todos os contratos):
+    python deficit.py
+"""
+
+import pandas as pd
+import numpy as np
+import unicodedata
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import os
+import logging
+
+from conexao import obter_conexao, transacao, token_tabela, token_persistente
+from dados import carregar_tabela, aplicar_tipos, colunas_tabela
+from instrumentacao import cronometrado
+
+# Importa configuração centralizada
+try:
+    from config import (
+        DB_PATH_STR as DB_PATH,
+        ESQUEMA_TABELAS,
+        MOTOR_DEFICIT,
+        DEFICIT_PROCESSOS,
+        DEFICIT_LINHAS_MINIMAS_PROCESSOS
+    )
+except ImportError:
+    # Fallback para compatibilidade
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DB_PATH = os.path.join(BASE_DIR, "data", "oris.db")
+    ESQUEMA_TABELAS = {}
+    MOTOR_DEFICIT = "pandas"
+    DEFICIT_PROCESSOS = None
+    DEFICIT_LINHAS_MINIMAS_PROCESSOS = 200_000
+
+logger = logging.getLogger(__name__)
+
+# Contrato analisado pelo dashboard de déficit
+CONTRATO_PADRAO = "SBCD - REDE ASSIST. NORTE-SP"
+
+# Incrementar sempre que a regra de cálculo mudar (força recálculo do snapshot)
+# 2: a TLP também é filtrada pelo contrato (coluna 'contrato')
+# 3: carga horária gravada com 2 casas (sem o resíduo do float32)
+VERSAO_CALCULO = 3
+
+CHAVES_DEFICIT = ["Centro custo", "Cargo", "Carga Horária Semanal"]
+
+# Colunas do DataFrame de calcular_deficit() -> colunas da tabela deficit_snapshot
+COLUNAS_SNAPSHOT = {
+    "Centro custo": "centro_custo",
+    "Cargo": "cargo",
+    "Carga Horária Semanal": "carga_horaria",
+    "Qtd_Necessaria": "qtd_necessaria",
+    "Qtd_Ativos": "qtd_ativos",
+    "Qtd_Afastados": "qtd_afastados",
+    "Deficit": "deficit",
+    "Excedente": "excedente",
+    "Funcionarios_Contratar": "funcionarios_contratar",
+}
+
+# ==================== CÁLCULO ====================
+
+@lru_cache(maxsize=4096)
+def _strip_accents_upper(text):
+    """Remove acentos e converte para maiúsculas"""
+    s = str(text).upper()
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return s.strip()
+
+def mascara_contrato(serie, contrato):
+    """
+    Máscara das linhas cujo contrato normalizado é igual a 'contrato'
+
+    Normaliza só os valores distintos (poucas dezenas) e mapeia o resultado
+    de volta pelos códigos de fatoração; valores nulos nunca casam.
+    """
+    alvo = _strip_accents_upper(contrato)
+    codigos, unicos = pd.factorize(serie)
+    iguais = np.array([_strip_accents_upper(v) == alvo for v in unicos] + [False], dtype=bool)
+    return iguais[codigos]
+
+def _contar_por_chave(relatorio, carga, mascara, coluna):
+    """
+    Conta funcionários (Nome preenchido) por centro de custo, cargo e carga
+    horária nas linhas da máscara, fatiando só as colunas de chave
+    """
+    chaves = [relatorio["Centro custo"][mascara], relatorio["Cargo"][mascara], carga[mascara]]
+    return (
+        relatorio["Nome"][mascara]
+        .groupby(chaves, observed=True)
+        .count()
+        .rename_axis(CHAVES_DEFICIT)
+        .rename(coluna)
+        .reset_index()
+    )
+
+@cronometrado(categoria="processamento")
+def calcular_deficit(tlp, relatorio, contrato=CONTRATO_PADRAO):
+    """
+    Calcula déficit de funcionários
+
+    Args:
+        tlp: DataFrame da TLP
+        relatorio: DataFrame do relatório ORIS
+        contrato: Nome Fantasia do contrato analisado (None se o relatório
+            e a TLP já vêm filtrados pelo contrato)
+
+    Returns:
+        DataFrame com uma linha por linha da TLP do contrato (na mesma ordem) ou None
+    """
+    if tlp is None or relatorio is None:
+        return None
+
+    # TLP sem a coluna 'contrato' vale para qualquer contrato
+    if contrato is not None and "contrato" in tlp.columns:
+        tlp = tlp[mascara_contrato(tlp["contrato"], contrato)]
+
+    # Filtra apenas o contrato analisado (máscara; o relatório pode ser compartilhado)
+    no_contrato = np.ones(len(relatorio), dtype=bool)
+    if contrato is not None and "Nome Fantasia" in relatorio.columns:
+        no_contrato = mascara_contrato(relatorio["Nome Fantasia"], contrato)
+
+    # Separa ativos e afastados
+    situacao = relatorio["Situação"]
+    eh_ativo = no_contrato & (situacao == "01-ATIVO").to_numpy()
+    eh_afastado = no_contrato & ~situacao.isin(["01-ATIVO", "99-Demitido"]).to_numpy()
+
+    # Converte carga horária para float uma única vez
+    carga = pd.to_numeric(relatorio["Carga Horária Semanal"], errors='coerce').astype(float)
+
+    # Agrupa ativos e afastados POR CARGA HORÁRIA
+    ativos_agrupado = _contar_por_chave(relatorio, carga, eh_ativo, "Qtd_Ativos")
+    afastados_agrupado = _contar_por_chave(relatorio, carga, eh_afastado, "Qtd_Afastados")
+
+    # Renomeia colunas TLP para padronizar E converte carga_hora para float
+    tlp_prep = tlp.rename(columns={
+        "unidade": "Centro custo",
+        "cargo": "Cargo",
+        "carga_hora": "Carga Horária Semanal",
+        "quantidade_ideal": "Qtd_Necessaria"
+    })
+
+    # Garante que a coluna de carga horária é numérica na TLP também
+    tlp_prep["Carga Horária Semanal"] = pd.to_numeric(tlp_prep["Carga Horária Semanal"], errors='coerce').astype(float)
+
+    # Merge TLP com ativos e afastados (incluindo carga horária)
+    resultado = pd.merge(
+        tlp_prep[CHAVES_DEFICIT + ["Qtd_Necessaria"]],
+        ativos_agrupado,
+        on=CHAVES_DEFICIT,
+        how="left"
+    )
+    resultado = pd.merge(
+        resultado,
+        afastados_agrupado,
+        on=CHAVES_DEFICIT,
+        how="left"
+    )
+
+    return _finalizar_deficit(resultado)
+
+def _finalizar_deficit(resultado):
+    """Preenche as contagens ausentes e calcula déficit, excedente e contratações"""
+    # float32 só serve para casar as chaves; exibida e gravada com 2 casas
+    resultado["Carga Horária Semanal"] = resultado["Carga Horária Semanal"].astype(float).round(2)
+
+    # Preenche valores nulos
+    resultado["Qtd_Ativos"] = resultado["Qtd_Ativos"].fillna(0).astype(int)
+    resultado["Qtd_Afastados"] = resultado["Qtd_Afastados"].fillna(0).astype(int)
+    resultado["Qtd_Necessaria"] = resultado["Qtd_Necessaria"].fillna(0).astype(int)
+
+    # Calcula déficit
+    resultado["Deficit"] = resultado["Qtd_Necessaria"] - resultado["Qtd_Ativos"]
+    resultado["Excedente"] = (-resultado["Deficit"]).clip(lower=0)
+    resultado["Funcionarios_Contratar"] = resultado["Deficit"].clip(lower=0)
+
+    return resultado
+
+# ==================== CÁLCULO NO BANCO ====================
+
+# Índice de cobertura: a agregação lê só o índice, sem visitar a tabela
+SQL_CRIAR_INDICE_DEFICIT = """
+    CREATE INDEX IF NOT EXISTS idx_relatorio_oris_deficit
+    ON relatorio_oris (
+        contrato_normalizado, "Centro custo", "Cargo",
+        "Carga Horária Semanal", "Situação", "Nome"
+    )
+"""
+
+# Contagens por chave no banco, ligadas à TLP (uma linha por linha da TLP do
+# contrato; {filtro_tlp} é vazio se a TLP não tem a coluna 'contrato').
+# A carga horária é agrupada como está gravada e só depois convertida por
+# numero_oris() (uma chamada por grupo), como calcular_deficit() faz em pandas
+SQL_DEFICIT = """
+    WITH grupos AS (
+        SELECT
+            "Centro custo" AS centro_custo,
+            "Cargo" AS cargo,
+            "Carga Horária Semanal" AS carga,
+            COUNT(CASE WHEN "Situação" = '01-ATIVO' THEN "Nome" END) AS qtd_ativos,
+            COUNT(CASE WHEN "Situação" IS NULL
+                        OR "Situação" NOT IN ('01-ATIVO', '99-Demitido') THEN "Nome" END) AS qtd_afastados
+        FROM relatorio_oris
+        WHERE contrato_normalizado = :contrato
+        GROUP BY "Centro custo", "Cargo", "Carga Horária Semanal"
+    ),
+    contagens AS (
+        SELECT
+            centro_custo,
+            cargo,
+            numero_oris(carga, :tipo_carga_relatorio) AS carga,
+            SUM(qtd_ativos) AS qtd_ativos,
+            SUM(qtd_afastados) AS qtd_afastados
+        FROM grupos
+        GROUP BY 1, 2, 3
+    )
+    SELECT
+        t.unidade AS "Centro custo",
+        t.cargo AS "Cargo",
+        t.carga_hora AS "Carga Horária Semanal",
+        t.quantidade_ideal AS "Qtd_Necessaria",
+        c.qtd_ativos AS "Qtd_Ativos",
+        c.qtd_afastados AS "Qtd_Afastados"
+    FROM tlp t
+    LEFT JOIN contagens c
+        ON c.centro_custo = t.unidade
+        AND c.cargo = t.cargo
+        AND c.carga = numero_oris(t.carga_hora, :tipo_carga_tlp)
+    {filtro_tlp}
+    ORDER BY t.rowid
+"""
+
+SQL_FILTRO_TLP_CONTRATO = "WHERE normalizar_contrato(t.contrato) = :contrato"
+
+def _normalizar_contrato(valor):
+    """Função SQL normalizar_contrato(valor): _strip_accents_upper() que preserva NULL"""
+    return None if valor is None else _strip_accents_upper(valor)
+
+def _numero_oris(valor, tipo):
+    """
+    Função SQL numero_oris(valor, tipo): converte um valor como
+    dados.aplicar_tipos() (to_numeric e, se 'float32', precisão simples)
+
+    Returns:
+        float ou None (NULL) se o valor não é numérico
+    """
+    if valor is None:
+        return None
+    numero = pd.to_numeric(valor, errors='coerce')
+    if pd.isna(numero):
+        return None
+    if tipo == 'float32':
+        numero = np.float32(numero)
+    return float(numero)
+
+def garantir_indices_deficit(db_path=None):
+    """Cria o índice de cobertura do cálculo no banco (se o banco permitir escrita)"""
+    try:
+        obter_conexao(db_path).execute(SQL_CRIAR_INDICE_DEFICIT)
+    except Exception as e:
+        logger.warning(f"⚠️ Índice do déficit indisponível: {e}")
+
+@cronometrado(categoria="processamento")
+def calcular_deficit_sql(contrato=CONTRATO_PADRAO, db_path=None):
+    """
+    Calcula o déficit agregando o relatório dentro do SQLite
+
+    Só as linhas da TLP, já com as contagens, saem do banco: o tempo não
+    depende do tamanho do relatório carregado em memória. O resultado é
+    idêntico ao de calcular_deficit().
+
+    Args:
+        contrato: Nome Fantasia do contrato analisado
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        DataFrame com uma linha por linha da TLP do contrato (na mesma ordem)
+        ou None se o cálculo no banco não está disponível (use calcular_deficit())
+    """
+    if not garantir_contrato_normalizado(db_path):
+        return None
+    garantir_indices_deficit(db_path)
+
+    try:
+        conn = obter_conexao(db_path)
+        conn.create_function("numero_oris", 2, _numero_oris, deterministic=True)
+        conn.create_function("normalizar_contrato", 1, _normalizar_contrato, deterministic=True)
+        filtro_tlp = SQL_FILTRO_TLP_CONTRATO if "contrato" in colunas_tabela(conn, "tlp") else ""
+
+        parametros = {
+            "contrato": _strip_accents_upper(contrato),
+            "tipo_carga_relatorio": ESQUEMA_TABELAS.get("relatorio_oris", {}).get("Carga Horária Semanal"),
+            "tipo_carga_tlp": ESQUEMA_TABELAS.get("tlp", {}).get("carga_hora"),
+        }
+        resultado = pd.read_sql_query(SQL_DEFICIT.format(filtro_tlp=filtro_tlp), conn, params=parametros)
+    except Exception as e:
+        logger.error(f"❌ Erro no cálculo do déficit no banco: {e}")
+        return None
+
+    # Mesmos tipos da TLP carregada por carregar_tabela() no motor pandas
+    tlp_tipada = aplicar_tipos(
+        resultado[["Carga Horária Semanal", "Qtd_Necessaria"]].rename(
+            columns={"Carga Horária Semanal": "carga_hora", "Qtd_Necessaria": "quantidade_ideal"}
+        ),
+        "tlp"
+    )
+    resultado["Carga Horária Semanal"] = pd.to_numeric(tlp_tipada["carga_hora"], errors='coerce').astype(float)
+    resultado["Qtd_Necessaria"] = tlp_tipada["quantidade_ideal"]
+
+    # O merge do motor pandas com chaves categóricas devolve as chaves de texto como object
+    resultado[["Centro custo", "Cargo"]] = resultado[["Centro custo", "Cargo"]].astype(object)
+
+    return _finalizar_deficit(resultado)
+
+# ==================== CONTRATO NORMALIZADO ====================
+
+SQL_CRIAR_INDICE_CONTRATO = """
+    CREATE INDEX IF NOT EXISTS idx_relatorio_oris_contrato
+    ON relatorio_oris (contrato_normalizado)
+"""
+
+def garantir_contrato_normalizado(db_path=None):
+    """
+    Garante a coluna indexada 'contrato_normalizado' em relatorio_oris
+
+    Cria a coluna e o índice se necessário e preenche as linhas ainda sem
+    valor (recém-importadas), normalizando cada Nome Fantasia distinto uma
+    única vez. Deve ser chamada após cada importação do relatório.
+
+    Returns:
+        True se a coluna está disponível para filtro, False caso contrário
+    """
+    try:
+        conn = obter_conexao(db_path)
+        colunas = [row[1] for row in conn.execute('PRAGMA table_info("relatorio_oris")')]
+        if "Nome Fantasia" not in colunas:
+            return False
+
+        if "contrato_normalizado" not in colunas:
+            with transacao(db_path, imediata=True) as conn:
+                conn.execute("ALTER TABLE relatorio_oris ADD COLUMN contrato_normalizado TEXT")
+                conn.execute(SQL_CRIAR_INDICE_CONTRATO)
+            logger.info("✅ Coluna 'contrato_normalizado' criada em relatorio_oris")
+        else:
+            conn.execute(SQL_CRIAR_INDICE_CONTRATO)
+
+        pendentes = conn.execute(
+            'SELECT DISTINCT "Nome Fantasia" FROM relatorio_oris '
+            'WHERE contrato_normalizado IS NULL AND "Nome Fantasia" IS NOT NULL'
+        ).fetchall()
+        if pendentes:
+            with transacao(db_path, imediata=True) as conn:
+                conn.executemany(
+                    'UPDATE relatorio_oris SET contrato_normalizado = ? '
+                    'WHERE "Nome Fantasia" = ? AND contrato_normalizado IS NULL',
+                    [(_strip_accents_upper(nome), nome) for (nome,) in pendentes]
+                )
+            logger.info(f"Contrato normalizado preenchido para {len(pendentes)} valor(es) de Nome Fantasia")
+
+        return True
+
+    except Exception as e:
+        # Banco somente leitura: o filtro por contrato é feito em memória
+        logger.warning(f"⚠️ Coluna 'contrato_normalizado' indisponível: {e}")
+        return False
+
+# ==================== SNAPSHOT ====================
+
+SQL_CRIAR_SNAPSHOT = """
+    CREATE TABLE IF NOT EXISTS deficit_snapshot (
+        contrato TEXT NOT NULL,
+        ordem INTEGER NOT NULL,
+        centro_custo TEXT,
+        cargo TEXT,
+        carga_horaria REAL,
+        qtd_necessaria INTEGER NOT NULL,
+        qtd_ativos INTEGER NOT NULL,
+        qtd_afastados INTEGER NOT NULL,
+        deficit INTEGER NOT NULL,
+        excedente INTEGER NOT NULL,
+        funcionarios_contratar INTEGER NOT NULL,
+        PRIMARY KEY (contrato, ordem)
+    ) WITHOUT ROWID
+"""
+
+SQL_CRIAR_INDICE_SNAPSHOT = """
+    CREATE INDEX IF NOT EXISTS idx_deficit_snapshot_chave
+    ON deficit_snapshot (contrato, centro_custo, cargo, carga_horaria)
+"""
+
+SQL_CRIAR_SNAPSHOT_META = """
+    CREATE TABLE IF NOT EXISTS deficit_snapshot_meta (
+        contrato TEXT PRIMARY KEY,
+        token TEXT NOT NULL,
+        atualizado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def _garantir_tabelas_snapshot(conn):
+    """Cria as tabelas do snapshot se ainda não existirem"""
+    conn.execute(SQL_CRIAR_SNAPSHOT)
+    conn.execute(SQL_CRIAR_INDICE_SNAPSHOT)
+    conn.execute(SQL_CRIAR_SNAPSHOT_META)
+
+def token_fontes(db_path=None):
+    """
+    Token das tabelas de origem do déficit
+
+    Combina a versão de 'relatorio_oris' e 'tlp' com VERSAO_CALCULO.
+    Retorna None se alguma das tabelas não existir.
+    """
+    relatorio = token_tabela("relatorio_oris", db_path)
+    tlp = token_tabela("tlp", db_path)
+    if relatorio is None or tlp is None:
+        return None
+    return f"v{VERSAO_CALCULO}:relatorio_oris={relatorio}:tlp={tlp}"
+
+@cronometrado(categoria="processamento")
+def carregar_fontes(contrato=CONTRATO_PADRAO, db_path=None):
+    """
+    Lê do banco apenas as colunas usadas no cálculo do déficit
+
+    O relatório já vem filtrado pelo contrato: via índice em
+    'contrato_normalizado' quando a coluna existe, senão em memória. A TLP
+    (pequena) é filtrada em memória.
+
+    Returns:
+        Tupla (tlp, relatorio)
+    """
+    tlp = carregar_tabela("tlp", "deficit", db_path=db_path)
+    if "contrato" in tlp.columns:
+        tlp = tlp[mascara_contrato(tlp["contrato"], contrato)]
+
+    if garantir_contrato_normalizado(db_path):
+        relatorio = carregar_tabela(
+            "relatorio_oris", "deficit", db_path=db_path,
+            filtro="contrato_normalizado = ?",
+            parametros=(_strip_accents_upper(contrato),)
+        )
+    else:
+        relatorio = carregar_tabela("relatorio_oris", "deficit", db_path=db_path)
+        if "Nome Fantasia" in relatorio.columns:
+            relatorio = relatorio[mascara_contrato(relatorio["Nome Fantasia"], contrato)]
+
+    return tlp, relatorio
+
+def _registros_snapshot(deficit_df):
+    """Converte o DataFrame de calcular_deficit() em tuplas (ordem, valores...)"""
+    df = deficit_df[list(COLUNAS_SNAPSHOT)].astype(object)
+    df = df.where(df.notna(), None)
+    return [(ordem, *valores) for ordem, valores in enumerate(df.itertuples(index=False, name=None))]
+
+@cronometrado(categoria="processamento")
+def atualizar_deficit_snapshot(contrato=CONTRATO_PADRAO, db_path=None, forcar=False):
+    """
+    Recalcula o snapshot do contrato se as tabelas de origem mudaram
+
+    A verificação é barata (lê apenas os contadores de versão). Quando há
+    recálculo, só as linhas que mudaram são regravadas.
+
+    Args:
+        contrato: Nome Fantasia do contrato
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        forcar: Recalcula mesmo que o token não tenha mudado
+
+    Returns:
+        Dict com 'atualizado' (bool), 'alteradas' e 'removidas', ou None em caso de erro
+    """
+    try:
+        # Preenche o contrato normalizado das linhas recém-importadas
+        garantir_contrato_normalizado(db_path)
+
+        token = token_fontes(db_path)
+        if token is None:
+            logger.warning("⚠️ Tabelas 'relatorio_oris' e/ou 'tlp' não encontradas")
+            return None
+
+        conn = obter_conexao(db_path)
+        _garantir_tabelas_snapshot(conn)
+
+        row = conn.execute(
+            "SELECT token FROM deficit_snapshot_meta WHERE contrato = ?", (contrato,)
+        ).fetchone()
+        if row and row[0] == token and not forcar:
+            return {'atualizado': False, 'alteradas': 0, 'removidas': 0}
+
+        return _gravar_snapshot(contrato, token, _calcular_deficit_contrato(contrato, db_path), db_path)
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao atualizar snapshot de déficit: {e}")
+        return None
+
+def _calcular_deficit_contrato(contrato, db_path=None):
+    """Déficit de um contrato pelo motor configurado (também roda nos processos de _calcular_contratos())"""
+    deficit_df = None
+    if MOTOR_DEFICIT == "sql":
+        deficit_df = calcular_deficit_sql(contrato, db_path)
+    if deficit_df is None:
+        tlp, relatorio = carregar_fontes(contrato, db_path)
+        deficit_df = calcular_deficit(tlp, relatorio, contrato=None)
+    return deficit_df
+
+def _gravar_snapshot(contrato, token, deficit_df, db_path=None):
+    """Grava o déficit do contrato no snapshot, regravando só as linhas que mudaram"""
+    novos = _registros_snapshot(deficit_df)
+
+    colunas = ", ".join(COLUNAS_SNAPSHOT.values())
+    with transacao(db_path, imediata=True) as conn:
+        atuais = {
+            registro[0]: registro
+            for registro in conn.execute(
+                f"SELECT ordem, {colunas} FROM deficit_snapshot WHERE contrato = ?",
+                (contrato,)
+            )
+        }
+
+        # Só regrava as linhas que mudaram
+        alteradas = [r for r in novos if atuais.get(r[0]) != r]
+        marcadores = ", ".join("?" * (len(COLUNAS_SNAPSHOT) + 2))
+        conn.executemany(
+            f"INSERT OR REPLACE INTO deficit_snapshot (contrato, ordem, {colunas}) VALUES ({marcadores})",
+            [(contrato, *r) for r in alteradas]
+        )
+
+        removidas = conn.execute(
+            "DELETE FROM deficit_snapshot WHERE contrato = ? AND ordem >= ?",
+            (contrato, len(novos))
+        ).rowcount
+
+        conn.execute(
+            "INSERT OR REPLACE INTO deficit_snapshot_meta (contrato, token, atualizado_em) "
+            "VALUES (?, ?, CURRENT_TIMESTAMP)",
+            (contrato, token)
+        )
+
+    logger.info(
+        f"✅ Snapshot de déficit atualizado ({contrato}): "
+        f"{len(alteradas)} linhas alteradas, {removidas} removidas"
+    )
+    return {'atualizado': True, 'alteradas': len(alteradas), 'removidas': removidas}
+
+def ler_deficit_snapshot(contrato=CONTRATO_PADRAO, db_path=None):
+    """
+    Lê o snapshot do contrato (mesmas colunas de calcular_deficit())
+
+    Returns:
+        DataFrame na ordem da TLP ou None se o snapshot não existe
+    """
+    try:
+        conn = obter_conexao(db_path)
+        colunas = ", ".join(f'{coluna} AS "{nome}"' for nome, coluna in COLUNAS_SNAPSHOT.items())
+        df = pd.read_sql_query(
+            f"SELECT {colunas} FROM deficit_snapshot WHERE contrato = ? ORDER BY ordem",
+            conn,
+            params=(contrato,)
+        )
+        return df
+    except Exception as e:
+        logger.error(f"❌ Erro ao ler snapshot de déficit: {e}")
+        return None
+
+@cronometrado(categoria="processamento")
+def obter_deficit(contrato=CONTRATO_PADRAO, db_path=None):
+    """Atualiza o snapshot se necessário e retorna o déficit do contrato"""
+    if atualizar_deficit_snapshot(contrato, db_path) is None:
+        return None
+    return ler_deficit_snapshot(contrato, db_path)
+
+# ==================== VÁRIOS CONTRATOS ====================
+
+# Um Nome Fantasia por contrato normalizado (grafias com e sem acento são o mesmo contrato)
+SQL_CONTRATOS = """
+    SELECT MIN("Nome Fantasia") FROM relatorio_oris
+    WHERE contrato_normalizado IS NOT NULL
+    GROUP BY contrato_normalizado
+    ORDER BY 1
+"""
+
+# Totais por contrato lidos do snapshot (visão consolidada do dashboard)
+SQL_RESUMO_CONTRATOS = """
+    SELECT
+        contrato AS "Contrato",
+        COUNT(*) AS "Cargos",
+        SUM(deficit > 0) AS "Cargos_Deficit",
+        SUM(qtd_necessaria) AS "Qtd_Necessaria",
+        SUM(qtd_ativos) AS "Qtd_Ativos",
+        SUM(qtd_afastados) AS "Qtd_Afastados",
+        SUM(funcionarios_contratar) AS "Funcionarios_Contratar",
+        SUM(excedente) AS "Excedente"
+    FROM deficit_snapshot
+    WHERE contrato IN ({marcadores})
+    GROUP BY contrato
+    ORDER BY "Funcionarios_Contratar" DESC, contrato
+"""
+
+@lru_cache(maxsize=8)
+def _contratos_por_versao(db_path, token):
+    """Contratos do relatório em uma versão da tabela (o token só entra na chave do cache)"""
+    if garantir_contrato_normalizado(db_path):
+        return tuple(row[0] for row in obter_conexao(db_path).execute(SQL_CONTRATOS))
+
+    # Banco somente leitura: normaliza em memória
+    nomes = carregar_tabela("relatorio_oris", "deficit", db_path=db_path)["Nome Fantasia"].dropna().unique()
+    por_contrato = {}
+    for nome in sorted(nomes):
+        por_contrato.setdefault(_strip_accents_upper(nome), nome)
+    return tuple(sorted(por_contrato.values()))
+
+def listar_contratos(db_path=None):
+    """
+    Contratos (Nome Fantasia) presentes no relatório, em ordem alfabética
+
+    A lista é lida uma vez por versão de 'relatorio_oris' (e instância do banco).
+    """
+    token = token_persistente("relatorio_oris", db_path)
+    if token is None:
+        return []
+    return list(_contratos_por_versao(str(db_path or DB_PATH), token))
+
+def _processos_deficit(contratos, db_path):
+    """Quantidade de processos para calcular os contratos (1 = em série)"""
+    processos = min(DEFICIT_PROCESSOS or os.cpu_count() or 1, len(contratos))
+    if processos <= 1:
+        return 1
+    # Em relatórios pequenos abrir os processos custa mais que o cálculo
+    linhas = obter_conexao(db_path).execute("SELECT COUNT(*) FROM relatorio_oris").fetchone()[0]
+    return processos if linhas >= DEFICIT_LINHAS_MINIMAS_PROCESSOS else 1
+
+def _calcular_contratos(contratos, db_path):
+    """
+    Calcula o déficit de vários contratos, cada um em um processo
+
+    Returns:
+        Dict {contrato: DataFrame}
+    """
+    processos = _processos_deficit(contratos, db_path)
+    if processos > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                resultados = executor.map(_calcular_deficit_contrato, contratos, [db_path] * len(contratos))
+                return dict(zip(contratos, resultados))
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(f"⚠️ Cálculo paralelo do déficit indisponível, calculando em série: {e}")
+
+    return {contrato: _calcular_deficit_contrato(contrato, db_path) for contrato in contratos}
+
+@cronometrado(categoria="processamento")
+def _remover_contratos_obsoletos(contratos_gravados, db_path):
+    """
+    Apaga o snapshot dos contratos que saíram do relatório
+
+    A comparação usa o nome normalizado: um snapshot gravado com outra
+    grafia de um contrato ainda presente (ex.: CONTRATO_PADRAO) é mantido.
+    """
+    atuais = {_strip_accents_upper(contrato) for contrato in listar_contratos(db_path)}
+    obsoletos = [
+        contrato for contrato in contratos_gravados
+        if _strip_accents_upper(contrato) not in atuais
+    ]
+    if not obsoletos:
+        return
+
+    try:
+        with transacao(db_path, imediata=True) as conn:
+            for contrato in obsoletos:
+                conn.execute("DELETE FROM deficit_snapshot WHERE contrato = ?", (contrato,))
+                conn.execute("DELETE FROM deficit_snapshot_meta WHERE contrato = ?", (contrato,))
+    except sqlite3.Error as e:
+        # Banco somente leitura: o snapshot atual continua válido
+        logger.warning(f"⚠️ Não foi possível remover o snapshot de contratos obsoletos: {e}")
+        return
+    logger.info(f"🧹 Snapshot removido de {len(obsoletos)} contrato(s) fora do relatório: {', '.join(obsoletos)}")
+
+def atualizar_deficit_contratos(contratos=None, db_path=None, forcar=False):
+    """
+    Atualiza o snapshot de vários contratos, calculando em paralelo os desatualizados
+
+    Só os contratos cujo snapshot é de outra versão das tabelas de origem
+    são recalculados (em processos separados, ver DEFICIT_PROCESSOS); a
+    gravação é feita em seguida, no processo atual. O snapshot de contratos
+    que saíram do relatório é apagado, para o consolidado (tela e
+    exportação) ter só os contratos atuais.
+
+    Args:
+        contratos: Lista de Nome Fantasia (padrão: todos os do relatório)
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        forcar: Recalcula mesmo os contratos atualizados
+
+    Returns:
+        Dict {contrato: resultado de atualizar_deficit_snapshot()} ou None em caso de erro
+    """
+    try:
+        garantir_contrato_normalizado(db_path)
+        garantir_indices_deficit(db_path)
+
+        token = token_fontes(db_path)
+        if token is None:
+            logger.warning("⚠️ Tabelas 'relatorio_oris' e/ou 'tlp' não encontradas")
+            return None
+
+        if contratos is None:
+            contratos = listar_contratos(db_path)
+
+        conn = obter_conexao(db_path)
+        _garantir_tabelas_snapshot(conn)
+        tokens = dict(conn.execute("SELECT contrato, token FROM deficit_snapshot_meta"))
+
+        resultados = {
+            contrato: {'atualizado': False, 'alteradas': 0, 'removidas': 0}
+            for contrato in contratos
+            if tokens.get(contrato) == token and not forcar
+        }
+        desatualizados = [contrato for contrato in contratos if contrato not in resultados]
+        if desatualizados:
+            calculados = _calcular_contratos(desatualizados, db_path)
+            for contrato in desatualizados:
+                resultados[contrato] = _gravar_snapshot(contrato, token, calculados[contrato], db_path)
+
+        _remover_contratos_obsoletos(tokens, db_path)
+        return resultados
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao atualizar snapshots de déficit: {e}")
+        return None
+
+def ler_deficit_contratos(contratos, db_path=None):
+    """
+    Lê o snapshot de vários contratos em um único DataFrame
+
+    Returns:
+        DataFrame com a coluna 'Contrato' seguida das colunas de
+        calcular_deficit(), ordenado por contrato e ordem da TLP, ou None
+    """
+    try:
+        conn = obter_conexao(db_path)
+        colunas = ", ".join(f'{coluna} AS "{nome}"' for nome, coluna in COLUNAS_SNAPSHOT.items())
+        marcadores = ", ".join("?" * len(contratos))
+        return pd.read_sql_query(
+            f'SELECT contrato AS "Contrato", {colunas} FROM deficit_snapshot '
+            f"WHERE contrato IN ({marcadores}) ORDER BY contrato, ordem",
+            conn,
+            params=tuple(contratos)
+        )
+    except Exception as e:
+        logger.error(f"❌ Erro ao ler snapshot de déficit: {e}")
+        return None
+
+def resumo_deficit_contratos(contratos, db_path=None):
+    """Totais do snapshot por contrato (mais contratações primeiro) ou None"""
+    try:
+        return pd.read_sql_query(
+            SQL_RESUMO_CONTRATOS.format(marcadores=", ".join("?" * len(contratos))),
+            obter_conexao(db_path),
+            params=tuple(contratos)
+        )
+    except Exception as e:
+        logger.error(f"❌ Erro ao resumir o déficit por contrato: {e}")
+        return None
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    resultados = atualizar_deficit_contratos(forcar=True)
+    if resultados is None:
+        raise SystemExit(1)
+    for contrato, resultado in resultados.items():
+        print(f"{contrato}: {resultado['alteradas']} linhas alteradas, {resultado['removidas']} removidas")
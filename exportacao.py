@@ -0,0 +1,272 @@
+"""
+Exportação em streaming de vagas e do déficit (Excel, CSV e Parquet)
+Lê as linhas de um cursor SQLite em blocos e as grava direto no arquivo,
+sem montar um DataFrame completo. Os arquivos gerados ficam em cache por
+versão dos dados e filtros.
+"""
+
+import csv
+import io
+import logging
+from functools import lru_cache
+
+import xlsxwriter
+
+from conexao import transacao, token_persistente
+from instrumentacao import cronometrado
+
+# Parquet é opcional (pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas do cursor por vez
+TAMANHO_BLOCO = 5000
+
+# Arquivos gerados mantidos em cache (por processo)
+MAXIMO_ARQUIVOS_CACHE = 16
+
+# formato: (descrição, extensão, MIME)
+FORMATOS_EXPORTACAO = {
+    'xlsx': ("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    'csv': ("CSV", "csv", "text/csv"),
+    'parquet': ("Parquet", "parquet", "application/vnd.apache.parquet"),
+}
+
+# (coluna SQL, título, tipo) - tipos: 'texto', 'inteiro', 'real'
+COLUNAS_EXPORTACAO_VAGAS = [
+    ("id", "ID", "inteiro"),
+    ("nome", "Nome", "texto"),
+    ("cargo", "Cargo", "texto"),
+    ("centro_custo", "Centro de Custo", "texto"),
+    ("situacao", "Situação", "texto"),
+    ("tipo_vaga", "Tipo", "texto"),
+    ("data_evento", "Data Evento", "texto"),
+    ("status", "Status", "texto"),
+    ("data_decisao", "Data Decisão", "texto"),
+    ("usuario_aprovador", "Aprovador", "texto"),
+    ("deficit", "Déficit", "inteiro"),
+    ("dias_afastamento", "Dias Afastamento", "inteiro"),
+]
+
+COLUNAS_EXPORTACAO_DEFICIT = [
+    ("centro_custo", "Centro de Custo", "texto"),
+    ("cargo", "Cargo", "texto"),
+    ("carga_horaria", "Carga Horária", "real"),
+    ("qtd_necessaria", "Qtd Necessária", "inteiro"),
+    ("qtd_ativos", "Qtd Ativos", "inteiro"),
+    ("qtd_afastados", "Qtd Afastados", "inteiro"),
+    ("deficit", "Déficit", "inteiro"),
+    ("funcionarios_contratar", "Contratar", "inteiro"),
+    ("excedente", "Excedente", "inteiro"),
+]
+
+# Filtros de situação do dashboard de déficit
+FILTROS_STATUS_DEFICIT = {
+    "Apenas com Déficit": "deficit > 0",
+    "Apenas Excedentes": "excedente > 0",
+    "Apenas Completos": "deficit = 0",
+}
+
+def formatos_disponiveis():
+    """Formatos suportados no ambiente atual (Parquet exige pyarrow)"""
+    return [f for f in FORMATOS_EXPORTACAO if f != 'parquet' or pa is not None]
+
+# ==================== ESCRITORES ====================
+
+def _blocos(cursor, tamanho=TAMANHO_BLOCO):
+    """Gera listas de até 'tamanho' linhas lidas do cursor"""
+    while True:
+        linhas = cursor.fetchmany(tamanho)
+        if not linhas:
+            return
+        yield linhas
+
+def _escrever_xlsx(destino, colunas, blocos, nome_planilha):
+    """Grava em Excel no modo constant_memory (linha a linha, sem reter a planilha)"""
+    total = 0
+    workbook = xlsxwriter.Workbook(destino, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet(nome_planilha)
+
+        # Formato para cabeçalho
+        header_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#4472C4',
+            'font_color': 'white',
+            'border': 1
+        })
+        for col_num, (_, titulo, _) in enumerate(colunas):
+            worksheet.write(0, col_num, titulo, header_format)
+            worksheet.set_column(col_num, col_num, 15)
+
+        for linhas in blocos:
+            for linha in linhas:
+                total += 1
+                worksheet.write_row(total, 0, linha)
+    finally:
+        workbook.close()
+    return total
+
+def _escrever_csv(destino, colunas, blocos):
+    """Grava CSV (UTF-8 com BOM e ';', como o Excel em português espera)"""
+    total = 0
+    texto = io.TextIOWrapper(destino, encoding="utf-8-sig", newline="")
+    try:
+        writer = csv.writer(texto, delimiter=";")
+        writer.writerow([titulo for _, titulo, _ in colunas])
+        for linhas in blocos:
+            writer.writerows(linhas)
+            total += len(linhas)
+    finally:
+        texto.flush()
+        texto.detach()
+    return total
+
+def _escrever_parquet(destino, colunas, blocos):
+    """Grava Parquet em row groups, um por bloco lido"""
+    if pa is None:
+        raise RuntimeError("Exportação Parquet requer o pacote pyarrow")
+
+    tipos = {'texto': pa.string(), 'inteiro': pa.int64(), 'real': pa.float64()}
+    schema = pa.schema([(titulo, tipos[tipo]) for _, titulo, tipo in colunas])
+
+    total = 0
+    with pq.ParquetWriter(destino, schema) as writer:
+        for linhas in blocos:
+            colunas_bloco = list(zip(*linhas))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(colunas_bloco, schema)],
+                schema=schema
+            ))
+            total += len(linhas)
+    return total
+
+# ==================== EXPORTAÇÃO ====================
+
+def exportar_consulta(sql, parametros, colunas, formato, nome_planilha="Dados", db_path=None):
+    """
+    Executa uma consulta e grava o resultado no formato pedido, em blocos
+
+    Args:
+        sql: SELECT que retorna as colunas na ordem de 'colunas'
+        parametros: Parâmetros da consulta
+        colunas: Lista de (coluna SQL, título, tipo)
+        formato: 'xlsx', 'csv' ou 'parquet'
+        nome_planilha: Nome da aba (Excel)
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        bytes do arquivo ou None se a consulta não retornou linhas
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+
+    destino = io.BytesIO()
+
+    # Transação de leitura: todos os blocos vêm do mesmo estado do banco
+    with transacao(db_path) as conn:
+        blocos = _blocos(conn.execute(sql, parametros))
+        if formato == 'xlsx':
+            total = _escrever_xlsx(destino, colunas, blocos, nome_planilha)
+        elif formato == 'csv':
+            total = _escrever_csv(destino, colunas, blocos)
+        else:
+            total = _escrever_parquet(destino, colunas, blocos)
+
+    if total == 0:
+        return None
+
+    logger.info(f"📥 Exportação {formato}: {total} linhas, {destino.tell() // 1024} KiB")
+    return destino.getvalue()
+
+def _sql_colunas(colunas):
+    """Lista de colunas SQL de uma definição de exportação (reais com 2 casas)"""
+    return ", ".join(
+        f"ROUND({coluna}, 2) AS {coluna}" if tipo == 'real' else coluna
+        for coluna, _, tipo in colunas
+    )
+
+@lru_cache(maxsize=MAXIMO_ARQUIVOS_CACHE)
+def _exportar_vagas_cache(formato, versao, filtros, db_path):
+    """Gera o arquivo de vagas (em cache por formato, versão da tabela e filtros)"""
+    from gestao_vagas import _filtros_vagas, SQL_DATA_EVENTO_ORDEM
+
+    where, params = _filtros_vagas(**dict(filtros))
+    sql = (
+        f"SELECT {_sql_colunas(COLUNAS_EXPORTACAO_VAGAS)} FROM vagas{where} "
+        f"ORDER BY {SQL_DATA_EVENTO_ORDEM} DESC, id DESC"
+    )
+    return exportar_consulta(sql, params, COLUNAS_EXPORTACAO_VAGAS, formato, "Vagas", db_path)
+
+@cronometrado(categoria="exportacao")
+def exportar_vagas(formato='xlsx', db_path=None, **filtros):
+    """
+    Exporta vagas com os mesmos filtros de gestao_vagas.listar_vagas()
+
+    Args:
+        formato: 'xlsx', 'csv' ou 'parquet'
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        **filtros: status, tipo_vaga, centro_custo, data_inicio, data_fim, texto
+
+    Returns:
+        bytes do arquivo ou None (sem vagas ou erro)
+    """
+    try:
+        filtros_chave = tuple(sorted((k, v) for k, v in filtros.items() if v))
+        return _exportar_vagas_cache(formato, token_persistente("vagas", db_path), filtros_chave, db_path)
+    except Exception as e:
+        logger.error(f"Erro ao exportar vagas: {e}")
+        return None
+
+@lru_cache(maxsize=MAXIMO_ARQUIVOS_CACHE)
+def _exportar_deficit_cache(formato, versao, contrato, centro_custo, status, db_path):
+    """Gera o arquivo do déficit (em cache por formato, versão do snapshot e filtros)"""
+    colunas = COLUNAS_EXPORTACAO_DEFICIT
+    condicoes = []
+    params = []
+    if contrato is None:
+        # Consolidado: todos os contratos, identificados na primeira coluna
+        colunas = [("contrato", "Contrato", "texto")] + colunas
+    else:
+        condicoes.append("contrato = ?")
+        params.append(contrato)
+    if centro_custo:
+        condicoes.append("centro_custo = ?")
+        params.append(centro_custo)
+    if status in FILTROS_STATUS_DEFICIT:
+        condicoes.append(FILTROS_STATUS_DEFICIT[status])
+
+    where = f"WHERE {' AND '.join(condicoes)} " if condicoes else ""
+    sql = (
+        f"SELECT {_sql_colunas(colunas)} FROM deficit_snapshot "
+        f"{where}ORDER BY contrato, ordem"
+    )
+    return exportar_consulta(sql, params, colunas, formato, "Déficit", db_path)
+
+@cronometrado(categoria="exportacao")
+def exportar_deficit(contrato, formato='xlsx', centro_custo=None, status=None, db_path=None):
+    """
+    Exporta o snapshot de déficit de um contrato com os filtros do dashboard
+
+    Args:
+        contrato: Nome Fantasia do contrato ou None (todos os contratos)
+        formato: 'xlsx', 'csv' ou 'parquet'
+        centro_custo: Centro de custo ou None (todos)
+        status: Chave de FILTROS_STATUS_DEFICIT ou None (todos)
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        bytes do arquivo ou None (sem linhas ou erro)
+    """
+    try:
+        versao = token_persistente("deficit_snapshot", db_path)
+        return _exportar_deficit_cache(formato, versao, contrato, centro_custo, status, db_path)
+    except Exception as e:
+        logger.error(f"Erro ao exportar déficit: {e}")
+        return None
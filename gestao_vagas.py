@@ -1,19 +1,26 @@
 """
 Módulo de Gestão de Aprovações de Vagas
 Integra com a tabela 'vagas' do banco oris.db
+
+Sincronização sem interface (ex.: cron), com código de saída e resumo em JSON:
+    python -m gestao_vagas sync [--banco oris.db] [--simular] [--json] [-q]
 """
 
-import sqlite3
-import pandas as pd
 from datetime import datetime
+from functools import lru_cache
+import sqlite3
 import os
 import logging
 
+from conexao import obter_conexao, transacao, token_persistente
+from instrumentacao import cronometrado
+
+# pandas é importado só nas funções que montam DataFrames: operações de
+# escrita e consultas por SQL (e a linha de comando) não pagam essa importação
+
 # Importa configuração centralizada
 try:
-    from config import DB_PATH_STR as DB_PATH, validar_estrutura
-    # Valida estrutura na primeira importação
-    validar_estrutura()
+    from config import DB_PATH_STR as DB_PATH
 except ImportError:
     # Fallback para compatibilidade
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -22,8 +29,100 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Limite de parâmetros por consulta IN (...) (SQLITE_MAX_VARIABLE_NUMBER antigo)
+TAMANHO_LOTE_IDS = 900
+
 # ==================== GERENCIAMENTO DE VAGAS ====================
 
+# Inserção de vaga (cadastro unitário, aprovação direta do relatório e sincronização em lote)
+SQL_INSERIR_VAGA = """
+    INSERT INTO vagas (
+        nome,
+        centro_custo,
+        cargo,
+        situacao,
+        nome_fantasia,
+        carga_horaria_semanal,
+        dt_inicio_situacao,
+        dt_rescisao,
+        data_evento,
+        tipo_vaga,
+        motivo_vaga,
+        dias_afastamento,
+        status,
+        data_decisao,
+        usuario_aprovador,
+        quantidade_ideal,
+        quantidade_atual,
+        deficit,
+        vaga_prevista_tlp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Vaga em aberto (pendente ou aprovada) para o mesmo funcionário, cargo e
+# unidade; usa o índice idx_vagas_chave_status (ver migracoes.py)
+SQL_VAGA_EXISTENTE = """
+    SELECT id, status FROM vagas
+    WHERE nome = ? AND cargo = ? AND centro_custo = ?
+    AND status IN ('pendente', 'aprovado')
+"""
+
+# Chaves (nome, cargo, centro_custo) já cadastradas, em qualquer status
+SQL_CHAVES_VAGAS = "SELECT nome, cargo, centro_custo FROM vagas"
+
+# Colunas de detectar_vagas() gravadas em campos NOT NULL da tabela vagas
+CAMPOS_OBRIGATORIOS_VAGA = ['nome', 'centro_custo', 'cargo', 'situacao', 'nome_fantasia']
+
+def arredondar_carga_horaria(valor):
+    """
+    Carga horária para gravar ou exibir (float com 2 casas, None se ausente)
+
+    O relatório carrega a coluna em float32 (config.ESQUEMA_TABELAS), que
+    serve só para o casamento em memória: 12.6 viraria 12.600000381469727.
+    """
+    if valor is None:
+        return None
+    try:
+        valor = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return None if valor != valor else round(valor, 2)
+
+def _parametros_vaga(vaga_data, info_tlp, status='pendente', data_decisao=None, usuario=None):
+    """Monta a tupla de parâmetros de SQL_INSERIR_VAGA (por padrão, vaga pendente)"""
+    # Determina a data do evento
+    if vaga_data['tipo'] == 'demissao':
+        # Para demissão, busca a Dt Rescisão
+        dt_rescisao = vaga_data.get('data_evento')
+        dt_inicio_situacao = None
+    else:
+        # Para afastamento, busca Dt Início Situação
+        dt_rescisao = None
+        dt_inicio_situacao = vaga_data.get('data_evento')
+
+    return (
+        vaga_data['nome'],
+        vaga_data['centro_custo'],
+        vaga_data['cargo'],
+        vaga_data['situacao'],
+        vaga_data['nome_fantasia'],
+        arredondar_carga_horaria(vaga_data['carga_horaria']),
+        dt_inicio_situacao,
+        dt_rescisao,
+        vaga_data['data_evento'],
+        vaga_data['tipo'],
+        vaga_data['motivo'],
+        vaga_data.get('dias_afastamento'),
+        status,
+        data_decisao,
+        usuario,
+        info_tlp.get('quantidade_ideal', 0),
+        info_tlp.get('quantidade_atual', 0),
+        info_tlp.get('deficit', 0),
+        info_tlp.get('vaga_prevista', False)
+    )
+
+@cronometrado(categoria="db")
 def salvar_vaga_para_aprovacao(vaga_data, info_tlp):
     """
     Salva vaga na tabela 'vagas' com status pendente
@@ -36,65 +135,9 @@ def salvar_vaga_para_aprovacao(vaga_data, info_tlp):
         ID da vaga inserida ou None em caso de erro
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Determina a data do evento
-        if vaga_data['tipo'] == 'demissao':
-            # Para demissão, busca a Dt Rescisão
-            dt_rescisao = vaga_data.get('data_evento')
-            dt_inicio_situacao = None
-        else:
-            # Para afastamento, busca Dt Início Situação
-            dt_rescisao = None
-            dt_inicio_situacao = vaga_data.get('data_evento')
-        
-        # Extrai dados do row_data
-        row_data = vaga_data['row_data']
-        
-        cursor.execute("""
-            INSERT INTO vagas (
-                nome,
-                centro_custo,
-                cargo,
-                situacao,
-                nome_fantasia,
-                carga_horaria_semanal,
-                dt_inicio_situacao,
-                dt_rescisao,
-                data_evento,
-                tipo_vaga,
-                motivo_vaga,
-                dias_afastamento,
-                status,
-                quantidade_ideal,
-                quantidade_atual,
-                deficit,
-                vaga_prevista_tlp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            vaga_data['nome'],
-            vaga_data['centro_custo'],
-            vaga_data['cargo'],
-            vaga_data['situacao'],
-            vaga_data['nome_fantasia'],
-            vaga_data['carga_horaria'],
-            dt_inicio_situacao,
-            dt_rescisao,
-            vaga_data['data_evento'],
-            vaga_data['tipo'],
-            vaga_data['motivo'],
-            vaga_data.get('dias_afastamento'),
-            'pendente',
-            info_tlp.get('quantidade_ideal', 0),
-            info_tlp.get('quantidade_atual', 0),
-            info_tlp.get('deficit', 0),
-            info_tlp.get('vaga_prevista', False)
-        ))
-        
-        vaga_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with transacao(DB_PATH) as conn:
+            cursor = conn.execute(SQL_INSERIR_VAGA, _parametros_vaga(vaga_data, info_tlp))
+            vaga_id = cursor.lastrowid
         
         logger.info(f"✅ Vaga salva com ID {vaga_id}: {vaga_data['nome']} - {vaga_data['cargo']}")
         return vaga_id
@@ -103,6 +146,7 @@ def salvar_vaga_para_aprovacao(vaga_data, info_tlp):
         logger.error(f"Erro ao salvar vaga: {e}")
         return None
 
+@cronometrado(categoria="db")
 def aprovar_e_salvar_vaga(vaga_data, info_tlp, usuario="Sistema"):
     """
     Salva e aprova uma vaga diretamente do relatório (sem passar por status pendente)
@@ -116,79 +160,29 @@ def aprovar_e_salvar_vaga(vaga_data, info_tlp, usuario="Sistema"):
         ID da vaga inserida, "DUPLICADA" se já existe, ou None em caso de erro
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # VERIFICA SE VAGA JÁ EXISTE (evita duplicação)
-        cursor.execute("""
-            SELECT id, status FROM vagas
-            WHERE nome = ? AND cargo = ? AND centro_custo = ?
-            AND status IN ('pendente', 'aprovado')
-        """, (vaga_data['nome'], vaga_data['cargo'], vaga_data['centro_custo']))
-
-        vaga_existente = cursor.fetchone()
-
-        if vaga_existente:
-            vaga_id_existente, status_existente = vaga_existente
-            logger.warning(f"⚠️ Vaga já existe (ID {vaga_id_existente}, status: {status_existente}): {vaga_data['nome']} - {vaga_data['cargo']}")
-            conn.close()
-            return "DUPLICADA"
-
-        # Determina a data do evento
-        if vaga_data['tipo'] == 'demissao':
-            dt_rescisao = vaga_data.get('data_evento')
-            dt_inicio_situacao = None
-        else:
-            dt_rescisao = None
-            dt_inicio_situacao = vaga_data.get('data_evento')
-
-        cursor.execute("""
-            INSERT INTO vagas (
-                nome,
-                centro_custo,
-                cargo,
-                situacao,
-                nome_fantasia,
-                carga_horaria_semanal,
-                dt_inicio_situacao,
-                dt_rescisao,
-                data_evento,
-                tipo_vaga,
-                motivo_vaga,
-                dias_afastamento,
-                status,
-                data_decisao,
-                usuario_aprovador,
-                quantidade_ideal,
-                quantidade_atual,
-                deficit,
-                vaga_prevista_tlp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            vaga_data['nome'],
-            vaga_data['centro_custo'],
-            vaga_data['cargo'],
-            vaga_data['situacao'],
-            vaga_data['nome_fantasia'],
-            vaga_data['carga_horaria'],
-            dt_inicio_situacao,
-            dt_rescisao,
-            vaga_data['data_evento'],
-            vaga_data['tipo'],
-            vaga_data['motivo'],
-            vaga_data.get('dias_afastamento'),
-            'aprovado',  # Já salva como aprovado!
-            datetime.now(),  # data_decisao
-            usuario,  # usuario_aprovador
-            info_tlp.get('quantidade_ideal', 0),
-            info_tlp.get('quantidade_atual', 0),
-            info_tlp.get('deficit', 0),
-            info_tlp.get('vaga_prevista', False)
-        ))
-
-        vaga_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        # BEGIN IMMEDIATE: verificação de duplicidade e inserção atômicas
+        with transacao(DB_PATH, imediata=True) as conn:
+            cursor = conn.cursor()
+
+            # VERIFICA SE VAGA JÁ EXISTE (evita duplicação)
+            cursor.execute(
+                SQL_VAGA_EXISTENTE,
+                (vaga_data['nome'], vaga_data['cargo'], vaga_data['centro_custo'])
+            )
+
+            vaga_existente = cursor.fetchone()
+
+            if vaga_existente:
+                vaga_id_existente, status_existente = vaga_existente
+                logger.warning(f"⚠️ Vaga já existe (ID {vaga_id_existente}, status: {status_existente}): {vaga_data['nome']} - {vaga_data['cargo']}")
+                return "DUPLICADA"
+
+            # Já salva como aprovado, com data e usuário da decisão
+            cursor.execute(SQL_INSERIR_VAGA, _parametros_vaga(
+                vaga_data, info_tlp, status='aprovado', data_decisao=datetime.now(), usuario=usuario
+            ))
+
+            vaga_id = cursor.lastrowid
 
         logger.info(f"✅ Vaga aprovada e salva com ID {vaga_id}: {vaga_data['nome']} - {vaga_data['cargo']} por {usuario}")
         return vaga_id
@@ -197,6 +191,7 @@ def aprovar_e_salvar_vaga(vaga_data, info_tlp, usuario="Sistema"):
         logger.error(f"Erro ao aprovar e salvar vaga: {e}")
         return None
 
+@cronometrado(categoria="db")
 def aprovar_vaga(vaga_id, usuario="Sistema"):
     """
     Aprova uma vaga pendente
@@ -209,32 +204,29 @@ def aprovar_vaga(vaga_id, usuario="Sistema"):
         True se aprovado com sucesso, False caso contrário
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE vagas
-            SET status = 'aprovado',
-                data_decisao = ?,
-                usuario_aprovador = ?
-            WHERE id = ? AND status = 'pendente'
-        """, (datetime.now(), usuario, vaga_id))
+        with transacao(DB_PATH) as conn:
+            cursor = conn.execute("""
+                UPDATE vagas
+                SET status = 'aprovado',
+                    data_decisao = ?,
+                    usuario_aprovador = ?
+                WHERE id = ? AND status = 'pendente'
+            """, (datetime.now(), usuario, vaga_id))
         
         if cursor.rowcount > 0:
-            conn.commit()
             logger.info(f"✅ Vaga ID {vaga_id} aprovada por {usuario}")
             resultado = True
         else:
             logger.warning(f"⚠️ Vaga ID {vaga_id} não encontrada ou já processada")
             resultado = False
         
-        conn.close()
         return resultado
         
     except Exception as e:
         logger.error(f"Erro ao aprovar vaga {vaga_id}: {e}")
         return False
 
+@cronometrado(categoria="db")
 def rejeitar_vaga(vaga_id, usuario="Sistema", observacao=None):
     """
     Rejeita uma vaga pendente
@@ -248,33 +240,30 @@ def rejeitar_vaga(vaga_id, usuario="Sistema", observacao=None):
         True se rejeitado com sucesso, False caso contrário
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE vagas
-            SET status = 'rejeitado',
-                data_decisao = ?,
-                usuario_aprovador = ?,
-                observacao = ?
-            WHERE id = ? AND status = 'pendente'
-        """, (datetime.now(), usuario, observacao, vaga_id))
+        with transacao(DB_PATH) as conn:
+            cursor = conn.execute("""
+                UPDATE vagas
+                SET status = 'rejeitado',
+                    data_decisao = ?,
+                    usuario_aprovador = ?,
+                    observacao = ?
+                WHERE id = ? AND status = 'pendente'
+            """, (datetime.now(), usuario, observacao, vaga_id))
 
         if cursor.rowcount > 0:
-            conn.commit()
             logger.info(f"❌ Vaga ID {vaga_id} rejeitada por {usuario}")
             resultado = True
         else:
             logger.warning(f"⚠️ Vaga ID {vaga_id} não encontrada ou já processada")
             resultado = False
 
-        conn.close()
         return resultado
 
     except Exception as e:
         logger.error(f"Erro ao rejeitar vaga {vaga_id}: {e}")
         return False
 
+@cronometrado(categoria="db")
 def cancelar_vaga_aprovada(vaga_id, usuario="Sistema", observacao=None):
     """
     Cancela uma vaga que foi previamente aprovada
@@ -288,33 +277,30 @@ def cancelar_vaga_aprovada(vaga_id, usuario="Sistema", observacao=None):
         True se cancelado com sucesso, False caso contrário
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE vagas
-            SET status = 'cancelado',
-                data_decisao = ?,
-                usuario_aprovador = ?,
-                observacao = ?
-            WHERE id = ? AND status = 'aprovado'
-        """, (datetime.now(), usuario, observacao, vaga_id))
+        with transacao(DB_PATH) as conn:
+            cursor = conn.execute("""
+                UPDATE vagas
+                SET status = 'cancelado',
+                    data_decisao = ?,
+                    usuario_aprovador = ?,
+                    observacao = ?
+                WHERE id = ? AND status = 'aprovado'
+            """, (datetime.now(), usuario, observacao, vaga_id))
 
         if cursor.rowcount > 0:
-            conn.commit()
             logger.info(f"⛔ Vaga ID {vaga_id} cancelada por {usuario}")
             resultado = True
         else:
             logger.warning(f"⚠️ Vaga ID {vaga_id} não encontrada ou não está aprovada")
             resultado = False
 
-        conn.close()
         return resultado
 
     except Exception as e:
         logger.error(f"Erro ao cancelar vaga {vaga_id}: {e}")
         return False
 
+@cronometrado(categoria="db")
 def desfazer_decisao(vaga_id):
     """
     Reverte uma decisão (aprovação ou rejeição) para pendente
@@ -326,35 +312,160 @@ def desfazer_decisao(vaga_id):
         True se desfeito com sucesso, False caso contrário
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE vagas
-            SET status = 'pendente',
-                data_decisao = NULL,
-                usuario_aprovador = NULL,
-                observacao = NULL
-            WHERE id = ?
-        """, (vaga_id,))
+        with transacao(DB_PATH) as conn:
+            cursor = conn.execute("""
+                UPDATE vagas
+                SET status = 'pendente',
+                    data_decisao = NULL,
+                    usuario_aprovador = NULL,
+                    observacao = NULL
+                WHERE id = ?
+            """, (vaga_id,))
         
         if cursor.rowcount > 0:
-            conn.commit()
             logger.info(f"🔄 Decisão da vaga ID {vaga_id} desfeita")
             resultado = True
         else:
             logger.warning(f"⚠️ Vaga ID {vaga_id} não encontrada")
             resultado = False
         
-        conn.close()
         return resultado
         
     except Exception as e:
         logger.error(f"Erro ao desfazer decisão da vaga {vaga_id}: {e}")
         return False
 
+# ==================== DECISÕES EM LOTE ====================
+
+def _decidir_vagas(ids, novo_status, status_exigido, usuario, observacao=None,
+                   gravar_observacao=True, filtros=None):
+    """
+    Aplica uma decisão a várias vagas com UPDATE condicional em uma transação
+
+    Só são alteradas as vagas que estão em 'status_exigido' no momento da
+    transação (BEGIN IMMEDIATE). Com 'filtros', as vagas são as que atendem
+    aos filtros de listar_vagas() dentro da mesma transação e 'ids' é ignorado.
+
+    Returns:
+        Dict {id: True se a vaga foi alterada, False caso contrário}
+    """
+    if filtros is None:
+        ids = [int(i) for i in dict.fromkeys(ids) if i is not None]
+        if not ids:
+            return {}
+
+    campos = "status = ?, data_decisao = ?, usuario_aprovador = ?"
+    valores = [novo_status, datetime.now(), usuario]
+    if gravar_observacao:
+        campos += ", observacao = ?"
+        valores.append(observacao)
+
+    with transacao(DB_PATH, imediata=True) as conn:
+        if filtros is not None:
+            where, params = _filtros_vagas(**{**filtros, 'status': status_exigido})
+            ids = [row[0] for row in conn.execute(f"SELECT id FROM vagas{where}", params)]
+
+        resultado = {vaga_id: False for vaga_id in ids}
+        for inicio in range(0, len(ids), TAMANHO_LOTE_IDS):
+            lote = ids[inicio:inicio + TAMANHO_LOTE_IDS]
+            marcadores = ", ".join("?" * len(lote))
+
+            elegiveis = conn.execute(
+                f"SELECT id FROM vagas WHERE id IN ({marcadores}) AND status = ?",
+                lote + [status_exigido]
+            ).fetchall()
+
+            conn.execute(
+                f"UPDATE vagas SET {campos} WHERE id IN ({marcadores}) AND status = ?",
+                valores + lote + [status_exigido]
+            )
+
+            for (vaga_id,) in elegiveis:
+                resultado[vaga_id] = True
+
+    return resultado
+
+@cronometrado(categoria="db")
+def aprovar_vagas(ids, usuario="Sistema", filtros=None):
+    """
+    Aprova várias vagas pendentes em uma única transação
+
+    Args:
+        ids: Lista de IDs de vagas (ignorada se 'filtros' for informado)
+        usuario: Nome do usuário que aprovou
+        filtros: Dict com filtros de listar_vagas() para aprovar todas as
+            vagas pendentes que os atendem (tipo_vaga, centro_custo...)
+
+    Returns:
+        Dict {id: True se aprovada, False se não encontrada ou já processada}
+    """
+    try:
+        resultado = _decidir_vagas(ids, 'aprovado', 'pendente', usuario, gravar_observacao=False, filtros=filtros)
+        logger.info(f"✅ {sum(resultado.values())}/{len(resultado)} vaga(s) aprovada(s) por {usuario}")
+        return resultado
+
+    except Exception as e:
+        logger.error(f"Erro ao aprovar vagas em lote: {e}")
+        return {int(i): False for i in ids or [] if i is not None}
+
+@cronometrado(categoria="db")
+def rejeitar_vagas(ids, usuario="Sistema", observacao=None, filtros=None):
+    """
+    Rejeita várias vagas pendentes em uma única transação
+
+    Args:
+        ids: Lista de IDs de vagas (ignorada se 'filtros' for informado)
+        usuario: Nome do usuário que rejeitou
+        observacao: Motivo da rejeição (opcional, aplicado a todas)
+        filtros: Dict com filtros de listar_vagas() para rejeitar todas as
+            vagas pendentes que os atendem
+
+    Returns:
+        Dict {id: True se rejeitada, False se não encontrada ou já processada}
+    """
+    try:
+        resultado = _decidir_vagas(ids, 'rejeitado', 'pendente', usuario, observacao, filtros=filtros)
+        logger.info(f"❌ {sum(resultado.values())}/{len(resultado)} vaga(s) rejeitada(s) por {usuario}")
+        return resultado
+
+    except Exception as e:
+        logger.error(f"Erro ao rejeitar vagas em lote: {e}")
+        return {int(i): False for i in ids or [] if i is not None}
+
+@cronometrado(categoria="db")
+def cancelar_vagas_aprovadas(ids, usuario="Sistema", observacao=None, filtros=None):
+    """
+    Cancela várias vagas aprovadas em uma única transação
+
+    Args:
+        ids: Lista de IDs de vagas (ignorada se 'filtros' for informado)
+        usuario: Nome do usuário que cancelou
+        observacao: Motivo do cancelamento (opcional, aplicado a todas)
+        filtros: Dict com filtros de listar_vagas() para cancelar todas as
+            vagas aprovadas que os atendem
+
+    Returns:
+        Dict {id: True se cancelada, False se não encontrada ou não aprovada}
+    """
+    try:
+        resultado = _decidir_vagas(ids, 'cancelado', 'aprovado', usuario, observacao, filtros=filtros)
+        logger.info(f"⛔ {sum(resultado.values())}/{len(resultado)} vaga(s) cancelada(s) por {usuario}")
+        return resultado
+
+    except Exception as e:
+        logger.error(f"Erro ao cancelar vagas em lote: {e}")
+        return {int(i): False for i in ids or [] if i is not None}
+
 # ==================== CONSULTAS ====================
 
+SQL_VAGA_POR_FUNCIONARIO = """
+    SELECT * FROM vagas
+    WHERE nome = ? AND cargo = ? AND centro_custo = ?
+    ORDER BY data_criacao DESC
+    LIMIT 1
+"""
+
+@cronometrado(categoria="db")
 def buscar_vaga_por_funcionario(nome, cargo, centro_custo):
     """
     Busca se já existe uma vaga para determinado funcionário
@@ -362,18 +473,12 @@ def buscar_vaga_por_funcionario(nome, cargo, centro_custo):
     Returns:
         Dict com dados da vaga ou None se não encontrada
     """
+    import pandas as pd
+
     try:
-        conn = sqlite3.connect(DB_PATH)
-        
-        query = """
-            SELECT * FROM vagas
-            WHERE nome = ? AND cargo = ? AND centro_custo = ?
-            ORDER BY data_criacao DESC
-            LIMIT 1
-        """
-        
-        df = pd.read_sql_query(query, conn, params=(nome, cargo, centro_custo))
-        conn.close()
+        df = pd.read_sql_query(
+            SQL_VAGA_POR_FUNCIONARIO, obter_conexao(DB_PATH), params=(nome, cargo, centro_custo)
+        )
         
         if len(df) > 0:
             return df.iloc[0].to_dict()
@@ -383,40 +488,149 @@ def buscar_vaga_por_funcionario(nome, cargo, centro_custo):
         logger.error(f"Erro ao buscar vaga: {e}")
         return None
 
-def listar_vagas(status=None, tipo_vaga=None, centro_custo=None):
+@cronometrado(categoria="db")
+def buscar_vagas_por_ids(ids):
     """
-    Lista vagas com filtros opcionais
+    Busca várias vagas pelo ID em uma única consulta
+    
+    Args:
+        ids: Lista de IDs de vagas
+    
+    Returns:
+        Dict {id: dict com os dados da vaga}; IDs inexistentes não aparecem
+    """
+    ids = [int(i) for i in dict.fromkeys(ids) if i is not None]
+    if not ids:
+        return {}
+    
+    try:
+        conn = obter_conexao(DB_PATH)
+        vagas = {}
+        
+        for inicio in range(0, len(ids), TAMANHO_LOTE_IDS):
+            lote = ids[inicio:inicio + TAMANHO_LOTE_IDS]
+            marcadores = ", ".join("?" * len(lote))
+            cursor = conn.execute(f"SELECT * FROM vagas WHERE id IN ({marcadores})", lote)
+            colunas = [c[0] for c in cursor.description]
+            for row in cursor.fetchall():
+                vaga = dict(zip(colunas, row))
+                vagas[vaga['id']] = vaga
+        
+        return vagas
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar vagas por ID: {e}")
+        return {}
+
+# data_evento é gravado como DD/MM/YYYY; esta expressão o converte para
+# YYYY-MM-DD (ordenável) e é usada na ordenação, nos filtros de período e
+# no cursor da paginação
+SQL_DATA_EVENTO_ORDEM = """
+    CASE WHEN data_evento LIKE '__/__/____'
+         THEN substr(data_evento, 7, 4) || '-' || substr(data_evento, 4, 2) || '-' || substr(data_evento, 1, 2)
+         ELSE COALESCE(data_evento, '')
+    END
+"""
+
+def _formatar_data_filtro(data):
+    """Converte date/datetime/str para YYYY-MM-DD (mesmo formato de SQL_DATA_EVENTO_ORDEM)"""
+    if hasattr(data, 'strftime'):
+        return data.strftime('%Y-%m-%d')
+    return str(data)
+
+def _filtros_vagas(status=None, tipo_vaga=None, centro_custo=None,
+                   data_inicio=None, data_fim=None, texto=None):
+    """Monta a cláusula WHERE (e parâmetros) comum à listagem e à contagem de vagas"""
+    condicoes = []
+    params = []
+    
+    if status:
+        condicoes.append("status = ?")
+        params.append(status)
+    
+    if tipo_vaga:
+        condicoes.append("tipo_vaga = ?")
+        params.append(tipo_vaga)
+    
+    if centro_custo:
+        condicoes.append("centro_custo = ?")
+        params.append(centro_custo)
+    
+    if data_inicio:
+        condicoes.append(f"{SQL_DATA_EVENTO_ORDEM} >= ?")
+        params.append(_formatar_data_filtro(data_inicio))
+    
+    if data_fim:
+        condicoes.append(f"{SQL_DATA_EVENTO_ORDEM} <= ?")
+        params.append(_formatar_data_filtro(data_fim))
+    
+    if texto:
+        condicoes.append("(nome LIKE ? OR cargo LIKE ? OR centro_custo LIKE ?)")
+        padrao = f"%{texto.strip()}%"
+        params.extend([padrao, padrao, padrao])
+    
+    where = " WHERE " + " AND ".join(condicoes) if condicoes else ""
+    return where, params
+
+def _consulta_listar_vagas(status=None, tipo_vaga=None, centro_custo=None,
+                          data_inicio=None, data_fim=None, texto=None,
+                          limite=None, cursor=None):
+    """Monta o SELECT (e parâmetros) de listar_vagas()"""
+    where, params = _filtros_vagas(
+        status, tipo_vaga, centro_custo, data_inicio, data_fim, texto
+    )
+    
+    if cursor is not None:
+        ordem, ultimo_id = cursor
+        where += " AND " if where else " WHERE "
+        # O limite "<= ?" (redundante) deixa o SQLite buscar a página por
+        # intervalo no índice em vez de percorrê-lo desde o início
+        where += (
+            f"{SQL_DATA_EVENTO_ORDEM} <= ? AND "
+            f"({SQL_DATA_EVENTO_ORDEM} < ? OR ({SQL_DATA_EVENTO_ORDEM} = ? AND id < ?))"
+        )
+        params.extend([ordem, ordem, ordem, int(ultimo_id)])
+    
+    query = f"SELECT *, {SQL_DATA_EVENTO_ORDEM} AS data_evento_ordem FROM vagas{where}"
+    query += f" ORDER BY {SQL_DATA_EVENTO_ORDEM} DESC, id DESC"
+    
+    if limite:
+        query += " LIMIT ?"
+        params.append(int(limite))
+    
+    return query, params
+
+@cronometrado(categoria="db")
+def listar_vagas(status=None, tipo_vaga=None, centro_custo=None,
+                 data_inicio=None, data_fim=None, texto=None,
+                 limite=None, cursor=None):
+    """
+    Lista vagas com filtros opcionais e paginação por cursor (keyset)
+
+    As vagas vêm ordenadas da mais recente para a mais antiga por
+    (data_evento, id). Para buscar a página seguinte, passe em 'cursor' o
+    valor de cursor_pagina() aplicado à página atual.
 
     Args:
         status: 'pendente', 'aprovado', 'rejeitado', 'cancelado' ou None (todos)
         tipo_vaga: 'demissao', 'afastamento' ou None (todos)
         centro_custo: Nome do centro de custo ou None (todos)
+        data_inicio: Data mínima do evento (date ou 'YYYY-MM-DD') ou None
+        data_fim: Data máxima do evento (date ou 'YYYY-MM-DD') ou None
+        texto: Trecho procurado em nome, cargo ou centro de custo ou None
+        limite: Quantidade máxima de linhas ou None (todas)
+        cursor: Tupla (data_evento_ordem, id) da última linha da página anterior
 
     Returns:
-        DataFrame com vagas filtradas
+        DataFrame com vagas filtradas (com a coluna auxiliar data_evento_ordem)
     """
+    import pandas as pd
+
     try:
-        conn = sqlite3.connect(DB_PATH)
-        
-        query = "SELECT * FROM vagas WHERE 1=1"
-        params = []
-        
-        if status:
-            query += " AND status = ?"
-            params.append(status)
-        
-        if tipo_vaga:
-            query += " AND tipo_vaga = ?"
-            params.append(tipo_vaga)
-        
-        if centro_custo:
-            query += " AND centro_custo = ?"
-            params.append(centro_custo)
-        
-        query += " ORDER BY data_evento DESC"
-        
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+        query, params = _consulta_listar_vagas(
+            status, tipo_vaga, centro_custo, data_inicio, data_fim, texto, limite, cursor
+        )
+        df = pd.read_sql_query(query, obter_conexao(DB_PATH), params=params)
         
         return df
         
@@ -424,60 +638,130 @@ def listar_vagas(status=None, tipo_vaga=None, centro_custo=None):
         logger.error(f"Erro ao listar vagas: {e}")
         return pd.DataFrame()
 
+def cursor_pagina(vagas_df):
+    """
+    Cursor (keyset) para buscar a página seguinte a um resultado de listar_vagas()
+
+    Returns:
+        Tupla (data_evento_ordem, id) da última linha ou None se vazio
+    """
+    if vagas_df is None or vagas_df.empty:
+        return None
+    ultima = vagas_df.iloc[-1]
+    return (ultima['data_evento_ordem'], int(ultima['id']))
+
+@cronometrado(categoria="db")
+def contar_vagas(status=None, tipo_vaga=None, centro_custo=None,
+                 data_inicio=None, data_fim=None, texto=None):
+    """
+    Conta as vagas que atendem aos mesmos filtros de listar_vagas()
+
+    Returns:
+        Quantidade de vagas (0 em caso de erro)
+    """
+    try:
+        where, params = _filtros_vagas(
+            status, tipo_vaga, centro_custo, data_inicio, data_fim, texto
+        )
+        return obter_conexao(DB_PATH).execute(
+            f"SELECT COUNT(*) FROM vagas{where}", params
+        ).fetchone()[0]
+        
+    except Exception as e:
+        logger.error(f"Erro ao contar vagas: {e}")
+        return 0
+
+@cronometrado(categoria="db")
+def listar_centros_custo_vagas():
+    """Centros de custo distintos presentes na tabela vagas (para filtros)"""
+    try:
+        cursor = obter_conexao(DB_PATH).execute(
+            "SELECT DISTINCT centro_custo FROM vagas ORDER BY centro_custo"
+        )
+        return [row[0] for row in cursor.fetchall()]
+        
+    except Exception as e:
+        logger.error(f"Erro ao listar centros de custo: {e}")
+        return []
+
+@lru_cache(maxsize=4)
+def _chaves_vagas_por_versao(db_path, token):
+    """Chaves das vagas em uma versão da tabela (o token só entra na chave do cache)"""
+    return frozenset(obter_conexao(db_path).execute(SQL_CHAVES_VAGAS).fetchall())
+
+@cronometrado(categoria="db")
+def chaves_vagas(db_path=None):
+    """
+    Chaves (nome, cargo, centro_custo) de todas as vagas cadastradas, em qualquer status
+
+    O conjunto é lido uma vez por versão da tabela vagas (e instância do banco).
+
+    Returns:
+        frozenset de tuplas (vazio se a tabela não existe ou em caso de erro)
+    """
+    try:
+        token = token_persistente("vagas", db_path or DB_PATH)
+        if token is None:
+            return frozenset()
+        return _chaves_vagas_por_versao(str(db_path or DB_PATH), token)
+
+    except Exception as e:
+        logger.error(f"Erro ao ler chaves das vagas: {e}")
+        return frozenset()
+
+# Contagem das vagas por status, tipo e cargo, no formato da tabela
+# vagas_stats (dimensao, valor, total); usada para reconstruí-la e conferi-la
+SQL_CONTAGENS_VAGAS = """
+    SELECT 'status', status, COUNT(*) FROM vagas GROUP BY status
+    UNION ALL
+    SELECT 'tipo', tipo_vaga, COUNT(*) FROM vagas GROUP BY tipo_vaga
+    UNION ALL
+    SELECT 'cargo', cargo, COUNT(*) FROM vagas GROUP BY cargo
+"""
+
+def _ler_contadores(conn):
+    """
+    Contadores (dimensao, valor, total) de vagas_stats, ou calculados sobre
+    a tabela vagas se os contadores ainda não foram criados (migracoes.py)
+    """
+    try:
+        return conn.execute(
+            "SELECT dimensao, valor, total FROM vagas_stats WHERE total > 0"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        logger.warning("⚠️ Tabela vagas_stats não encontrada; execute 'python migracoes.py'")
+        return conn.execute(SQL_CONTAGENS_VAGAS).fetchall()
+
+@cronometrado(categoria="db")
 def estatisticas_vagas():
     """
     Retorna estatísticas gerais sobre as vagas
     
+    Lê os contadores de vagas_stats, mantidos por triggers a cada
+    INSERT/UPDATE/DELETE em vagas: o custo não depende do tamanho da tabela.
+    
     Returns:
         Dict com estatísticas
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Total por status
-        cursor.execute("""
-            SELECT status, COUNT(*) as total
-            FROM vagas
-            GROUP BY status
-        """)
-        por_status = dict(cursor.fetchall())
+        contadores = {'status': {}, 'tipo': {}, 'cargo': {}}
+        for dimensao, valor, total in _ler_contadores(obter_conexao(DB_PATH)):
+            contadores[dimensao][valor] = total
         
-        # Total por tipo
-        cursor.execute("""
-            SELECT tipo_vaga, COUNT(*) as total
-            FROM vagas
-            GROUP BY tipo_vaga
-        """)
-        por_tipo = dict(cursor.fetchall())
+        por_status = contadores['status']
+        por_tipo = contadores['tipo']
         
         # Cargos com mais vagas
-        cursor.execute("""
-            SELECT cargo, COUNT(*) as total
-            FROM vagas
-            GROUP BY cargo
-            ORDER BY total DESC
-            LIMIT 5
-        """)
-        top_cargos = cursor.fetchall()
+        top_cargos = sorted(contadores['cargo'].items(), key=lambda item: (-item[1], item[0]))[:5]
         
         # Taxa de aprovação
-        cursor.execute("""
-            SELECT
-                COUNT(CASE WHEN status = 'aprovado' THEN 1 END) as aprovadas,
-                COUNT(CASE WHEN status = 'rejeitado' THEN 1 END) as rejeitadas,
-                COUNT(CASE WHEN status = 'cancelado' THEN 1 END) as canceladas,
-                COUNT(*) as total
-            FROM vagas
-            WHERE status != 'pendente'
-        """)
-        row = cursor.fetchone()
-        aprovadas, rejeitadas, canceladas, total_decididas = row
+        aprovadas = por_status.get('aprovado', 0)
+        rejeitadas = por_status.get('rejeitado', 0)
+        canceladas = por_status.get('cancelado', 0)
+        total_decididas = sum(total for status, total in por_status.items() if status != 'pendente')
 
         taxa_aprovacao = (aprovadas / total_decididas * 100) if total_decididas > 0 else 0
 
-        conn.close()
-
         return {
             'por_status': por_status,
             'por_tipo': por_tipo,
@@ -492,125 +776,423 @@ def estatisticas_vagas():
         logger.error(f"Erro ao gerar estatísticas: {e}")
         return {}
 
+@cronometrado(categoria="db")
+def reconstruir_estatisticas_vagas(db_path=None):
+    """
+    Recalcula do zero os contadores de vagas_stats a partir da tabela vagas
+
+    Returns:
+        Quantidade de contadores gravados
+    """
+    with transacao(db_path or DB_PATH, imediata=True) as conn:
+        conn.execute("DELETE FROM vagas_stats")
+        cursor = conn.execute(
+            f"INSERT INTO vagas_stats (dimensao, valor, total) {SQL_CONTAGENS_VAGAS}"
+        )
+    return cursor.rowcount
+
+@cronometrado(categoria="db")
+def verificar_estatisticas_vagas(db_path=None, corrigir=False):
+    """
+    Confere os contadores de vagas_stats contra uma contagem completa de vagas
+
+    Args:
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        corrigir: Reconstrói os contadores se houver divergência
+
+    Returns:
+        Lista de tuplas (dimensao, valor, contador, contagem real) divergentes
+    """
+    with transacao(db_path or DB_PATH) as conn:
+        reais = {(d, v): t for d, v, t in conn.execute(SQL_CONTAGENS_VAGAS)}
+        contadores = {
+            (d, v): t for d, v, t in conn.execute("SELECT dimensao, valor, total FROM vagas_stats")
+        }
+
+    divergencias = [
+        (dimensao, valor, contadores.get((dimensao, valor), 0), reais.get((dimensao, valor), 0))
+        for dimensao, valor in sorted(set(reais) | set(contadores), key=str)
+        if contadores.get((dimensao, valor), 0) != reais.get((dimensao, valor), 0)
+    ]
+
+    if divergencias:
+        logger.warning(f"⚠️ {len(divergencias)} contador(es) de vagas_stats divergente(s)")
+        if corrigir:
+            reconstruir_estatisticas_vagas(db_path)
+            logger.info("✅ Contadores de vagas_stats reconstruídos")
+
+    return divergencias
+
+# ==================== PLANOS DE CONSULTA ====================
+
+# Consultas críticas que leem todas as linhas por natureza (mesmo por um
+# índice): verificar_planos() aceita o SCAN delas. {nome: motivo}
+VARREDURAS_PERMITIDAS = {
+    'chaves das vagas': "compara o relatório com todas as vagas (índice de cobertura, em cache por versão)",
+    'centros de custo': "DISTINCT de todas as unidades (índice de cobertura)",
+    'listagem (status=None, primeira página)': "percorre o índice na ordem da listagem e para no LIMIT",
+}
+
+def consultas_criticas():
+    """
+    Consultas executadas a cada interação das páginas de vagas
+
+    Usadas por migracoes.verificar_planos() para garantir que nenhuma delas
+    varre a tabela vagas inteira (a não ser as de VARREDURAS_PERMITIDAS).
+    Os parâmetros são exemplos: só a forma do plano importa.
+
+    Returns:
+        Lista de tuplas (nome, sql, parâmetros)
+    """
+    chave = ('NOME', 'CARGO', 'UNIDADE')
+    cursor = ('2025-01-31', 1000)
+    consultas = [
+        ('vaga existente (aprovar_e_salvar_vaga)', SQL_VAGA_EXISTENTE, chave),
+        ('vaga por funcionário', SQL_VAGA_POR_FUNCIONARIO, chave),
+        ('chaves das vagas', SQL_CHAVES_VAGAS, ()),
+        ('vagas por id', "SELECT * FROM vagas WHERE id IN (?, ?)", (1, 2)),
+        ('decisão em lote', "SELECT id FROM vagas WHERE id IN (?, ?) AND status = ?", (1, 2, 'pendente')),
+        ('centros de custo', "SELECT DISTINCT centro_custo FROM vagas ORDER BY centro_custo", ()),
+    ]
+    for status in (None, 'pendente'):
+        for pagina in (None, cursor):
+            rotulo = f"listagem (status={status}, {'página seguinte' if pagina else 'primeira página'})"
+            consultas.append((rotulo, *_consulta_listar_vagas(status=status, limite=51, cursor=pagina)))
+    where, params = _filtros_vagas(status='pendente')
+    consultas.append(('contagem por status', f"SELECT COUNT(*) FROM vagas{where}", params))
+    return consultas
+
 # ==================== SINCRONIZAÇÃO ====================
 
-def sincronizar_vagas_pendentes(relatorio, tlp):
+# Linhas do relatório analisadas por bloco na detecção de vagas
+TAMANHO_BLOCO_DETECCAO = 100_000
+
+# Vagas gravadas por transação: entre um lote e outro a escrita fica livre
+# para as aprovações feitas na interface durante a sincronização
+TAMANHO_LOTE_SINCRONIZACAO = 500
+
+# Trava sem renovação por mais tempo que isso é de um processo que morreu
+SINCRONIZACAO_TRAVA_EXPIRA_S = 600
+
+SQL_CRIAR_TRAVA_SINCRONIZACAO = """
+    CREATE TABLE IF NOT EXISTS sincronizacao_trava (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        dono TEXT NOT NULL,
+        renovada_em REAL NOT NULL
+    )
+"""
+
+SQL_MAIOR_ID_VAGA = "SELECT COALESCE(MAX(id), 0) FROM vagas"
+
+# Chaves cadastradas depois de um id (vagas criadas por outras sessões
+# enquanto a sincronização grava os lotes)
+SQL_CHAVES_VAGAS_DESDE = "SELECT nome, cargo, centro_custo FROM vagas WHERE id > ?"
+
+def _adquirir_trava_sincronizacao(db_path):
     """
-    Sincroniza vagas do relatório ORIS com a tabela vagas
-    Adiciona novas vagas e marca como resolvidas as que não existem mais
+    Reserva a sincronização do banco (vale entre processos, ex.: cron e interface)
+
+    Returns:
+        Identificador do dono da trava ou None se outra sincronização está em andamento
+    """
+    import time
+    import uuid
+
+    dono = f"{os.getpid()}-{uuid.uuid4().hex}"
+    with transacao(db_path, imediata=True) as conn:
+        conn.execute(SQL_CRIAR_TRAVA_SINCRONIZACAO)
+        atual = conn.execute("SELECT renovada_em FROM sincronizacao_trava WHERE id = 1").fetchone()
+        if atual is not None and time.time() - atual[0] < SINCRONIZACAO_TRAVA_EXPIRA_S:
+            return None
+        conn.execute(
+            "INSERT OR REPLACE INTO sincronizacao_trava (id, dono, renovada_em) VALUES (1, ?, ?)",
+            (dono, time.time())
+        )
+    return dono
+
+def _renovar_trava_sincronizacao(conn, dono):
+    """Renova a trava (dentro da transação de um lote)"""
+    import time
+    conn.execute("UPDATE sincronizacao_trava SET renovada_em = ? WHERE dono = ?", (time.time(), dono))
+
+def _liberar_trava_sincronizacao(db_path, dono):
+    """Libera a trava reservada por _adquirir_trava_sincronizacao()"""
+    try:
+        obter_conexao(db_path).execute("DELETE FROM sincronizacao_trava WHERE dono = ?", (dono,))
+    except sqlite3.Error as e:
+        # A trava expira sozinha (SINCRONIZACAO_TRAVA_EXPIRA_S)
+        logger.warning(f"⚠️ Não foi possível liberar a trava da sincronização: {e}")
+
+def _detectar_vagas_em_blocos(relatorio, avisar):
+    """detectar_vagas() por blocos de linhas, avisando o progresso a cada bloco"""
+    import pandas as pd
+    from motor_vagas import detectar_vagas
+
+    blocos = []
+    detectadas = 0
+    for inicio in range(0, len(relatorio), TAMANHO_BLOCO_DETECCAO):
+        bloco = detectar_vagas(relatorio.iloc[inicio:inicio + TAMANHO_BLOCO_DETECCAO])
+        detectadas += len(bloco)
+        if not bloco.empty:
+            blocos.append(bloco)
+        avisar('deteccao', linhas_lidas=min(inicio + TAMANHO_BLOCO_DETECCAO, len(relatorio)),
+               vagas_detectadas=detectadas)
+
+    if not blocos:
+        return detectar_vagas(relatorio.iloc[:0])
+    return blocos[0] if len(blocos) == 1 else pd.concat(blocos)
+
+@cronometrado(categoria="db")
+def sincronizar_vagas_pendentes(relatorio, tlp, db_path=None, simular=False, progresso=None):
+    """
+    Sincroniza vagas do relatório ORIS com a tabela vagas (modo em lote)
+    
+    Carrega as chaves (nome, cargo, centro_custo) já cadastradas uma única
+    vez e calcula as vagas novas por diferença de conjuntos. A gravação é
+    feita em lotes de TAMANHO_LOTE_SINCRONIZACAO, cada um em uma transação
+    curta: aprovações feitas durante a sincronização não ficam bloqueadas,
+    e vagas cadastradas por elas nesse meio tempo não são duplicadas.
+    
+    Só uma sincronização por banco grava ao mesmo tempo (trava na tabela
+    sincronizacao_trava); uma segunda chamada devolve erro com
+    'em_andamento'.
     
     Args:
         relatorio: DataFrame com relatório ORIS
         tlp: DataFrame com TLP
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        simular: Só conta as vagas novas, sem gravar (nem consultar a TLP)
+        progresso: Função opcional chamada como progresso(etapa, estatisticas)
+            a cada bloco ('deteccao'), na comparação com o banco
+            ('comparacao') e a cada lote gravado ('insercao')
     
     Returns:
         Dict com estatísticas da sincronização
     """
-    from aprovar_vaga import processar_demissoes_e_afastamentos, verificar_vaga_na_tlp
+    import pandas as pd
+    from motor_vagas import IndiceAtivos, IndiceTLP, verificar_vagas_na_tlp
+    
+    banco = db_path or DB_PATH
+    estatisticas = {'linhas_relatorio': len(relatorio)}
     
+    def avisar(etapa, **valores):
+        estatisticas.update(valores)
+        if progresso is not None:
+            progresso(etapa, dict(estatisticas))
+    
+    dono = None
     try:
+        if not simular:
+            dono = _adquirir_trava_sincronizacao(banco)
+            if dono is None:
+                logger.warning("⚠️ Sincronização recusada: outra sincronização em andamento neste banco")
+                return {'erro': "Já existe uma sincronização em andamento neste banco", 'em_andamento': True}
+        
         # Processa vagas do relatório
-        vagas_relatorio = processar_demissoes_e_afastamentos(relatorio)
+        vagas_relatorio = _detectar_vagas_em_blocos(relatorio, avisar)
         
-        # Busca vagas já cadastradas
-        vagas_existentes = listar_vagas(status='pendente')
+        # Chaves já cadastradas (qualquer status), lidas de uma vez
+        with transacao(banco) as conn:
+            ultimo_id = conn.execute(SQL_MAIOR_ID_VAGA).fetchone()[0]
+            existentes = set(conn.execute(SQL_CHAVES_VAGAS).fetchall())
         
-        novas = 0
-        atualizadas = 0
+        # Anti-join: só entram vagas cuja chave não existe no banco nem
+        # se repete no próprio relatório
+        chaves = pd.Series(list(zip(
+            vagas_relatorio['nome'],
+            vagas_relatorio['cargo'],
+            vagas_relatorio['centro_custo']
+        )), index=vagas_relatorio.index, dtype=object)
+        eh_nova = ~chaves.isin(existentes) & ~chaves.duplicated()
         
-        for vaga in vagas_relatorio:
-            # Verifica se já existe
-            vaga_existente = buscar_vaga_por_funcionario(
-                vaga['nome'],
-                vaga['cargo'],
-                vaga['centro_custo']
-            )
+        # Campos NOT NULL da tabela vagas: linhas incompletas são ignoradas
+        completa = vagas_relatorio[CAMPOS_OBRIGATORIOS_VAGA].notna().all(axis=1)
+        ignoradas = int((eh_nova & ~completa).sum())
+        vagas_novas = vagas_relatorio[(eh_nova & completa).to_numpy()]
+        avisar('comparacao', novas=len(vagas_novas), ignoradas=ignoradas)
+        
+        novas = len(vagas_novas)
+        if not vagas_novas.empty and not simular:
+            infos_tlp = verificar_vagas_na_tlp(
+                vagas_novas, IndiceTLP(tlp), IndiceAtivos(relatorio)
+            ).to_dict('records')
+            registros = [
+                _parametros_vaga(vaga, info_tlp)
+                for vaga, info_tlp in zip(vagas_novas.to_dict('records'), infos_tlp)
+            ]
             
-            if vaga_existente is None:
-                # Nova vaga - cadastra
-                info_tlp = verificar_vaga_na_tlp(vaga['row_data'], tlp, relatorio)
-                vaga_id = salvar_vaga_para_aprovacao(vaga, info_tlp)
-                
-                if vaga_id:
-                    novas += 1
-            else:
-                # Vaga já existe - atualiza se necessário
-                atualizadas += 1
+            novas = 0
+            for inicio in range(0, len(registros), TAMANHO_LOTE_SINCRONIZACAO):
+                lote = registros[inicio:inicio + TAMANHO_LOTE_SINCRONIZACAO]
+                with transacao(banco, imediata=True) as conn:
+                    # Parâmetros na ordem de SQL_INSERIR_VAGA: nome, centro_custo, cargo
+                    recentes = set(conn.execute(SQL_CHAVES_VAGAS_DESDE, (ultimo_id,)).fetchall())
+                    if recentes:
+                        existentes |= recentes
+                        lote = [r for r in lote if (r[0], r[2], r[1]) not in existentes]
+                    conn.executemany(SQL_INSERIR_VAGA, lote)
+                    ultimo_id = conn.execute(SQL_MAIOR_ID_VAGA).fetchone()[0]
+                    _renovar_trava_sincronizacao(conn, dono)
+                novas += len(lote)
+                avisar('insercao', inseridas=novas)
         
-        logger.info(f"📊 Sincronização: {novas} novas, {atualizadas} atualizadas")
+        atualizadas = len(vagas_relatorio) - novas - ignoradas
+        
+        if ignoradas:
+            logger.warning(f"⚠️ {ignoradas} vaga(s) ignorada(s) por dados obrigatórios ausentes")
+        logger.info(
+            f"📊 Sincronização{' (simulação)' if simular else ''}: "
+            f"{novas} novas, {atualizadas} atualizadas"
+        )
         
         return {
             'novas': novas,
             'atualizadas': atualizadas,
+            'ignoradas': ignoradas,
             'total_processadas': len(vagas_relatorio)
         }
         
     except Exception as e:
         logger.error(f"Erro na sincronização: {e}")
         return {'erro': str(e)}
+    finally:
+        if dono is not None:
+            _liberar_trava_sincronizacao(banco, dono)
 
 # ==================== EXPORTAÇÃO ====================
 
+@cronometrado(categoria="db")
 def exportar_vagas_excel(status=None, arquivo="vagas_export.xlsx"):
     """
     Exporta vagas para Excel
     
+    A planilha é gerada em streaming a partir do cursor (ver
+    exportacao.exportar_vagas) e fica em cache até a tabela vagas mudar.
+    
     Args:
         status: Filtro de status ou None para todos
         arquivo: Nome do arquivo de saída
     
     Returns:
-        Path do arquivo gerado
+        BytesIO com a planilha ou None se não houver vagas
     """
-    try:
-        from io import BytesIO
-        
-        df = listar_vagas(status=status)
-        
-        if df.empty:
-            logger.warning("Nenhuma vaga para exportar")
-            return None
-        
-        # Formata colunas
-        colunas_exibir = [
-            'id', 'nome', 'cargo', 'centro_custo', 'situacao',
-            'tipo_vaga', 'data_evento', 'status', 'data_decisao',
-            'usuario_aprovador', 'deficit', 'dias_afastamento'
-        ]
-        
-        df_export = df[colunas_exibir].copy()
-        
-        # Renomeia colunas
-        df_export.columns = [
-            'ID', 'Nome', 'Cargo', 'Centro de Custo', 'Situação',
-            'Tipo', 'Data Evento', 'Status', 'Data Decisão',
-            'Aprovador', 'Déficit', 'Dias Afastamento'
-        ]
-        
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-            df_export.to_excel(writer, index=False, sheet_name='Vagas')
-            
-            # Formata planilha
-            workbook = writer.book
-            worksheet = writer.sheets['Vagas']
-            
-            # Formato para cabeçalho
-            header_format = workbook.add_format({
-                'bold': True,
-                'bg_color': '#4472C4',
-                'font_color': 'white',
-                'border': 1
-            })
-            
-            # Aplica formato
-            for col_num, value in enumerate(df_export.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-                worksheet.set_column(col_num, col_num, 15)
-        
-        buffer.seek(0)
-        return buffer
-        
-    except Exception as e:
-        logger.error(f"Erro ao exportar para Excel: {e}")
+    from io import BytesIO
+    from exportacao import exportar_vagas
+    
+    conteudo = exportar_vagas('xlsx', DB_PATH, status=status)
+    
+    if conteudo is None:
+        logger.warning("Nenhuma vaga para exportar")
         return None
+    
+    return BytesIO(conteudo)
+
+# ==================== LINHA DE COMANDO ====================
+
+# Códigos de saída da linha de comando (para cron/agendadores)
+SAIDA_OK = 0
+SAIDA_ERRO_SINCRONIZACAO = 1
+SAIDA_BANCO_INVALIDO = 2
+SAIDA_EM_ANDAMENTO = 3
+
+# Etapas da sincronização exibidas no progresso
+ETAPAS_SINCRONIZACAO = {
+    'carga': "Relatório e TLP carregados",
+    'deteccao': "Linhas do relatório analisadas",
+    'comparacao': "Vagas comparadas com o banco",
+    'insercao': "Lote de vagas novas gravado",
+}
+
+def comando_sync(banco=None, simular=False, silencioso=False):
+    """
+    Sincroniza as vagas pendentes de um banco sem a interface (ex.: cron)
+
+    Carrega só as colunas usadas na detecção de vagas e mostra o progresso
+    por etapa em stderr.
+
+    Args:
+        banco: Caminho do banco (padrão: DB_PATH do config)
+        simular: Não grava; informa quantas vagas seriam criadas
+        silencioso: Não mostra o progresso
+
+    Returns:
+        Tupla (código de saída, resumo em dict)
+    """
+    import sys
+    import time
+    from dados import carregar_tabela
+
+    banco = os.path.abspath(str(banco or DB_PATH))
+    inicio = time.perf_counter()
+    resumo = {'comando': 'sync', 'banco': banco, 'simulacao': simular}
+
+    def progresso(etapa, estatisticas):
+        if silencioso:
+            return
+        detalhes = ", ".join(f"{chave}={valor}" for chave, valor in estatisticas.items())
+        print(f"[{time.perf_counter() - inicio:6.1f}s] {ETAPAS_SINCRONIZACAO[etapa]} ({detalhes})",
+              file=sys.stderr, flush=True)
+
+    def finalizar(codigo, **valores):
+        resumo.update(valores)
+        resumo['duracao_s'] = round(time.perf_counter() - inicio, 3)
+        return codigo, resumo
+
+    if not os.path.exists(banco):
+        return finalizar(SAIDA_BANCO_INVALIDO, erro=f"Banco de dados não encontrado: {banco}")
+
+    conn = obter_conexao(banco)
+    tabelas = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    faltando = [tabela for tabela in ('relatorio_oris', 'tlp', 'vagas') if tabela not in tabelas]
+    if faltando:
+        return finalizar(SAIDA_BANCO_INVALIDO, erro=f"Tabelas faltando no banco: {', '.join(faltando)}")
+
+    relatorio = carregar_tabela('relatorio_oris', 'aprovar_vaga', db_path=banco)
+    tlp = carregar_tabela('tlp', 'aprovar_vaga', db_path=banco)
+    progresso('carga', {'linhas_relatorio': len(relatorio), 'linhas_tlp': len(tlp)})
+
+    resultado = sincronizar_vagas_pendentes(relatorio, tlp, banco, simular, progresso)
+    if resultado.get('em_andamento'):
+        return finalizar(SAIDA_EM_ANDAMENTO, **resultado)
+    if 'erro' in resultado:
+        return finalizar(SAIDA_ERRO_SINCRONIZACAO, **resultado)
+    return finalizar(SAIDA_OK, **resultado)
+
+def main(argv=None):
+    """Linha de comando: python -m gestao_vagas sync [--simular] [--json]"""
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(prog="python -m gestao_vagas", description="Gestão de vagas do Sistema ORIS")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    sync = comandos.add_parser("sync", help="Sincroniza as vagas pendentes com o relatório ORIS")
+    sync.add_argument("--banco", help="Arquivo oris.db (padrão: DB_PATH do config)")
+    sync.add_argument("--simular", "--dry-run", action="store_true",
+                      help="Não grava; informa quantas vagas seriam criadas")
+    sync.add_argument("--json", action="store_true", help="Imprime o resumo em JSON no stdout")
+    sync.add_argument("-q", "--silencioso", action="store_true", help="Sem progresso nem logs informativos")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.WARNING if args.silencioso else logging.INFO,
+        format="%(message)s",
+        stream=sys.stderr
+    )
+
+    codigo, resumo = comando_sync(args.banco, args.simular, args.silencioso)
+
+    if args.json:
+        print(json.dumps(resumo, ensure_ascii=False))
+    elif codigo == SAIDA_OK:
+        prefixo = "[SIMULAÇÃO] " if args.simular else ""
+        print(f"{prefixo}[OK] {resumo['novas']} novas, {resumo['atualizadas']} atualizadas, "
+              f"{resumo['ignoradas']} ignoradas de {resumo['total_processadas']} "
+              f"em {resumo['duracao_s']:.1f}s")
+    else:
+        print(f"[ERRO] {resumo['erro']}", file=sys.stderr)
+    return codigo
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,251 @@
+"""
+Instrumentação leve de desempenho do Sistema ORIS
+
+Mede trechos do código (spans) durante uma execução da página (rerun do
+Streamlit) e conta as instruções SQL executadas em cada trecho. Sem uma
+coleta ativa, medir() e @cronometrado custam uma leitura de atributo.
+
+Uso:
+    coleta = iniciar_coleta("Aprovação de Vagas")
+    with medir("carregar_dados", "carga"):
+        ...
+    finalizar_coleta()  # grava a coleta em logs/perfil.jsonl
+
+    @cronometrado(categoria="db")
+    def listar_vagas(...):
+        ...
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Importa configuração centralizada
+try:
+    from config import (
+        PERFIL_LOG_ARQUIVO,
+        PERFIL_LOG_MAX_BYTES,
+        PERFIL_LOG_ARQUIVOS
+    )
+except ImportError:
+    # Fallback para compatibilidade
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    PERFIL_LOG_ARQUIVO = os.path.join(BASE_DIR, "logs", "perfil.jsonl")
+    PERFIL_LOG_MAX_BYTES = 5 * 1024 * 1024
+    PERFIL_LOG_ARQUIVOS = 3
+
+logger = logging.getLogger(__name__)
+
+# Coleta ativa da thread atual (cada sessão do Streamlit roda em uma thread)
+_local = threading.local()
+
+# Logger dos spans em JSON lines (arquivo rotativo, configurado no primeiro uso)
+_logger_perfil = logging.getLogger("oris.perfil")
+_logger_perfil.propagate = False
+_logger_perfil_lock = threading.Lock()
+
+# Tamanho máximo do trecho de SQL usado como chave na contagem de instruções
+TAMANHO_CHAVE_SQL = 80
+
+# ==================== COLETA ====================
+
+class Coleta:
+    """
+    Spans e contagem de SQL de uma execução
+
+    Cada span é um dict com nome, categoria, inicio_ms e duracao_ms
+    (relativos ao início da coleta), profundidade, pai (índice do span que
+    o contém ou None) e sql (instruções executadas dentro dele, sem contar
+    os spans filhos).
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.data = datetime.now().isoformat(timespec="seconds")
+        self.inicio = time.perf_counter()
+        self.duracao_ms = None
+        self.spans = []
+        self.pilha = []
+        self.total_sql = 0
+        self.sql_por_instrucao = Counter()
+
+    def como_dict(self):
+        """Representação serializável em JSON"""
+        return {
+            "coleta": self.nome,
+            "data": self.data,
+            "duracao_ms": self.duracao_ms,
+            "total_sql": self.total_sql,
+            "sql_por_instrucao": dict(self.sql_por_instrucao.most_common()),
+            "spans": self.spans,
+        }
+
+def coleta_atual():
+    """Coleta ativa da thread atual ou None"""
+    return getattr(_local, "coleta", None)
+
+def iniciar_coleta(nome):
+    """Inicia a coleta de spans da thread atual (substitui uma coleta anterior)"""
+    _local.coleta = Coleta(nome)
+    return _local.coleta
+
+def finalizar_coleta(registrar=True):
+    """
+    Encerra a coleta da thread atual
+
+    Args:
+        registrar: Acrescenta a coleta ao log JSON lines (PERFIL_LOG_ARQUIVO)
+
+    Returns:
+        Coleta encerrada ou None se não havia coleta ativa
+    """
+    coleta = coleta_atual()
+    if coleta is None:
+        return None
+    _local.coleta = None
+
+    coleta.duracao_ms = (time.perf_counter() - coleta.inicio) * 1000
+    if registrar:
+        registrar_coleta(coleta)
+    return coleta
+
+# ==================== SPANS ====================
+
+@contextmanager
+def medir(nome, categoria="codigo"):
+    """
+    Mede o bloco como um span da coleta ativa (não faz nada sem coleta)
+
+    Args:
+        nome: Nome exibido no painel
+        categoria: 'carga', 'processamento', 'db', 'render', 'pagina'...
+    """
+    coleta = coleta_atual()
+    if coleta is None:
+        yield
+        return
+
+    span = {
+        "nome": nome,
+        "categoria": categoria,
+        "inicio_ms": (time.perf_counter() - coleta.inicio) * 1000,
+        "duracao_ms": None,
+        "profundidade": len(coleta.pilha),
+        "pai": coleta.pilha[-1] if coleta.pilha else None,
+        "sql": 0,
+    }
+    coleta.spans.append(span)
+    coleta.pilha.append(len(coleta.spans) - 1)
+    try:
+        yield
+    finally:
+        # Também em st.stop()/st.rerun(), que não herdam de Exception
+        span["duracao_ms"] = (time.perf_counter() - coleta.inicio) * 1000 - span["inicio_ms"]
+        coleta.pilha.pop()
+
+def cronometrado(nome=None, categoria="codigo"):
+    """
+    Decorador que mede cada chamada da função como um span
+
+    Args:
+        nome: Nome do span (padrão: nome da função)
+        categoria: Categoria do span
+    """
+    def decorador(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if coleta_atual() is None:
+                return funcao(*args, **kwargs)
+            with medir(rotulo, categoria):
+                return funcao(*args, **kwargs)
+
+        return envoltorio
+    return decorador
+
+def registrar_sql(instrucao):
+    """
+    Callback de sqlite3.Connection.set_trace_callback: conta a instrução
+    na coleta ativa e no span corrente
+    """
+    coleta = coleta_atual()
+    if coleta is None:
+        return
+    coleta.total_sql += 1
+    coleta.sql_por_instrucao[" ".join(instrucao.split())[:TAMANHO_CHAVE_SQL]] += 1
+    if coleta.pilha:
+        coleta.spans[coleta.pilha[-1]]["sql"] += 1
+
+# ==================== LOG ====================
+
+def _configurar_logger_perfil():
+    """Abre o arquivo rotativo do log de spans (uma vez por processo)"""
+    with _logger_perfil_lock:
+        if _logger_perfil.handlers:
+            return
+        os.makedirs(os.path.dirname(str(PERFIL_LOG_ARQUIVO)), exist_ok=True)
+        handler = RotatingFileHandler(
+            PERFIL_LOG_ARQUIVO,
+            maxBytes=PERFIL_LOG_MAX_BYTES,
+            backupCount=PERFIL_LOG_ARQUIVOS,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger_perfil.addHandler(handler)
+        _logger_perfil.setLevel(logging.INFO)
+
+def registrar_coleta(coleta):
+    """Acrescenta a coleta como uma linha JSON ao log de spans"""
+    try:
+        _configurar_logger_perfil()
+        _logger_perfil.info(json.dumps(coleta.como_dict(), ensure_ascii=False))
+    except OSError as e:
+        logger.warning(f"⚠️ Log de perfil indisponível: {e}")
+
+# ==================== RESUMO ====================
+
+def resumo_por_span(coleta):
+    """
+    Tempo total, tempo próprio e SQL por nome de span
+
+    Returns:
+        Lista de dicts (nome, categoria, chamadas, total_ms, proprio_ms, sql)
+        do maior para o menor tempo total
+    """
+    filhos_ms = [0.0] * len(coleta.spans)
+    for span in coleta.spans:
+        if span["pai"] is not None and span["duracao_ms"] is not None:
+            filhos_ms[span["pai"]] += span["duracao_ms"]
+
+    resumo = {}
+    for i, span in enumerate(coleta.spans):
+        duracao = span["duracao_ms"] or 0.0
+        item = resumo.setdefault(span["nome"], {
+            "nome": span["nome"], "categoria": span["categoria"],
+            "chamadas": 0, "total_ms": 0.0, "proprio_ms": 0.0, "sql": 0
+        })
+        item["chamadas"] += 1
+        item["proprio_ms"] += duracao - filhos_ms[i]
+        item["sql"] += span["sql"]
+        # Chamadas recursivas/aninhadas do mesmo nome não somam duas vezes
+        if not _tem_ancestral(coleta.spans, i, span["nome"]):
+            item["total_ms"] += duracao
+
+    return sorted(resumo.values(), key=lambda item: item["total_ms"], reverse=True)
+
+def _tem_ancestral(spans, indice, nome):
+    """Indica se algum ancestral do span tem o mesmo nome"""
+    pai = spans[indice]["pai"]
+    while pai is not None:
+        if spans[pai]["nome"] == nome:
+            return True
+        pai = spans[pai]["pai"]
+    return False
@@ -0,0 +1,244 @@
+"""
+Migrations versionadas do banco oris.db
+
+Cada migration tem um número de versão e é aplicada uma única vez; as
+versões aplicadas ficam registradas na tabela 'schema_version'. A tabela
+'vagas' continua sendo criada/migrada por check_and_migrate.py (status
+'cancelado'); este módulo cuida do que vem depois, como os índices de
+desempenho.
+
+Uso por linha de comando:
+    python migracoes.py              # aplica as migrations pendentes
+    python migracoes.py --verificar  # confere os planos das consultas críticas
+                                     # e os contadores de vagas_stats
+"""
+
+import os
+import re
+import sys
+import logging
+
+from conexao import obter_conexao, transacao
+
+# Importa configuração centralizada
+try:
+    from config import DB_PATH_STR as DB_PATH
+except ImportError:
+    # Fallback para compatibilidade
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DB_PATH = os.path.join(BASE_DIR, "data", "oris.db")
+
+logger = logging.getLogger(__name__)
+
+# ==================== MIGRATIONS ====================
+
+def _indices_vagas(db_path):
+    """Índices compostos da tabela vagas, alinhados aos filtros de gestao_vagas"""
+    from gestao_vagas import SQL_DATA_EVENTO_ORDEM
+
+    conn = obter_conexao(db_path)
+
+    # Verificação de duplicidade (aprovar_e_salvar_vaga), busca por
+    # funcionário e leitura das chaves na sincronização (índice de cobertura)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vagas_chave_status
+        ON vagas (nome, cargo, centro_custo, status)
+    """)
+
+    # Listagem paginada: a ordem (data_evento_ordem, id) vem do índice,
+    # sem ordenar a tabela a cada página
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_vagas_status_data_evento
+        ON vagas (status, ({SQL_DATA_EVENTO_ORDEM}), id)
+    """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_vagas_data_evento_ordem
+        ON vagas (({SQL_DATA_EVENTO_ORDEM}), id)
+    """)
+
+def _indices_relatorio(db_path):
+    """Coluna contrato_normalizado e índices de relatorio_oris usados pelo déficit"""
+    from deficit import garantir_contrato_normalizado, garantir_indices_deficit
+
+    # O relatório é recriado a cada importação; o módulo deficit também
+    # recria esses índices sob demanda
+    if garantir_contrato_normalizado(db_path):
+        garantir_indices_deficit(db_path)
+
+# Contadores de vagas por dimensão ('status', 'tipo', 'cargo') e valor
+SQL_CRIAR_VAGAS_STATS = """
+    CREATE TABLE IF NOT EXISTS vagas_stats (
+        dimensao TEXT NOT NULL,
+        valor TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimensao, valor)
+    ) WITHOUT ROWID
+"""
+
+def _sql_contar(sinal, registro):
+    """Instruções de trigger que somam 'sinal' aos contadores de NEW/OLD"""
+    return "\n".join(
+        f"""
+                INSERT INTO vagas_stats (dimensao, valor, total) VALUES ('{dimensao}', {registro}.{coluna}, {sinal})
+                ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + ({sinal});"""
+        for dimensao, coluna in (('status', 'status'), ('tipo', 'tipo_vaga'), ('cargo', 'cargo'))
+    )
+
+# Triggers que mantêm vagas_stats; o UPDATE só dispara quando muda uma
+# coluna contada (não no update_vagas_timestamp)
+TRIGGERS_VAGAS_STATS = {
+    "vagas_stats_insert": ("AFTER INSERT ON vagas", _sql_contar(1, "NEW")),
+    "vagas_stats_delete": ("AFTER DELETE ON vagas", _sql_contar(-1, "OLD")),
+    "vagas_stats_update": (
+        "AFTER UPDATE OF status, tipo_vaga, cargo ON vagas",
+        _sql_contar(-1, "OLD") + _sql_contar(1, "NEW")
+    ),
+}
+
+def _contadores_vagas(db_path):
+    """Tabela vagas_stats, triggers de manutenção e carga inicial dos contadores"""
+    from gestao_vagas import reconstruir_estatisticas_vagas
+
+    conn = obter_conexao(db_path)
+    conn.execute(SQL_CRIAR_VAGAS_STATS)
+    for nome, (evento, corpo) in TRIGGERS_VAGAS_STATS.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {nome}
+            {evento}
+            BEGIN{corpo}
+            END
+        """)
+    reconstruir_estatisticas_vagas(db_path)
+
+def _arredondar_carga_vagas(db_path):
+    """Carga horária das vagas já gravadas com 2 casas (sem o resíduo do float32)"""
+    obter_conexao(db_path).execute("""
+        UPDATE vagas SET carga_horaria_semanal = ROUND(carga_horaria_semanal, 2)
+        WHERE carga_horaria_semanal <> ROUND(carga_horaria_semanal, 2)
+    """)
+
+# (versão, descrição, função(db_path)) em ordem de aplicação
+MIGRACOES = [
+    (1, "Índices compostos de vagas (duplicidade e listagem)", _indices_vagas),
+    (2, "Contrato normalizado e índice de cobertura do déficit em relatorio_oris", _indices_relatorio),
+    (3, "Contadores vagas_stats mantidos por triggers", _contadores_vagas),
+    (4, "Carga horária das vagas com 2 casas decimais", _arredondar_carga_vagas),
+]
+
+SQL_CRIAR_SCHEMA_VERSION = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        versao INTEGER PRIMARY KEY,
+        descricao TEXT NOT NULL,
+        aplicada_em DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def versoes_aplicadas(db_path=None):
+    """Conjunto das versões já registradas em schema_version"""
+    conn = obter_conexao(db_path)
+    conn.execute(SQL_CRIAR_SCHEMA_VERSION)
+    return {row[0] for row in conn.execute("SELECT versao FROM schema_version")}
+
+def executar_migracoes(db_path=None, reaplicar=False):
+    """
+    Aplica as migrations pendentes e atualiza as estatísticas do planner
+
+    As migrations usam CREATE ... IF NOT EXISTS: reaplicar é seguro e
+    necessário quando uma tabela foi recriada (ex.: check_and_migrate.py
+    reconstrói 'vagas' e perde os índices).
+
+    Args:
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+        reaplicar: Executa também as migrations já registradas
+
+    Returns:
+        Lista das versões executadas
+    """
+    aplicadas = versoes_aplicadas(db_path)
+    executadas = []
+
+    for versao, descricao, migracao in MIGRACOES:
+        if versao in aplicadas and not reaplicar:
+            continue
+
+        logger.info(f"Migration {versao}: {descricao}")
+        with transacao(db_path, imediata=True) as conn:
+            migracao(db_path)
+            conn.execute(
+                "INSERT OR IGNORE INTO schema_version (versao, descricao) VALUES (?, ?)",
+                (versao, descricao)
+            )
+        executadas.append(versao)
+
+    if executadas:
+        # Estatísticas dos índices novos para o planner (sqlite_stat1)
+        obter_conexao(db_path).execute("ANALYZE")
+        logger.info(f"✅ {len(executadas)} migration(s) aplicada(s); ANALYZE executado")
+
+    return executadas
+
+# ==================== PLANOS DE CONSULTA ====================
+
+# Linha de EXPLAIN QUERY PLAN que percorre a tabela inteira, direto ou por
+# um índice ('SCAN vagas [USING [COVERING] INDEX ...]' no SQLite >= 3.36,
+# 'SCAN TABLE vagas' antes)
+_VARREDURA_COMPLETA = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+def plano_consulta(sql, parametros=(), db_path=None):
+    """Linhas de detalhe do EXPLAIN QUERY PLAN de uma consulta"""
+    conn = obter_conexao(db_path)
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+
+def verificar_planos(db_path=None):
+    """
+    Confere se alguma consulta crítica faz varredura completa de tabela
+
+    Verifica gestao_vagas.consultas_criticas() e o filtro do relatório por
+    contrato (deficit.carregar_fontes). Varrer um índice inteiro também
+    conta; só as consultas de gestao_vagas.VARREDURAS_PERMITIDAS são aceitas.
+
+    Returns:
+        Lista de tuplas (nome, plano) das consultas com varredura completa
+    """
+    from gestao_vagas import consultas_criticas, VARREDURAS_PERMITIDAS
+
+    consultas = list(consultas_criticas())
+    conn = obter_conexao(db_path)
+    colunas_relatorio = {row[1] for row in conn.execute('PRAGMA table_info("relatorio_oris")')}
+    if "contrato_normalizado" in colunas_relatorio:
+        consultas.append((
+            'relatório por contrato',
+            'SELECT "Nome" FROM relatorio_oris WHERE contrato_normalizado = ? ORDER BY rowid',
+            ('CONTRATO',)
+        ))
+
+    falhas = []
+    for nome, sql, parametros in consultas:
+        if nome in VARREDURAS_PERMITIDAS:
+            continue
+        plano = plano_consulta(sql, parametros, db_path)
+        if any(_VARREDURA_COMPLETA.match(linha) for linha in plano):
+            falhas.append((nome, plano))
+    return falhas
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if "--verificar" in sys.argv[1:]:
+        from gestao_vagas import verificar_estatisticas_vagas
+
+        falhas = verificar_planos()
+        for nome, plano in falhas:
+            print(f"[ERRO] Varredura completa em '{nome}': {' | '.join(plano)}")
+
+        # Contadores divergentes são reconstruídos a partir da tabela vagas
+        divergencias = verificar_estatisticas_vagas(DB_PATH, corrigir=True)
+        for dimensao, valor, contador, real in divergencias:
+            print(f"[AVISO] vagas_stats {dimensao}={valor}: {contador} (real: {real}) - reconstruído")
+
+        if falhas:
+            raise SystemExit(1)
+        print("[OK] Nenhuma consulta crítica faz varredura completa")
+    else:
+        executadas = executar_migracoes()
+        print(f"Migrations aplicadas: {executadas or 'nenhuma pendente'}")
@@ -0,0 +1,432 @@
+"""
+Motor vetorizado de identificação de vagas
+Processa o relatório ORIS coluna a coluna (sem iterrows)
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import logging
+
+from instrumentacao import cronometrado
+
+# Importa configuração centralizada
+try:
+    from config import DATA_MINIMA_VAGAS
+except ImportError:
+    # Fallback para compatibilidade
+    DATA_MINIMA_VAGAS = datetime(2025, 1, 1)
+
+logger = logging.getLogger(__name__)
+
+# Situações que NÃO geram vaga por afastamento
+SITUACOES_NAO_AFASTAMENTO = ["01-ATIVO", "99-Demitido", "18-ATESTADO MÉDICO"]
+
+# Colunas de data de situação, em ordem de preferência
+COLUNAS_DATA_SITUACAO = ["Dt Início Situação", "Dt Inicio Situação", "Dt Situação"]
+
+# Colunas retornadas por detectar_vagas()
+COLUNAS_VAGAS = [
+    "nome", "cargo", "centro_custo", "nome_fantasia", "carga_horaria",
+    "situacao", "motivo", "tipo", "data_evento", "dias_afastamento"
+]
+
+# Colunas do relatório copiadas para 'row_data' (usadas na análise TLP)
+COLUNAS_ROW_DATA = ["Nome", "Cargo", "Centro custo", "Nome Fantasia", "Situação", "Carga Horária Semanal"]
+
+# ==================== DATAS ====================
+
+def _valores_vazios(serie):
+    """Máscara de valores nulos ou strings vazias"""
+    return serie.isna().to_numpy() | (serie.astype(str).str.strip() == '').to_numpy()
+
+def _converter_valores_unicos(valores):
+    """
+    Converte valores distintos (não vazios) seguindo as regras de converter_datas()
+
+    Returns:
+        Tupla (datas, definido): datas convertidas e máscara indicando se o
+        valor "conta" como data preenchida. Valores do formato brasileiro/ISO
+        inválidos viram NaT mas contam como preenchidos; no fallback, valores
+        não reconhecidos contam como vazios.
+    """
+    datas = pd.Series(pd.NaT, index=valores.index, dtype="datetime64[ns]")
+    definido = pd.Series(True, index=valores.index)
+
+    eh_datetime = valores.map(lambda v: isinstance(v, datetime))
+    if eh_datetime.any():
+        datas[eh_datetime] = pd.to_datetime(valores[eh_datetime]).to_numpy()
+
+    texto = valores[~eh_datetime].astype(str).str.strip()
+    com_barra = texto.str.contains('/', regex=False)
+    com_traco = ~com_barra & texto.str.contains('-', regex=False)
+    outros = ~(com_barra | com_traco)
+
+    if com_barra.any():
+        datas[texto.index[com_barra]] = pd.to_datetime(
+            texto[com_barra], format='%d/%m/%Y', errors='coerce'
+        ).to_numpy()
+
+    if com_traco.any():
+        datas[texto.index[com_traco]] = pd.to_datetime(
+            texto[com_traco], format='%Y-%m-%d', errors='coerce'
+        ).to_numpy()
+
+    if outros.any():
+        # Casos raros: inferência elemento a elemento (dayfirst=True)
+        inferidas = pd.to_datetime(
+            texto[outros].map(lambda v: pd.to_datetime(v, dayfirst=True, errors='coerce')),
+            errors='coerce'
+        )
+        datas[texto.index[outros]] = inferidas.to_numpy()
+        definido[texto.index[outros]] = inferidas.notna().to_numpy()
+
+    return datas, definido
+
+def _converter_datas_detalhado(serie):
+    """
+    Converte uma coluna de datas processando cada valor distinto uma única vez
+
+    Uma coluna já convertida (datetime64) não guarda mais o texto original:
+    só as datas válidas contam como preenchidas. Para a regra completa,
+    passe a coluna como texto (ver ESQUEMA_TABELAS).
+
+    Returns:
+        Tupla (datas, definido) alinhada ao índice da série
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, serie.notna().to_numpy()
+
+    datas = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+    definido = np.zeros(len(serie), dtype=bool)
+
+    preenchidos = ~_valores_vazios(serie)
+    if not preenchidos.any():
+        return datas, definido
+
+    valores = serie[preenchidos]
+    unicos = pd.Series(valores.unique())
+    datas_unicas, definido_unico = _converter_valores_unicos(unicos)
+
+    # Mapeia o resultado dos valores distintos de volta para as linhas
+    posicoes = pd.Index(unicos).get_indexer(valores)
+    datas[preenchidos] = datas_unicas.to_numpy()[posicoes]
+    definido[preenchidos] = definido_unico.to_numpy()[posicoes]
+    return datas, definido
+
+def converter_datas(serie):
+    """
+    Converte uma coluna de datas para datetime64 de uma só vez
+
+    Regras: formato brasileiro (DD/MM/YYYY) quando há '/', ISO (YYYY-MM-DD)
+    quando há '-' e, para o restante, inferência com dayfirst=True.
+
+    Args:
+        serie: Series com datas (strings, datetime ou nulos)
+
+    Returns:
+        Series datetime64 (NaT para valores vazios ou inválidos)
+    """
+    datas, _ = _converter_datas_detalhado(serie)
+    return datas
+
+def _primeira_data_situacao(relatorio):
+    """
+    Escolhe, por linha, a primeira coluna de data de situação preenchida
+    (mesma regra do laço original sobre COLUNAS_DATA_SITUACAO)
+    """
+    resultado = pd.Series(pd.NaT, index=relatorio.index, dtype="datetime64[ns]")
+    pendente = np.ones(len(relatorio), dtype=bool)
+
+    for col in COLUNAS_DATA_SITUACAO:
+        if col not in relatorio.columns or not pendente.any():
+            continue
+        datas, definido = _converter_datas_detalhado(relatorio[col])
+        usar = pendente & definido
+        resultado[usar] = datas[usar].to_numpy()
+        pendente &= ~definido
+
+    return resultado
+
+# ==================== DETECÇÃO ====================
+
+def _formatar_datas(datas):
+    """Formata datas como DD/MM/YYYY formatando cada data distinta uma única vez"""
+    unicas = pd.DatetimeIndex(datas.unique())
+    return unicas.strftime("%d/%m/%Y").to_numpy()[unicas.get_indexer(datas)]
+
+def _coluna_ou_vazio(relatorio, coluna, mascara):
+    """Retorna a coluna filtrada pela máscara ou strings vazias se não existir"""
+    if coluna in relatorio.columns:
+        return relatorio.loc[mascara, coluna].to_numpy()
+    return np.full(int(mascara.sum()), "", dtype=object)
+
+@cronometrado(categoria="processamento")
+def detectar_vagas(relatorio):
+    """
+    Identifica demissões e afastamentos de forma vetorizada
+
+    Args:
+        relatorio: DataFrame com relatório ORIS
+
+    Returns:
+        DataFrame compacto com as colunas de COLUNAS_VAGAS, indexado
+        pelo índice original do relatório
+    """
+    if relatorio is None or relatorio.empty:
+        return pd.DataFrame(columns=COLUNAS_VAGAS)
+
+    data_minima = pd.Timestamp(DATA_MINIMA_VAGAS)
+
+    # Demissões
+    if "Dt Rescisão" in relatorio.columns:
+        data_rescisao = converter_datas(relatorio["Dt Rescisão"])
+    else:
+        data_rescisao = pd.Series(pd.NaT, index=relatorio.index, dtype="datetime64[ns]")
+    eh_demissao = (data_rescisao >= data_minima).to_numpy()
+
+    # Afastamentos
+    if "Situação" in relatorio.columns:
+        situacao = relatorio["Situação"]
+    else:
+        situacao = pd.Series(None, index=relatorio.index, dtype=object)
+    data_situacao = _primeira_data_situacao(relatorio)
+    eh_afastamento = (
+        ~eh_demissao
+        & ~situacao.isin(SITUACOES_NAO_AFASTAMENTO).to_numpy()
+        & (data_situacao >= data_minima).to_numpy()
+    )
+
+    mascara = eh_demissao | eh_afastamento
+    if not mascara.any():
+        return pd.DataFrame(columns=COLUNAS_VAGAS)
+
+    demissao = eh_demissao[mascara]
+    data_evento = data_rescisao[mascara].where(demissao, data_situacao[mascara])
+
+    # Dias de afastamento em uma única subtração vetorial
+    hoje = pd.Timestamp(datetime.now().date())
+    dias = (hoje - data_evento.dt.normalize()).dt.days
+    dias_afastamento = np.full(len(dias), None, dtype=object)
+    dias_afastamento[~demissao] = dias[~demissao].astype(int).tolist()
+
+    situacao_vagas = situacao[mascara]
+    situacao_texto = situacao_vagas.astype(object).where(~_valores_vazios(situacao_vagas), "Não informado")
+    motivo_afastamento = "Afastamento - " + situacao_texto.astype(str)
+
+    vagas = pd.DataFrame({
+        "nome": _coluna_ou_vazio(relatorio, "Nome", mascara),
+        "cargo": _coluna_ou_vazio(relatorio, "Cargo", mascara),
+        "centro_custo": _coluna_ou_vazio(relatorio, "Centro custo", mascara),
+        "nome_fantasia": _coluna_ou_vazio(relatorio, "Nome Fantasia", mascara),
+        "carga_horaria": _coluna_ou_vazio(relatorio, "Carga Horária Semanal", mascara),
+        "situacao": _coluna_ou_vazio(relatorio, "Situação", mascara),
+        "motivo": np.where(demissao, "Demissão", motivo_afastamento.to_numpy()),
+        "tipo": np.where(demissao, "demissao", "afastamento"),
+        "data_evento": _formatar_datas(data_evento),
+        "dias_afastamento": dias_afastamento,
+    }, index=relatorio.index[mascara])
+
+    logger.info(f"Identificadas {len(vagas)} vagas pendentes")
+    return vagas
+
+@cronometrado(categoria="processamento")
+def vagas_para_registros(vagas, relatorio):
+    """
+    Converte o DataFrame de detectar_vagas() na lista de dicts usada pela interface
+
+    Cada registro traz 'row_data' com as colunas do relatório necessárias
+    para a análise TLP.
+    """
+    if vagas.empty:
+        return []
+
+    colunas_row = [c for c in COLUNAS_ROW_DATA if c in relatorio.columns]
+    row_data = relatorio.loc[vagas.index, colunas_row].to_dict('records')
+
+    registros = vagas.to_dict('records')
+    for registro, row in zip(registros, row_data):
+        registro["row_data"] = row
+    return registros
+
+# ==================== ÍNDICE DE ATIVOS ====================
+
+# Situações consideradas "ativas" na contagem do quadro
+SITUACOES_ATIVAS = ["01-ATIVO", "18-ATESTADO MÉDICO"]
+
+CHAVES_CARGO = ["Nome Fantasia", "Centro custo", "Cargo"]
+CHAVES_CARGA = CHAVES_CARGO + ["Carga Horária Semanal"]
+
+class IndiceAtivos:
+    """
+    Índice de headcount de ativos construído uma vez por versão dos dados
+
+    Guarda as contagens por (contrato, unidade, cargo, carga horária) e o
+    consolidado sem carga horária, respondendo às contagens de ativos com
+    consultas O(1) em dicionário.
+    """
+
+    def __init__(self, relatorio):
+        ativos = relatorio[relatorio["Situação"].isin(SITUACOES_ATIVAS)]
+
+        self.por_cargo_serie = ativos.groupby(CHAVES_CARGO, observed=True).size()
+        self.por_carga_serie = ativos.groupby(CHAVES_CARGA, observed=True).size()
+
+        self.por_cargo = self.por_cargo_serie.to_dict()
+        self.por_carga = self.por_carga_serie.to_dict()
+
+        logger.info(f"Índice de ativos: {len(self.por_cargo)} cargos, {len(self.por_carga)} cargas horárias")
+
+    def contar(self, contrato, unidade, cargo, carga_horaria=None):
+        """Quantidade de ativos no cargo (opcionalmente na mesma carga horária)"""
+        if carga_horaria is None:
+            return self.por_cargo.get((contrato, unidade, cargo), 0)
+        return self.por_carga.get((contrato, unidade, cargo, carga_horaria), 0)
+
+# ==================== ÍNDICE TLP ====================
+
+CHAVES_TLP = ["contrato", "unidade", "cargo", "carga_hora"]
+
+class IndiceTLP:
+    """
+    Índice da TLP construído uma vez por versão carregada
+
+    Guarda o mapa exato (contrato, unidade, cargo, carga horária) e um
+    índice secundário por (contrato, unidade, cargo) com os totais já
+    somados. Em chaves duplicadas prevalece a última linha da TLP.
+    """
+
+    def __init__(self, tlp):
+        self.exata_serie = (
+            tlp.drop_duplicates(CHAVES_TLP, keep="last")
+            .set_index(CHAVES_TLP)["quantidade_ideal"]
+            .astype(int)
+        )
+        self.total_serie = self.exata_serie.groupby(level=[0, 1, 2]).sum()
+
+        self.exata = self.exata_serie.to_dict()
+        self.total = self.total_serie.to_dict()
+
+        logger.info(f"Índice TLP: {len(self.exata)} chaves, {len(self.total)} cargos")
+
+    def quantidade_ideal(self, contrato, unidade, cargo, carga_horaria):
+        """Quantidade ideal para a chave completa ou None se não prevista"""
+        return self.exata.get((contrato, unidade, cargo, carga_horaria))
+
+    def quantidade_ideal_total(self, contrato, unidade, cargo):
+        """Soma das quantidades ideais do cargo em todas as cargas horárias"""
+        return self.total.get((contrato, unidade, cargo), 0)
+
+# ==================== ANÁLISE TLP ====================
+
+def motivo_tlp(vaga_prevista, deficit, quantidade_atual_mesma_carga, quantidade_ideal):
+    """Texto exibido no card para o resultado da análise TLP"""
+    if not vaga_prevista:
+        return "⚠️ Vaga não prevista na TLP (carga horária específica)"
+    if deficit > 0:
+        return f"✅ Vaga aprovável - Déficit de {deficit} funcionário(s)"
+    if deficit == 0:
+        return f"⚠️ Quadro completo ({quantidade_atual_mesma_carga}/{quantidade_ideal})"
+    return f"⚠️ Excedente de {abs(deficit)} funcionário(s) ({quantidade_atual_mesma_carga}/{quantidade_ideal})"
+
+def observacao_tlp(vaga_prevista, quantidade_atual, quantidade_ideal_total):
+    """Observação exibida no card para o resultado da análise TLP"""
+    if not vaga_prevista:
+        return f"Existem {quantidade_atual} ativos no cargo (previsão total: {quantidade_ideal_total})"
+    return f"Total no cargo: {quantidade_atual} ativos (previsão: {quantidade_ideal_total})"
+
+def _buscar(serie, chaves):
+    """Reindexa uma série de contagens pelas chaves informadas (0 quando ausente)"""
+    if serie.empty:
+        return np.zeros(len(chaves), dtype=int)
+    return serie.reindex(chaves).fillna(0).astype(int).to_numpy()
+
+def verificar_vaga(pessoa, indice_tlp, indice_ativos):
+    """
+    Analisa uma vaga contra a TLP em tempo constante
+
+    Args:
+        pessoa: Dict/Series com Nome Fantasia, Centro custo, Cargo e Carga Horária Semanal
+        indice_tlp: IndiceTLP
+        indice_ativos: IndiceAtivos construído sobre o relatório completo
+
+    Returns:
+        Dict com o resultado da análise (mesmas chaves de verificar_vagas_na_tlp())
+    """
+    contrato = pessoa.get("Nome Fantasia")
+    unidade = pessoa.get("Centro custo")
+    cargo = pessoa.get("Cargo")
+    carga_horaria = pessoa.get("Carga Horária Semanal")
+
+    quantidade_ideal = indice_tlp.quantidade_ideal(contrato, unidade, cargo, carga_horaria)
+    quantidade_ideal_total = indice_tlp.quantidade_ideal_total(contrato, unidade, cargo)
+    quantidade_atual = indice_ativos.contar(contrato, unidade, cargo)
+
+    vaga_prevista = quantidade_ideal is not None
+    if vaga_prevista:
+        quantidade_atual_mesma_carga = indice_ativos.contar(contrato, unidade, cargo, carga_horaria)
+        deficit = quantidade_ideal - quantidade_atual_mesma_carga
+    else:
+        quantidade_ideal = 0
+        quantidade_atual_mesma_carga = 0
+        deficit = 0
+
+    return {
+        "vaga_prevista": vaga_prevista,
+        "quantidade_ideal": quantidade_ideal,
+        "quantidade_ideal_total": quantidade_ideal_total,
+        "quantidade_atual": quantidade_atual,
+        "quantidade_atual_mesma_carga": quantidade_atual_mesma_carga,
+        "deficit": deficit,
+        "pode_aprovar": True,
+        "motivo": motivo_tlp(vaga_prevista, deficit, quantidade_atual_mesma_carga, quantidade_ideal),
+        "observacao": observacao_tlp(vaga_prevista, quantidade_atual, quantidade_ideal_total)
+    }
+
+@cronometrado(categoria="processamento")
+def verificar_vagas_na_tlp(vagas, indice_tlp, indice_ativos):
+    """
+    Analisa uma lista de vagas contra a TLP em uma única junção vetorizada
+
+    Args:
+        vagas: DataFrame de detectar_vagas() ou lista de dicts de vagas
+        indice_tlp: IndiceTLP
+        indice_ativos: IndiceAtivos construído sobre o relatório completo
+
+    Returns:
+        DataFrame com as mesmas chaves de verificar_vaga(), alinhado às vagas
+    """
+    if not isinstance(vagas, pd.DataFrame):
+        vagas = pd.DataFrame(list(vagas), columns=COLUNAS_VAGAS)
+
+    colunas_chave = [vagas["nome_fantasia"], vagas["centro_custo"], vagas["cargo"]]
+    chave_cargo = pd.MultiIndex.from_arrays(colunas_chave)
+    chave_carga = pd.MultiIndex.from_arrays(colunas_chave + [vagas["carga_horaria"]])
+
+    exata = indice_tlp.exata_serie
+    prevista = chave_carga.isin(exata.index) if not exata.empty else np.zeros(len(vagas), dtype=bool)
+    ideal = np.where(prevista, _buscar(exata, chave_carga), 0)
+    ideal_total = _buscar(indice_tlp.total_serie, chave_cargo)
+    atual = _buscar(indice_ativos.por_cargo_serie, chave_cargo)
+    mesma_carga = np.where(prevista, _buscar(indice_ativos.por_carga_serie, chave_carga), 0)
+    deficit = np.where(prevista, ideal - mesma_carga, 0)
+
+    resultado = pd.DataFrame({
+        "vaga_prevista": prevista,
+        "quantidade_ideal": ideal,
+        "quantidade_ideal_total": ideal_total,
+        "quantidade_atual": atual,
+        "quantidade_atual_mesma_carga": mesma_carga,
+        "deficit": deficit,
+        "pode_aprovar": True,
+    }, index=vagas.index)
+
+    resultado["motivo"] = [
+        motivo_tlp(p, d, m, i)
+        for p, d, m, i in zip(prevista, deficit, mesma_carga, ideal)
+    ]
+    resultado["observacao"] = [
+        observacao_tlp(p, a, t)
+        for p, a, t in zip(prevista, atual, ideal_total)
+    ]
+    return resultado
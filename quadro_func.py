@@ -1,156 +1,84 @@
 import streamlit as st
-import pandas as pd
 import os
-import sqlite3
-from io import BytesIO
-import unicodedata
+
+from dados import obter_tabela, invalidar_armazenamento
+from deficit import (
+    atualizar_deficit_contratos,
+    ler_deficit_contratos,
+    ler_deficit_snapshot,
+    listar_contratos,
+    mascara_contrato,
+    resumo_deficit_contratos,
+    CONTRATO_PADRAO
+)
+from exportacao import exportar_deficit, formatos_disponiveis, FORMATOS_EXPORTACAO
 
 # Importa configuração centralizada
 try:
-    from config import DB_PATH_STR as ORIS_DB_PATH, validar_estrutura
-    validar_estrutura()
+    from config import DB_PATH_STR as ORIS_DB_PATH
 except ImportError:
     # Fallback para estrutura antiga
     ORIS_DB_PATH = os.path.join(os.getcwd(), "data", "oris.db")
 
+# Opção do seletor de contrato com a soma de todos os contratos
+TODOS_CONTRATOS = "🌐 Todos os contratos (consolidado)"
+
 def run():
     st.title("📊 Análise de Déficit de Horas por Centro de Custo")
     st.markdown("---")
 
-    def _strip_accents_upper(text):
-        """Remove acentos e converte para maiúsculas"""
-        s = str(text).upper()
-        s = unicodedata.normalize("NFKD", s)
-        s = "".join(ch for ch in s if not unicodedata.combining(ch))
-        return s.strip()
-
-    @st.cache_data(ttl=600)
     def carregar_dados_db():
-        """Carrega dados do banco oris.db"""
+        """Lê o relatório do armazenamento compartilhado (recarregado só se o banco mudou)"""
         if not os.path.exists(ORIS_DB_PATH):
             st.error(f"❌ Banco de dados não encontrado: {ORIS_DB_PATH}")
-            return None, None, None
+            return None
         
         try:
-            conn = sqlite3.connect(ORIS_DB_PATH)
-            
-            # Carrega TLP
-            tlp = pd.read_sql_query("SELECT * FROM tlp", conn)
-            
-            # Carrega relatório ORIS
-            relatorio = pd.read_sql_query("SELECT * FROM relatorio_oris", conn)
+            relatorio = obter_tabela("relatorio_oris", ORIS_DB_PATH)
+            if relatorio is None:
+                st.error("❌ Tabela 'relatorio_oris' não encontrada no banco")
+                return None
             
-            # Carrega vagas
-            try:
-                vagas = pd.read_sql_query("SELECT * FROM vagas", conn)
-            except:
-                vagas = pd.DataFrame()
-            
-            conn.close()
-            
-            st.success(f"✅ Dados carregados: {len(relatorio)} registros do ORIS, {len(tlp)} da TLP")
-            return tlp, relatorio, vagas
+            st.success(f"✅ Dados carregados: {len(relatorio)} registros do ORIS")
+            return relatorio
             
         except Exception as e:
             st.error(f"❌ Erro ao carregar dados: {e}")
-            return None, None, None
-
-    def calcular_deficit(tlp, relatorio):
-        """Calcula déficit de funcionários"""
-        if tlp is None or relatorio is None:
             return None
-        
-        # Filtra apenas SBCD - REDE ASSIST. NORTE-SP
-        target = "SBCD - REDE ASSIST. NORTE-SP"
-        if "Nome Fantasia" in relatorio.columns:
-            relatorio = relatorio[
-                relatorio["Nome Fantasia"].astype(str).apply(_strip_accents_upper) 
-                == _strip_accents_upper(target)
-            ].copy()
-        
-        # Separa ativos e afastados
-        ativos = relatorio[relatorio["Situação"] == "01-ATIVO"].copy()
-        afastados = relatorio[
-            ~relatorio["Situação"].isin(["01-ATIVO", "99-Demitido"])
-        ].copy()
-        
-        # Converte carga horária para float em ambos os dataframes
-        ativos["Carga Horária Semanal"] = pd.to_numeric(ativos["Carga Horária Semanal"], errors='coerce')
-        afastados["Carga Horária Semanal"] = pd.to_numeric(afastados["Carga Horária Semanal"], errors='coerce')
-
-        # Agrupa ativos POR CARGA HORÁRIA
-        ativos_agrupado = ativos.groupby(["Centro custo", "Cargo", "Carga Horária Semanal"]).agg(
-            Qtd_Ativos=("Nome", "count")
-        ).reset_index()
-
-        # Agrupa afastados POR CARGA HORÁRIA
-        afastados_agrupado = afastados.groupby(["Centro custo", "Cargo", "Carga Horária Semanal"]).agg(
-            Qtd_Afastados=("Nome", "count")
-        ).reset_index()
-
-        # Renomeia colunas TLP para padronizar E converte carga_hora para float
-        tlp_prep = tlp.rename(columns={
-            "unidade": "Centro custo",
-            "cargo": "Cargo",
-            "carga_hora": "Carga Horária Semanal",
-            "quantidade_ideal": "Qtd_Necessaria"
-        })
-
-        # Garante que a coluna de carga horária é numérica na TLP também
-        tlp_prep["Carga Horária Semanal"] = pd.to_numeric(tlp_prep["Carga Horária Semanal"], errors='coerce')
-
-        # Merge TLP com ativos (agora incluindo carga horária)
-        resultado = pd.merge(
-            tlp_prep[["Centro custo", "Cargo", "Carga Horária Semanal", "Qtd_Necessaria"]],
-            ativos_agrupado,
-            on=["Centro custo", "Cargo", "Carga Horária Semanal"],
-            how="left"
-        )
-
-        # Merge com afastados
-        resultado = pd.merge(
-            resultado,
-            afastados_agrupado,
-            on=["Centro custo", "Cargo", "Carga Horária Semanal"],
-            how="left"
-        )
-        
-        # Preenche valores nulos
-        resultado["Qtd_Ativos"] = resultado["Qtd_Ativos"].fillna(0).astype(int)
-        resultado["Qtd_Afastados"] = resultado["Qtd_Afastados"].fillna(0).astype(int)
-        resultado["Qtd_Necessaria"] = resultado["Qtd_Necessaria"].fillna(0).astype(int)
-        
-        # Calcula déficit
-        resultado["Deficit"] = resultado["Qtd_Necessaria"] - resultado["Qtd_Ativos"]
-        resultado["Excedente"] = resultado.apply(
-            lambda x: abs(x["Deficit"]) if x["Deficit"] < 0 else 0, axis=1
-        )
-        resultado["Funcionarios_Contratar"] = resultado.apply(
-            lambda x: x["Deficit"] if x["Deficit"] > 0 else 0, axis=1
-        )
-        
-        # Remove colunas auxiliares criadas para manter DataFrames limpos (opcional)
-        if 'carga_hora_merge' in resultado.columns:
-            resultado = resultado.drop(columns=['carga_hora_merge'])
-
-        return resultado
 
     # Carrega dados
     with st.spinner("🔄 Carregando dados do banco..."):
-        tlp, relatorio, vagas = carregar_dados_db()
+        relatorio = carregar_dados_db()
 
-    if tlp is None or relatorio is None:
+    if relatorio is None:
         st.stop()
 
-    # Calcula déficit
-    deficit_df = calcular_deficit(tlp, relatorio)
-
-    if deficit_df is None:
+    # Déficit materializado por contrato: os snapshots desatualizados (após
+    # importar relatorio_oris/tlp) são recalculados em paralelo, e trocar de
+    # contrato só lê o snapshot
+    contratos = listar_contratos(ORIS_DB_PATH)
+    if atualizar_deficit_contratos(contratos, ORIS_DB_PATH) is None:
         st.error("Não foi possível calcular o déficit")
         st.stop()
 
     # Filtros na sidebar
     st.sidebar.header("🔍 Filtros")
+
+    opcoes_contrato = [TODOS_CONTRATOS] + contratos
+    contrato_sel = st.sidebar.selectbox(
+        "Contrato", opcoes_contrato,
+        index=opcoes_contrato.index(CONTRATO_PADRAO) if CONTRATO_PADRAO in opcoes_contrato else 0
+    )
+    consolidado = contrato_sel == TODOS_CONTRATOS
+
+    if consolidado:
+        deficit_df = ler_deficit_contratos(contratos, ORIS_DB_PATH)
+    else:
+        deficit_df = ler_deficit_snapshot(contrato_sel, ORIS_DB_PATH)
+
+    if deficit_df is None:
+        st.error("Não foi possível calcular o déficit")
+        st.stop()
     
     centros = ["Todos"] + sorted(deficit_df["Centro custo"].unique().tolist())
     centro_sel = st.sidebar.selectbox("Centro de Custo", centros)
@@ -158,8 +86,8 @@ def run():
     status_opcoes = ["Todos", "Apenas com Déficit", "Apenas Excedentes", "Apenas Completos"]
     status_sel = st.sidebar.radio("Mostrar", status_opcoes)
     
-    # Aplica filtros
-    df_filtrado = deficit_df.copy()
+    # Aplica filtros (cada filtro gera um novo recorte; o snapshot não é alterado)
+    df_filtrado = deficit_df
     
     if centro_sel != "Todos":
         df_filtrado = df_filtrado[df_filtrado["Centro custo"] == centro_sel]
@@ -189,19 +117,40 @@ def run():
         st.metric("% Completo", f"{perc_completo:.1f}%")
     
     st.markdown("---")
+
+    # Visão consolidada: totais de cada contrato (direto do snapshot)
+    if consolidado:
+        st.subheader("🏢 Resumo por Contrato")
+        resumo = resumo_deficit_contratos(contratos, ORIS_DB_PATH)
+        if resumo is not None:
+            st.dataframe(
+                resumo.rename(columns={
+                    "Cargos_Deficit": "Cargos com Déficit",
+                    "Qtd_Necessaria": "Qtd Necessária",
+                    "Qtd_Ativos": "Qtd Ativos",
+                    "Qtd_Afastados": "Qtd Afastados",
+                    "Funcionarios_Contratar": "Contratar",
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+        st.markdown("---")
     
     # Tabela principal
     st.subheader("📋 Detalhamento por Cargo")
     
-    df_exibicao = df_filtrado[[
+    df_exibicao = df_filtrado[(["Contrato"] if consolidado else []) + [
         "Centro custo", "Cargo", "Carga Horária Semanal", "Qtd_Necessaria", "Qtd_Ativos",
         "Qtd_Afastados", "Deficit", "Funcionarios_Contratar", "Excedente"
-    ]].copy()
-
-    df_exibicao.columns = [
-        "Centro de Custo", "Cargo", "Carga Horária", "Qtd Necessária", "Qtd Ativos",
-        "Qtd Afastados", "Déficit", "Contratar", "Excedente"
-    ]
+    ]].rename(columns={
+        "Centro custo": "Centro de Custo",
+        "Carga Horária Semanal": "Carga Horária",
+        "Qtd_Necessaria": "Qtd Necessária",
+        "Qtd_Ativos": "Qtd Ativos",
+        "Qtd_Afastados": "Qtd Afastados",
+        "Deficit": "Déficit",
+        "Funcionarios_Contratar": "Contratar",
+    })
     
     def highlight_deficit(row):
         deficit = row["Déficit"]
@@ -222,9 +171,17 @@ def run():
     
     # Funcionários por cargo
     st.subheader("👥 Funcionários Ativos por Cargo")
-    
+    if consolidado:
+        st.caption("Ativos de todos os contratos")
+    else:
+        st.caption(f"Ativos do contrato selecionado ({contrato_sel}); escolha o consolidado para ver todos")
+
     if relatorio is not None:
-        ativos_total = relatorio[relatorio["Situação"] == "01-ATIVO"].copy()
+        # Relatório compartilhado: materializa só as 3 colunas exibidas dos ativos
+        eh_ativo = (relatorio["Situação"] == "01-ATIVO").to_numpy()
+        if not consolidado and "Nome Fantasia" in relatorio.columns:
+            eh_ativo = eh_ativo & mascara_contrato(relatorio["Nome Fantasia"], contrato_sel)
+        ativos_total = relatorio.loc[eh_ativo, ["Nome", "Cargo", "Centro custo"]]
         
         centro_opts = ["Todos"] + sorted(ativos_total["Centro custo"].unique().tolist())
         centro_func = st.selectbox("Filtrar Centro", centro_opts)
@@ -238,7 +195,7 @@ def run():
         
         cargo_func = st.selectbox("Filtrar Cargo", cargo_opts)
         
-        df_func = ativos_total[["Nome", "Cargo", "Centro custo"]].copy()
+        df_func = ativos_total
         
         if centro_func != "Todos":
             df_func = df_func[df_func["Centro custo"] == centro_func]
@@ -261,7 +218,10 @@ def run():
         st.subheader("⚠️ Cargos Prioritários")
         
         for _, row in cargos_deficit.head(10).iterrows():
-            with st.expander(f"**{row['Cargo']}** - {row['Centro custo']}"):
+            titulo = f"**{row['Cargo']}** - {row['Centro custo']}"
+            if consolidado:
+                titulo += f" ({row['Contrato']})"
+            with st.expander(titulo):
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
@@ -284,21 +244,36 @@ def run():
     # Exportar
     st.subheader("💾 Exportar")
     
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-        df_exibicao.to_excel(writer, index=False, sheet_name="Déficit")
-    buffer.seek(0)
-    
-    st.download_button(
-        "📥 Baixar Excel",
-        data=buffer,
-        file_name="analise_deficit.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    formato = st.radio(
+        "Formato", formatos_disponiveis(),
+        format_func=lambda f: FORMATOS_EXPORTACAO[f][0], horizontal=True
     )
     
+    # O arquivo só é gerado sob demanda (e fica em cache por versão e filtros)
+    if st.button("📄 Gerar arquivo"):
+        conteudo = exportar_deficit(
+            None if consolidado else contrato_sel,
+            formato,
+            centro_custo=None if centro_sel == "Todos" else centro_sel,
+            status=None if status_sel == "Todos" else status_sel,
+            db_path=ORIS_DB_PATH
+        )
+        
+        if conteudo:
+            descricao, extensao, mime = FORMATOS_EXPORTACAO[formato]
+            st.download_button(
+                f"📥 Baixar {descricao}",
+                data=conteudo,
+                file_name=f"analise_deficit.{extensao}",
+                mime=mime
+            )
+        else:
+            st.info("Nenhum cargo para exportar com os filtros selecionados")
+    
     # Botão atualizar
     if st.sidebar.button("🔄 Atualizar Dados"):
-        st.cache_data.clear()
+        # Descarta só os dados do banco; os demais caches continuam válidos
+        invalidar_armazenamento()
         st.rerun()
 
 if __name__ == '__main__':
@@ -52,6 +52,10 @@ def run_migration():
         print("[OK] Migration executada com sucesso!")
         print("\nStatus disponiveis agora: 'pendente', 'aprovado', 'rejeitado', 'cancelado'")
 
+        # O script recria a tabela vagas: reaplica os índices das migrations versionadas
+        from migracoes import executar_migracoes
+        executar_migracoes(DB_PATH, reaplicar=True)
+
         # Mostra estatísticas atuais
         cursor.execute("SELECT status, COUNT(*) FROM vagas GROUP BY status")
         stats = cursor.fetchall()
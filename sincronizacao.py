@@ -0,0 +1,130 @@
+"""
+Sincronização de vagas em segundo plano
+
+A interface dispara a sincronização em uma thread do próprio processo e
+acompanha o progresso consultando o registro de tarefas. As tarefas ficam
+em um registro do processo, uma por banco: todas as sessões do Streamlit
+veem a mesma tarefa e uma segunda sincronização do mesmo banco é recusada
+enquanto a primeira roda (entre processos, a trava fica no próprio banco;
+ver gestao_vagas.sincronizar_vagas_pendentes).
+
+Uso:
+    tarefa, iniciada = iniciar_sincronizacao(relatorio, tlp)
+    ...
+    estado = tarefa_sincronizacao().como_dict()
+"""
+
+import threading
+import time
+import logging
+import os
+
+from gestao_vagas import sincronizar_vagas_pendentes
+
+# Importa configuração centralizada
+try:
+    from config import DB_PATH_STR as DB_PATH
+except ImportError:
+    # Fallback para compatibilidade
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DB_PATH = os.path.join(BASE_DIR, "data", "oris.db")
+
+logger = logging.getLogger(__name__)
+
+# Estados de uma tarefa
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "erro"
+
+# {caminho do banco: tarefa mais recente}
+_tarefas = {}
+_tarefas_lock = threading.Lock()
+
+class TarefaSincronizacao:
+    """
+    Uma sincronização em andamento (ou a última concluída) de um banco
+
+    Atributos atualizados pela thread da tarefa e lidos pelas sessões;
+    use como_dict() para uma cópia consistente.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.estado = EXECUTANDO
+        self.etapa = None
+        self.estatisticas = {}
+        self.resultado = None
+        self.iniciada_em = time.time()
+        self.concluida_em = None
+        self._lock = threading.Lock()
+
+    def _progresso(self, etapa, estatisticas):
+        """Callback de progresso de sincronizar_vagas_pendentes()"""
+        with self._lock:
+            self.etapa = etapa
+            self.estatisticas = estatisticas
+
+    def _executar(self, relatorio, tlp):
+        """Corpo da thread da tarefa"""
+        try:
+            resultado = sincronizar_vagas_pendentes(relatorio, tlp, self.db_path, progresso=self._progresso)
+        except Exception as e:
+            logger.error(f"Erro na sincronização em segundo plano: {e}")
+            resultado = {'erro': str(e)}
+
+        with self._lock:
+            self.resultado = resultado
+            self.estado = FALHOU if 'erro' in resultado else CONCLUIDA
+            self.concluida_em = time.time()
+
+    @property
+    def em_andamento(self):
+        return self.estado == EXECUTANDO
+
+    def como_dict(self):
+        """Cópia do estado da tarefa"""
+        with self._lock:
+            fim = self.concluida_em or time.time()
+            return {
+                'estado': self.estado,
+                'etapa': self.etapa,
+                'estatisticas': dict(self.estatisticas),
+                'resultado': self.resultado,
+                'iniciada_em': self.iniciada_em,
+                'duracao_s': fim - self.iniciada_em,
+            }
+
+def tarefa_sincronizacao(db_path=None):
+    """Tarefa mais recente do banco (em andamento ou concluída) ou None"""
+    return _tarefas.get(str(db_path or DB_PATH))
+
+def iniciar_sincronizacao(relatorio, tlp, db_path=None):
+    """
+    Inicia a sincronização do banco em uma thread
+
+    Args:
+        relatorio: DataFrame com relatório ORIS (não é alterado)
+        tlp: DataFrame com TLP
+        db_path: Caminho do banco (padrão: DB_PATH do config)
+
+    Returns:
+        Tupla (tarefa, iniciada): se já havia uma sincronização do banco em
+        andamento, devolve essa tarefa e iniciada=False
+    """
+    caminho = str(db_path or DB_PATH)
+    with _tarefas_lock:
+        atual = _tarefas.get(caminho)
+        if atual is not None and atual.em_andamento:
+            return atual, False
+
+        tarefa = TarefaSincronizacao(caminho)
+        _tarefas[caminho] = tarefa
+
+    threading.Thread(
+        target=tarefa._executar,
+        args=(relatorio, tlp),
+        name="sincronizacao-vagas",
+        daemon=True
+    ).start()
+    logger.info(f"🔄 Sincronização iniciada em segundo plano: {caminho}")
+    return tarefa, True
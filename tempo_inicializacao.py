@@ -0,0 +1,109 @@
+"""
+Relatório do tempo de importação dos módulos do Sistema ORIS
+Importa cada módulo em um interpretador novo com 'python -X importtime' e
+mostra quanto custa a importação e quais pacotes consomem esse tempo
+
+Uso:
+    python tempo_inicializacao.py                  # módulos principais
+    python tempo_inicializacao.py gestao_vagas -n 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Configura encoding para UTF-8
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos medidos por padrão (do mais leve ao mais pesado)
+MODULOS_PADRAO = [
+    "config",
+    "conexao",
+    "gestao_vagas",
+    "dados",
+    "exportacao",
+    "quadro_func",
+    "aprovar_vaga",
+]
+
+def medir_importacao(modulo):
+    """
+    Importa 'modulo' em um processo novo e coleta a saída de -X importtime
+
+    Args:
+        modulo: Nome do módulo a importar
+
+    Returns:
+        Lista de (self_us, cumulativo_us, nome_importado) do módulo e das
+        importações feitas por ele (sem as da inicialização do interpretador);
+        o último item é o próprio módulo
+    """
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace"
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1])
+
+    linhas = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        self_us, cumulativo_us, nome = linha[len("import time:"):].split("|", 2)
+        nivel = (len(nome) - len(nome.lstrip()) - 1) // 2
+        linhas.append((int(self_us), int(cumulativo_us), nome.strip(), nivel))
+
+    # A saída vem em pós-ordem: o módulo pedido é a última linha de nível 0
+    # e suas importações são as linhas logo antes dela, de nível > 0
+    inicio = len(linhas) - 1
+    while inicio > 0 and linhas[inicio - 1][3] > 0:
+        inicio -= 1
+    return [linha[:3] for linha in linhas[inicio:]]
+
+def resumo_por_pacote(linhas):
+    """Soma o tempo próprio (self) por pacote de primeiro nível"""
+    totais = defaultdict(int)
+    for self_us, _, nome in linhas:
+        totais[nome.split(".")[0]] += self_us
+    return sorted(totais.items(), key=lambda item: item[1], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação dos módulos do ORIS")
+    parser.add_argument("modulos", nargs="*", default=MODULOS_PADRAO,
+                        help="Módulos a medir (padrão: módulos principais)")
+    parser.add_argument("-n", "--top", type=int, default=10,
+                        help="Pacotes exibidos por módulo (padrão: 10)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TEMPO DE IMPORTAÇÃO")
+    print("=" * 60)
+
+    for modulo in args.modulos:
+        try:
+            linhas = medir_importacao(modulo)
+        except RuntimeError as e:
+            print(f"\n[ERRO] {modulo}: {e}")
+            continue
+
+        # A última linha é o próprio módulo, com o tempo cumulativo total
+        total_us = linhas[-1][1] if linhas else 0
+        print(f"\n{modulo}: {total_us / 1000:.1f} ms ({len(linhas)} módulos importados)")
+        for pacote, self_us in resumo_por_pacote(linhas)[:args.top]:
+            percentual = 100 * self_us / total_us if total_us else 0
+            print(f"  {pacote:<28} {self_us / 1000:8.1f} ms  {percentual:5.1f}%")
+
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()